@@ -0,0 +1,175 @@
+"""
+Page-read benchmark for the donations table layouts
+
+Generates the same donation history into each layout and counts the
+database pages SQLite reads for date-range, per-donor and single-bag
+queries. Each query runs on a fresh connection with the schema already
+loaded, so the count is the pages that query touched. Pages are counted as
+read() calls from /proc/self/io (Linux only), since SQLite issues one read
+per page when memory-mapping is off.
+
+    python benchmarks/donation_layout.py [--donors 20000] [--days 1095]
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import sqlite3
+import argparse
+import tempfile
+import statistics
+from datetime import date
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT_DIR, "src"))
+
+from main import create_donor_database  # noqa: E402
+from scale_factor import populate_donor_slice  # noqa: E402
+from donation_history_generator import (  # noqa: E402
+    DONATION_LAYOUTS,
+    DonationHistoryGenerator,
+)
+
+# The original layout with secondary indexes, for a fairer baseline
+INDEXED_ROWID = "rowid+indexes"
+
+
+def io_counters():
+    """Read syscalls and bytes read so far by this process"""
+    with open("/proc/self/io") as f:
+        fields = dict(line.split(": ") for line in f.read().splitlines())
+    return int(fields["syscr"]), int(fields["rchar"])
+
+
+def pages_read(db_path, sql, params):
+    """
+    Run a query on a cold connection and count the pages it read
+
+    Returns:
+        tuple: (pages, seconds)
+    """
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    conn.execute("PRAGMA mmap_size = 0")
+    conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchall()
+    calls, _ = io_counters()
+    start = time.perf_counter()
+    conn.execute(sql, params).fetchall()
+    elapsed = time.perf_counter() - start
+    pages = io_counters()[0] - calls
+    conn.close()
+    return pages, elapsed
+
+
+def build(directory, donors_path, layout, days, seed):
+    """Generate a donation history in one layout, returning its path and time"""
+    os.makedirs(directory)
+    donor_db = os.path.join(directory, "donors.sqlite3")
+    donation_db = os.path.join(directory, "donations.sqlite3")
+    shutil.copyfile(donors_path, donor_db)
+    generator = DonationHistoryGenerator(
+        donor_db,
+        donation_db,
+        seed,
+        layout="rowid" if layout == INDEXED_ROWID else layout,
+    )
+    start = time.perf_counter()
+    generator.generate_historical_data(days, 20, 200, 30)
+    elapsed = time.perf_counter() - start
+    if layout == INDEXED_ROWID:
+        conn = sqlite3.connect(donation_db)
+        conn.execute("CREATE INDEX idx_donations_date ON donations(donation_date)")
+        conn.execute("CREATE INDEX idx_donations_donor ON donations(donor_id)")
+        conn.commit()
+        conn.close()
+    return donation_db, elapsed
+
+
+def run(num_donors, days, samples, seed):
+    """
+    Build every layout and measure page reads
+
+    Returns:
+        list: One result dict per layout
+    """
+    workdir = tempfile.mkdtemp(prefix="donation_layout_")
+    try:
+        donors_path = os.path.join(workdir, "donors.sqlite3")
+        create_donor_database(donors_path)
+        populate_donor_slice(donors_path, 0, num_donors, seed, as_of=date.today())
+
+        layouts = list(DONATION_LAYOUTS) + [INDEXED_ROWID]
+        built = {
+            layout: build(os.path.join(workdir, layout), donors_path, layout, days, seed)
+            for layout in layouts
+        }
+
+        # Query parameters are drawn once and shared by every layout
+        conn = sqlite3.connect(built["rowid"][0])
+        dates = [r[0] for r in conn.execute("SELECT DISTINCT donation_date FROM donations ORDER BY 1")]
+        donor_ids = [r[0] for r in conn.execute("SELECT DISTINCT donor_id FROM donations")]
+        bag_ids = [r[0] for r in conn.execute("SELECT bag_id FROM donations")]
+        conn.close()
+        rng = random.Random(seed)
+        windows = []
+        for _ in range(samples):
+            i = rng.randrange(len(dates))
+            windows.append((dates[i], dates[min(i + 20, len(dates) - 1)]))
+        queries = {
+            "date range": (
+                "SELECT COUNT(*), SUM(test_result) FROM donations WHERE donation_date BETWEEN ? AND ?",
+                windows,
+            ),
+            "donor history": (
+                "SELECT bag_id, donation_date, status FROM donations WHERE donor_id = ? ORDER BY donation_date",
+                [(d,) for d in rng.sample(donor_ids, min(samples, len(donor_ids)))],
+            ),
+            "bag lookup": (
+                "SELECT * FROM donations WHERE bag_id = ?",
+                [(b,) for b in rng.sample(bag_ids, min(samples, len(bag_ids)))],
+            ),
+        }
+
+        results = []
+        for layout in layouts:
+            path, build_seconds = built[layout]
+            result = {
+                "layout": layout,
+                "rows": len(bag_ids),
+                "file_kb": os.path.getsize(path) // 1024,
+                "build_s": build_seconds,
+            }
+            for name, (sql, params) in queries.items():
+                measured = [pages_read(path, sql, p) for p in params]
+                result[f"{name} pages"] = statistics.mean(m[0] for m in measured)
+                result[f"{name} ms"] = statistics.mean(m[1] for m in measured) * 1000
+            results.append(result)
+        return results
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark donation table layouts")
+    parser.add_argument("--donors", type=int, default=20_000, help="Donor count")
+    parser.add_argument("--days", type=int, default=1095, help="Days of history")
+    parser.add_argument("--samples", type=int, default=50, help="Queries per kind")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of a table")
+    args = parser.parse_args()
+
+    if not os.path.exists("/proc/self/io"):
+        sys.exit("Page counts need /proc/self/io (Linux)")
+
+    results = run(args.donors, args.days, args.samples, args.seed)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        columns = list(results[0])
+        print("  ".join(f"{c:>18}" for c in columns))
+        for r in results:
+            print("  ".join(
+                f"{r[c]:>18.1f}" if isinstance(r[c], float) else f"{r[c]:>18}"
+                for c in columns
+            ))
@@ -0,0 +1,218 @@
+"""
+Performance regression suite for the SQL in queries/
+
+Generates donor (and optionally donation) databases at several scale
+factors, runs every statement of every file in queries/ against each, and
+records latency percentiles, rows returned and the EXPLAIN QUERY PLAN.
+Compared with a stored baseline, a statement regresses when its plan gains
+a full table scan or its median time grows beyond the threshold.
+
+    python benchmarks/query_suite.py [--scales 1,10,100] [--save_baseline]
+
+Exits nonzero when a regression is found.
+"""
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import sqlite3
+import argparse
+import tempfile
+import statistics
+from datetime import date
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT_DIR, "src"))
+
+from main import create_donor_database  # noqa: E402
+from scale_factor import donor_count, populate_donor_slice  # noqa: E402
+from donation_history_generator import DonationHistoryGenerator  # noqa: E402
+from query_service import split_statements  # noqa: E402
+
+QUERIES_DIR = os.path.join(ROOT_DIR, "queries")
+BASELINE_PATH = os.path.join(ROOT_DIR, "benchmarks", "query_baseline.json")
+
+# "SCAN donors" is a full table scan; "SCAN donors USING [COVERING] INDEX ..."
+# walks an index and is reported as-is but not flagged
+FULL_SCAN_RE = re.compile(r"^SCAN (\w+)$")
+
+
+def query_files(directory=QUERIES_DIR):
+    """Every regular file in the queries directory, sorted by name"""
+    return sorted(
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if os.path.isfile(os.path.join(directory, name)) and not name.startswith(".")
+    )
+
+
+def build_databases(directory, scale_factor, days, seed, as_of):
+    """
+    Generate donors at a scale factor, plus `days` of donation history
+
+    Returns:
+        tuple: (donor_db, donation_db or None)
+    """
+    os.makedirs(directory, exist_ok=True)
+    donor_db = os.path.join(directory, "donors.sqlite3")
+    create_donor_database(donor_db)
+    populate_donor_slice(donor_db, 0, donor_count(scale_factor), seed, as_of)
+    if not days:
+        return donor_db, None
+    donation_db = os.path.join(directory, "donations.sqlite3")
+    generator = DonationHistoryGenerator(donor_db, donation_db, seed)
+    generator.generate_historical_data(days, 20, 200, 30)
+    return donor_db, donation_db
+
+
+def full_scans(plan):
+    """Tables read by a full scan in an EXPLAIN QUERY PLAN"""
+    return sorted({m.group(1) for m in map(FULL_SCAN_RE.match, plan) if m})
+
+
+def measure(conn, statement, runs):
+    """
+    Time one statement and capture its plan
+
+    Returns:
+        dict: rows, p50/p95/p99/max in ms, plan lines and full-scan tables
+    """
+    plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {statement}")]
+    times = []
+    rows = 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        rows = len(conn.execute(statement).fetchall())
+        times.append((time.perf_counter() - start) * 1000)
+    cuts = statistics.quantiles(times, n=100, method="inclusive") if runs > 1 else times * 99
+    return {
+        "rows": rows,
+        "p50_ms": statistics.median(times),
+        "p95_ms": cuts[94],
+        "p99_ms": cuts[98],
+        "max_ms": max(times),
+        "plan": plan,
+        "full_scans": full_scans(plan),
+    }
+
+
+def run_suite(files, scales, runs=20, days=0, seed=42, as_of=None):
+    """
+    Run every statement in `files` at every scale factor
+
+    Returns:
+        dict: {"scale <sf>": {"<file>#<n>": result}} where each result also
+            holds the statement text
+    """
+    as_of = as_of or date.today()
+    workdir = tempfile.mkdtemp(prefix="query_suite_")
+    results = {}
+    try:
+        for scale_factor in scales:
+            donor_db, donation_db = build_databases(
+                os.path.join(workdir, str(scale_factor)), scale_factor, days, seed, as_of
+            )
+            conn = sqlite3.connect(f"file:{donor_db}?mode=ro", uri=True)
+            if donation_db:
+                conn.execute("ATTACH DATABASE ? AS donation_db", (f"file:{donation_db}?mode=ro",))
+            scale = results[f"scale {scale_factor}"] = {}
+            for path in files:
+                with open(path) as f:
+                    statements = split_statements(f.read())
+                for n, statement in enumerate(statements, start=1):
+                    result = measure(conn, statement, runs)
+                    result["statement"] = statement
+                    scale[f"{os.path.basename(path)}#{n}"] = result
+            conn.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def find_regressions(results, baseline, threshold=0.25, min_ms=1.0):
+    """
+    Compare a run with the baseline
+
+    Statements missing from the baseline, or whose text changed, are new
+    and never regress.
+
+    Args:
+        results: Output of run_suite
+        baseline: Earlier output of run_suite
+        threshold: Allowed relative growth of the median time
+        min_ms: Median growth below this many ms is treated as noise
+
+    Returns:
+        list: (scale, query, reason) tuples
+    """
+    regressions = []
+    for scale, queries in results.items():
+        for query, current in queries.items():
+            before = baseline.get(scale, {}).get(query)
+            if not before or before["statement"] != current["statement"]:
+                continue
+            new_scans = sorted(set(current["full_scans"]) - set(before["full_scans"]))
+            if new_scans:
+                regressions.append((scale, query, f"new full scan of {', '.join(new_scans)}"))
+            growth = current["p50_ms"] - before["p50_ms"]
+            if growth > min_ms and current["p50_ms"] > before["p50_ms"] * (1 + threshold):
+                regressions.append((
+                    scale,
+                    query,
+                    f"median {before['p50_ms']:.1f} ms -> {current['p50_ms']:.1f} ms",
+                ))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the SQL in queries/")
+    parser.add_argument(
+        "--scales", default="1,10,100", help="Comma-separated scale factors"
+    )
+    parser.add_argument("--runs", type=int, default=20, help="Timed runs per statement")
+    parser.add_argument(
+        "--days", type=int, default=0, help="Days of donation history to generate (0 for none)"
+    )
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--queries", default=QUERIES_DIR, help="Directory of SQL files")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON file")
+    parser.add_argument(
+        "--save_baseline", action="store_true", help="Write this run as the new baseline"
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=0.25, help="Allowed relative slowdown"
+    )
+    parser.add_argument(
+        "--min_ms", type=float, default=1.0, help="Ignore slowdowns smaller than this"
+    )
+    args = parser.parse_args()
+
+    scales = [float(s) for s in args.scales.split(",")]
+    results = run_suite(query_files(args.queries), scales, args.runs, args.days, args.seed)
+
+    print(f"{'scale':<12} {'query':<28} {'rows':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}  full scans")
+    for scale, queries in results.items():
+        for query, r in queries.items():
+            print(
+                f"{scale:<12} {query:<28} {r['rows']:>6} {r['p50_ms']:>9.2f} "
+                f"{r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f}  {', '.join(r['full_scans']) or '-'}"
+            )
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+        sys.exit(0)
+
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare with; run with --save_baseline first")
+        sys.exit(0)
+    with open(args.baseline) as f:
+        regressions = find_regressions(results, json.load(f), args.threshold, args.min_ms)
+    for scale, query, reason in regressions:
+        print(f"REGRESSION {scale} {query}: {reason}")
+    if not regressions:
+        print("No regressions against the baseline")
+    sys.exit(1 if regressions else 0)
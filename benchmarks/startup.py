@@ -0,0 +1,82 @@
+"""
+Startup-time benchmark for the CLI entry points
+
+Times a fresh interpreter importing each entry module, against a bare
+interpreter as the floor, and reports which heavy dependencies got loaded.
+
+    python benchmarks/startup.py [--runs 20]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_DIR = os.path.join(ROOT_DIR, "src")
+
+ENTRY_MODULES = ["main", "donation_history_generator", "query_service"]
+HEAVY_MODULES = ["faker", "factory", "numpy"]
+
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+{imports}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def time_startup(module, runs):
+    """
+    Start a fresh interpreter `runs` times and import `module` in each
+
+    Args:
+        module: Module to import, or None for a bare interpreter
+        runs: Number of interpreter launches
+
+    Returns:
+        dict: Median/min process and import times in ms, heavy modules loaded
+    """
+    code = PROBE.format(
+        imports=f"import {module}" if module else "pass", heavy=HEAVY_MODULES
+    )
+    env = dict(os.environ, PYTHONPATH=SRC_DIR, PYTHONDONTWRITEBYTECODE="1")
+    wall, imports, loaded = [], [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        out = subprocess.run(
+            [sys.executable, "-c", code],
+            env=env,
+            cwd=SRC_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        wall.append(time.perf_counter() - start)
+        result = json.loads(out)
+        imports.append(result["elapsed"])
+        loaded = result["loaded"]
+    return {
+        "module": module or "(bare interpreter)",
+        "process_ms": statistics.median(wall) * 1000,
+        "import_ms": statistics.median(imports) * 1000,
+        "min_import_ms": min(imports) * 1000,
+        "heavy_loaded": loaded,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark CLI startup time")
+    parser.add_argument("--runs", type=int, default=20, help="Launches per module")
+    args = parser.parse_args()
+
+    print(f"{'module':<30} {'process ms':>11} {'import ms':>10} {'min ms':>8}  heavy modules")
+    for module in [None] + ENTRY_MODULES:
+        r = time_startup(module, args.runs)
+        print(
+            f"{r['module']:<30} {r['process_ms']:>11.1f} {r['import_ms']:>10.1f} "
+            f"{r['min_import_ms']:>8.1f}  {', '.join(r['heavy_loaded']) or '-'}"
+        )
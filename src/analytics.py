@@ -0,0 +1,423 @@
+import os
+import re
+import csv
+import json
+import time
+import sqlite3
+import logging
+import argparse
+import tempfile
+from datetime import date, datetime
+from urllib.parse import quote
+
+from query_service import database_version, split_statements
+
+logger = logging.getLogger(__name__)
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DATA_DIR = os.path.join(ROOT_DIR, "data")
+DONOR_DB_PATH = os.path.join(DATA_DIR, "donors.sqlite3")
+DONATION_DB_PATH = os.path.join(DATA_DIR, "donations.sqlite3")
+ANALYTICS_DB_PATH = os.path.join(DATA_DIR, "analytics.duckdb")
+
+# DuckDB types for the declared SQLite column types used in this project
+DUCKDB_TYPES = {
+    "INTEGER": "BIGINT",
+    "REAL": "DOUBLE",
+    "TEXT": "VARCHAR",
+    "UUID": "VARCHAR",
+    "DATE": "DATE",
+    "TIMESTAMP": "TIMESTAMP",
+    "BOOLEAN": "BOOLEAN",
+}
+
+
+# Functions that make a select item an aggregate in both dialects
+AGGREGATE_CALL = re.compile(
+    r"\b(count|sum|avg|min|max|total|group_concat|string_agg)\s*\(", re.IGNORECASE
+)
+ALIAS = re.compile(r'^(.*?)\s+AS\s+(\w+|"[^"]*")$', re.IGNORECASE | re.DOTALL)
+
+
+def _literal(text):
+    """A single-quoted SQL string literal, for statements DuckDB cannot bind"""
+    return "'" + text.replace("'", "''") + "'"
+
+
+def _ro_uri(path):
+    return f"file:{quote(path)}?mode=ro"
+
+
+def _top_level(sql):
+    """Positions in sql outside parentheses and quoted text"""
+    depth = 0
+    quote_char = None
+    for i, c in enumerate(sql):
+        if quote_char:
+            if c == quote_char:
+                quote_char = None
+        elif c in "'\"":
+            quote_char = c
+        elif c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif depth == 0:
+            yield i
+
+
+def wrap_bare_columns(statement):
+    """
+    Rewrite an aggregate query's bare columns the way SQLite reads them
+
+    SQLite accepts select items that are neither grouped nor aggregated
+    and takes them from an arbitrary row of each group; DuckDB rejects
+    them. Wrapping every non-aggregate select item in any_value() gives
+    the same rows under the same column names (aliases are recognised
+    when written with AS). Only a single top-level SELECT ... FROM is
+    rewritten.
+
+    Returns:
+        str: The rewritten statement, or None if it is not of that shape
+    """
+    positions = list(_top_level(statement))
+    # Nested and quoted text blanked out, so only the outer query matches
+    text = [" "] * len(statement)
+    for i in positions:
+        text[i] = statement[i]
+    text = "".join(text)
+    select = re.match(r"\s*SELECT\s+(?!DISTINCT\b|ALL\b)", statement, re.IGNORECASE)
+    source = re.search(r"\sFROM\s", text, re.IGNORECASE)
+    if not select or not source or len(re.findall(r"\bSELECT\b", text, re.IGNORECASE)) != 1:
+        return None
+
+    start, end = select.end(), source.start()
+    commas = [i for i in positions if start <= i < end and statement[i] == ","]
+    bounds = zip([start] + [c + 1 for c in commas], commas + [end])
+    items = []
+    for a, b in bounds:
+        item = statement[a:b].strip()
+        if item.endswith("*"):
+            return None
+        if AGGREGATE_CALL.search(item):
+            items.append(item)
+            continue
+        alias = ALIAS.match(item)
+        expression, name = (alias.group(1), alias.group(2)) if alias else (item, None)
+        if name is None:
+            name = '"' + expression.replace('"', '""') + '"'
+        items.append(f"any_value({expression}) AS {name}")
+    return f"{statement[:start]}{', '.join(items)} {statement[end:].lstrip()}"
+
+
+def _duckdb():
+    try:
+        import duckdb
+    except ImportError as e:
+        raise ImportError(
+            "The analytics backend needs DuckDB: pip install duckdb"
+        ) from e
+    return duckdb
+
+
+class AnalyticsBackend:
+    """
+    Columnar DuckDB view of the generated SQLite tables
+
+    In "attach" mode DuckDB's sqlite extension scans the SQLite files in
+    place. In "native" mode each table is copied into a DuckDB database file
+    once and re-copied only when its source file's version stamp changes.
+    "auto" attaches when the extension is available and falls back to a
+    native copy otherwise (the extension is downloaded on first use).
+    Either way the tables are visible under their SQLite names, so the
+    files in queries/ run unchanged.
+    """
+
+    def __init__(
+        self,
+        sources=None,
+        native_path=ANALYTICS_DB_PATH,
+        mode="auto",
+    ):
+        """
+        Initialize the backend
+
+        Args:
+            sources: {table_name: sqlite_path}, defaults to the donors and
+                donations databases; missing files are skipped
+            native_path: DuckDB file for native mode, None for in-memory
+            mode: "attach", "native" or "auto"
+        """
+        if mode not in ("attach", "native", "auto"):
+            raise ValueError(f"Unknown mode {mode!r}")
+        if sources is None:
+            sources = {"donors": DONOR_DB_PATH, "donations": DONATION_DB_PATH}
+        self.sources = {
+            table: os.path.abspath(path)
+            for table, path in sources.items()
+            if os.path.exists(path)
+        }
+        self.native_path = native_path
+        self.mode = mode
+        self.con = None
+
+    def connect(self):
+        """Open DuckDB and expose every source table, returning the connection"""
+        if self.con is not None:
+            return self.con
+        duckdb = _duckdb()
+
+        if self.mode in ("attach", "auto"):
+            con = duckdb.connect()
+            try:
+                self._attach(con)
+            except duckdb.Error as e:
+                con.close()
+                if self.mode == "attach":
+                    raise
+                logger.info(f"SQLite extension unavailable ({e}), using a native copy")
+            else:
+                self.mode = "attach"
+                self.con = con
+        if self.con is None:
+            self.mode = "native"
+            self.con = duckdb.connect(self.native_path or ":memory:")
+            self._refresh_native(self.con)
+
+        # SQLite divides integers with truncation; keep the queries' meaning
+        self.con.execute("SET integer_division = true")
+        self.con.execute("SET enable_progress_bar = false")
+        return self.con
+
+    def _attach(self, con):
+        con.execute("LOAD sqlite")
+        for table, path in self.sources.items():
+            alias = f"src_{table}"
+            con.execute(f"ATTACH {_literal(path)} AS {alias} (TYPE sqlite, READ_ONLY)")
+            con.execute(f"CREATE VIEW {table} AS SELECT * FROM {alias}.{table}")
+
+    def _refresh_native(self, con):
+        """Copy any source table whose SQLite file changed since the last copy"""
+        con.execute("""
+        CREATE TABLE IF NOT EXISTS _sources (
+            table_name VARCHAR PRIMARY KEY,
+            path VARCHAR,
+            version VARCHAR
+        )
+        """)
+        for table, path in self.sources.items():
+            version = json.dumps(database_version(path))
+            stored = con.execute(
+                "SELECT path, version FROM _sources WHERE table_name = ?", [table]
+            ).fetchone()
+            if stored == (path, version):
+                continue
+            started = time.perf_counter()
+            rows = self._copy_table(con, table, path)
+            con.execute(
+                "INSERT OR REPLACE INTO _sources VALUES (?, ?, ?)", [table, path, version]
+            )
+            logger.info(
+                f"Copied {rows} rows of {table} into DuckDB in {time.perf_counter() - started:.1f}s"
+            )
+
+    @staticmethod
+    def _copy_table(con, table, path):
+        """
+        Copy one SQLite table into DuckDB through a CSV file
+
+        CSV is the one bulk path into DuckDB that needs neither its sqlite
+        extension nor pandas/pyarrow.
+        """
+        src = sqlite3.connect(_ro_uri(path), uri=True)
+        info = src.execute(f"PRAGMA table_info({table})").fetchall()
+        columns = ", ".join(
+            f'"{name}" {DUCKDB_TYPES.get(decl.upper(), "VARCHAR")}'
+            for _, name, decl, *_ in info
+        )
+        fd, csv_path = tempfile.mkstemp(suffix=".csv")
+        try:
+            with os.fdopen(fd, "w", newline="") as f:
+                csv.writer(f).writerows(src.execute(f"SELECT * FROM {table}"))
+            src.close()
+            con.execute(f"CREATE OR REPLACE TABLE {table} ({columns})")
+            con.execute(f"COPY {table} FROM {_literal(csv_path)} (HEADER false)")
+        finally:
+            os.remove(csv_path)
+        return con.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def execute(self, sql, params=()):
+        """
+        Run a query
+
+        A grouped query that DuckDB rejects for selecting ungrouped columns,
+        which SQLite allows, is retried with wrap_bare_columns().
+
+        Returns:
+            tuple: (column_names, rows)
+        """
+        con = self.connect()
+        try:
+            cursor = con.execute(sql, list(params))
+        except _duckdb().BinderException as e:
+            rewritten = wrap_bare_columns(sql)
+            if "must appear in the GROUP BY clause" not in str(e) or rewritten is None:
+                raise
+            cursor = con.execute(rewritten, list(params))
+        columns = tuple(d[0] for d in cursor.description or ())
+        return columns, cursor.fetchall()
+
+    def run_file(self, path):
+        """
+        Run every statement in a SQL file, such as those in queries/
+
+        Returns:
+            list: (statement, column_names, rows) for each statement
+        """
+        with open(path) as f:
+            statements = split_statements(f.read())
+        return [(s, *self.execute(s)) for s in statements]
+
+    def export_parquet(self, directory):
+        """
+        Write every source table to <directory>/<table>.parquet
+
+        Returns:
+            list: Paths written
+        """
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for table in self.sources:
+            path = os.path.join(directory, f"{table}.parquet")
+            self.connect().execute(f"COPY {table} TO {_literal(path)} (FORMAT parquet)")
+            paths.append(path)
+        return paths
+
+    def close(self):
+        if self.con is not None:
+            self.con.close()
+            self.con = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _normalize(rows):
+    """Rows in a comparable form across SQLite and DuckDB result types"""
+
+    def value(v):
+        if isinstance(v, (date, datetime)):
+            return v.isoformat()
+        if isinstance(v, bool):
+            return int(v)
+        if isinstance(v, float):
+            return round(v, 9)
+        return v
+
+    return sorted((tuple(value(v) for v in row) for row in rows), key=repr)
+
+
+def _best_time(run, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = run()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def compare(files, backend, repeat=5):
+    """
+    Time every statement in `files` on SQLite and on DuckDB
+
+    SQLite runs on the donors database with the other sources attached, so
+    table names resolve the same way on both engines.
+
+    Args:
+        files: SQL file paths
+        backend: AnalyticsBackend
+        repeat: Runs per statement; the fastest is reported
+
+    Returns:
+        list: dicts with file, statement, sqlite_ms, duckdb_ms, speedup,
+            match and error (the message when either engine rejects it)
+    """
+    tables = list(backend.sources)
+    conn = sqlite3.connect(_ro_uri(backend.sources[tables[0]]), uri=True)
+    for i, table in enumerate(tables[1:]):
+        conn.execute(f"ATTACH DATABASE ? AS src{i}", (_ro_uri(backend.sources[table]),))
+    backend.connect()
+
+    report = []
+    for path in files:
+        with open(path) as f:
+            statements = split_statements(f.read())
+        for statement in statements:
+            entry = {"file": os.path.basename(path), "statement": statement}
+            try:
+                sqlite_s, sqlite_rows = _best_time(
+                    lambda: conn.execute(statement).fetchall(), repeat
+                )
+                duck_s, (_, duck_rows) = _best_time(
+                    lambda: backend.execute(statement), repeat
+                )
+            except (sqlite3.Error, _duckdb().Error) as e:
+                logger.warning(f"{entry['file']}: {e}")
+                entry.update(sqlite_ms=None, duckdb_ms=None, speedup=None, match=False, error=str(e))
+            else:
+                entry.update(
+                    sqlite_ms=sqlite_s * 1000,
+                    duckdb_ms=duck_s * 1000,
+                    speedup=sqlite_s / duck_s if duck_s else float("inf"),
+                    match=_normalize(sqlite_rows) == _normalize(duck_rows),
+                    error=None,
+                )
+            report.append(entry)
+    conn.close()
+    return report
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(
+        description="Run SQL files on DuckDB and compare timings with SQLite"
+    )
+    parser.add_argument("files", nargs="+", help="SQL files, e.g. queries/*")
+    parser.add_argument("--donors", default=DONOR_DB_PATH, help="Donors database")
+    parser.add_argument(
+        "--donations", default=DONATION_DB_PATH, help="Donations database"
+    )
+    parser.add_argument(
+        "--mode", choices=["attach", "native", "auto"], default="auto",
+        help="Scan the SQLite files in place or copy them into DuckDB",
+    )
+    parser.add_argument(
+        "--native_path", default=ANALYTICS_DB_PATH, help="DuckDB file for native mode"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per statement")
+    parser.add_argument("--parquet", default=None, help="Also export tables to this directory")
+    args = parser.parse_args()
+
+    with AnalyticsBackend(
+        {"donors": args.donors, "donations": args.donations},
+        native_path=args.native_path,
+        mode=args.mode,
+    ) as backend:
+        report = compare(args.files, backend, args.repeat)
+        print(f"DuckDB mode: {backend.mode}")
+        print(f"{'file':<25} {'sqlite ms':>10} {'duckdb ms':>10} {'speedup':>8}  match  statement")
+        for r in report:
+            if r["error"]:
+                print(f"{r['file']:<25} {'error':>10} {'':>10} {'':>8}  NO     {r['error'][:60]}")
+                continue
+            print(
+                f"{r['file']:<25} {r['sqlite_ms']:>10.1f} {r['duckdb_ms']:>10.1f} "
+                f"{r['speedup']:>7.1f}x  {'yes' if r['match'] else 'NO ':<5}  {r['statement'][:60]}"
+            )
+        if args.parquet:
+            for path in backend.export_parquet(args.parquet):
+                print(f"Wrote {path}")
@@ -0,0 +1,292 @@
+import os
+import json
+import shutil
+import sqlite3
+import hashlib
+import logging
+import argparse
+import time
+from datetime import date
+
+logger = logging.getLogger(__name__)
+
+SRC_DIR = os.path.abspath(os.path.dirname(__file__))
+CONSTANTS_PATH = os.path.join(SRC_DIR, "constants.py")
+
+CACHE_DIR = os.environ.get(
+    "CRIMSONCACHE_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "crimsoncache"),
+)
+DEFAULT_MAX_BYTES = 2 * 1024**3
+
+# Bump when the cache layout changes so old stores are not misread
+CACHE_FORMAT = 1
+
+
+def file_digest(path, chunk_size=1024 * 1024):
+    """SHA-256 hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def code_version(src_dir=SRC_DIR):
+    """
+    Digest of every Python source file in src/
+
+    Unlike a git revision this also changes with uncommitted edits, so a
+    locally modified generator never reuses artifacts from the old code.
+    """
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(src_dir)):
+        if name.endswith(".py"):
+            digest.update(name.encode())
+            digest.update(file_digest(os.path.join(src_dir, name)).encode())
+    return digest.hexdigest()
+
+
+def cache_key(params, as_of=None):
+    """
+    Content address for a generation run
+
+    Args:
+        params: JSON-serialisable generator parameters, including the seed
+        as_of: Date the run is anchored to, defaults to today; generated
+            birthdates and donation histories are relative to it
+
+    Returns:
+        str: SHA-256 hex key
+    """
+    payload = {
+        "format": CACHE_FORMAT,
+        "params": params,
+        "as_of": (as_of or date.today()).isoformat(),
+        "constants": file_digest(CONSTANTS_PATH),
+        "code": code_version(),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+class ArtifactCache:
+    """
+    Local content-addressed store of generated database files
+
+    Files are stored once per content digest under objects/ and mapped to
+    run keys in a small SQLite index. When the store grows past max_bytes
+    the least recently used runs are evicted.
+    """
+
+    def __init__(self, root=CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Initialize the cache
+
+        Args:
+            root: Directory holding the store
+            max_bytes: Size bound for stored objects
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self.objects_dir = os.path.join(root, "objects")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.index_path = os.path.join(root, "index.sqlite3")
+        with self._connect() as conn:
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT,
+                name TEXT,
+                object TEXT,
+                PRIMARY KEY (key, name)
+            )
+            """)
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS runs (
+                key TEXT PRIMARY KEY,
+                params TEXT,
+                created REAL,
+                last_used REAL
+            )
+            """)
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS objects (
+                digest TEXT PRIMARY KEY,
+                size INTEGER
+            )
+            """)
+        conn.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.index_path, timeout=30)
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def get(self, key, destinations, link=False):
+        """
+        Materialise a cached run's files
+
+        Args:
+            key: Run key from cache_key()
+            destinations: {name: path} of files to restore
+            link: Hard-link instead of copying. Stored objects are read-only,
+                so SQLite refuses to write through a link; only use this for
+                artifacts that will not be updated in place
+
+        Returns:
+            bool: True on a hit, with every file in place
+        """
+        conn = self._connect()
+        try:
+            stored = dict(
+                conn.execute(
+                    "SELECT name, object FROM entries WHERE key = ?", (key,)
+                ).fetchall()
+            )
+            if not stored or set(destinations) - set(stored):
+                return False
+            if not all(os.path.exists(self._object_path(d)) for d in stored.values()):
+                logger.warning(f"Cache entry {key[:12]} is missing objects, dropping it")
+                self._drop(conn, key)
+                conn.commit()
+                return False
+
+            for name, path in destinations.items():
+                source = self._object_path(stored[name])
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                tmp_path = f"{path}.tmp"
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                if link:
+                    os.link(source, tmp_path)
+                else:
+                    shutil.copyfile(source, tmp_path)
+                os.replace(tmp_path, path)
+
+            conn.execute(
+                "UPDATE runs SET last_used = ? WHERE key = ?", (time.time(), key)
+            )
+            conn.commit()
+            return True
+        finally:
+            conn.close()
+
+    def put(self, key, sources, params=None):
+        """
+        Store a completed run's files
+
+        Args:
+            key: Run key from cache_key()
+            sources: {name: path} of files to store
+            params: Optional parameters, recorded for listing only
+        """
+        conn = self._connect()
+        try:
+            for name, path in sources.items():
+                digest = file_digest(path)
+                target = self._object_path(digest)
+                if not os.path.exists(target):
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    tmp_path = f"{target}.{os.getpid()}.tmp"
+                    shutil.copyfile(path, tmp_path)
+                    os.chmod(tmp_path, 0o444)
+                    os.replace(tmp_path, target)
+                conn.execute(
+                    "INSERT OR IGNORE INTO objects (digest, size) VALUES (?, ?)",
+                    (digest, os.path.getsize(target)),
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, name, object) VALUES (?, ?, ?)",
+                    (key, name, digest),
+                )
+            now = time.time()
+            conn.execute(
+                "INSERT OR REPLACE INTO runs (key, params, created, last_used) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(params, sort_keys=True), now, now),
+            )
+            conn.commit()
+            logger.info(f"Cached {len(sources)} artifacts under {key[:12]}")
+            self.evict(conn)
+        finally:
+            conn.close()
+
+    def size(self, conn=None):
+        """Total bytes of stored objects"""
+        own = conn is None
+        conn = conn or self._connect()
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+        if own:
+            conn.close()
+        return total
+
+    def evict(self, conn=None):
+        """
+        Drop least recently used runs until the store fits in max_bytes
+
+        Returns:
+            int: Number of runs evicted
+        """
+        own = conn is None
+        conn = conn or self._connect()
+        evicted = 0
+        try:
+            while self.size(conn) > self.max_bytes:
+                row = conn.execute(
+                    "SELECT key FROM runs ORDER BY last_used LIMIT 1"
+                ).fetchone()
+                if row is None:
+                    break
+                self._drop(conn, row[0])
+                conn.commit()
+                evicted += 1
+        finally:
+            if own:
+                conn.close()
+        if evicted:
+            logger.info(f"Evicted {evicted} cached runs")
+        return evicted
+
+    def _drop(self, conn, key):
+        """Remove a run and any objects no other run refers to"""
+        conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+        conn.execute("DELETE FROM runs WHERE key = ?", (key,))
+        orphans = conn.execute(
+            "SELECT digest FROM objects WHERE digest NOT IN (SELECT object FROM entries)"
+        ).fetchall()
+        for (digest,) in orphans:
+            path = self._object_path(digest)
+            if os.path.exists(path):
+                os.remove(path)
+            conn.execute("DELETE FROM objects WHERE digest = ?", (digest,))
+
+    def runs(self):
+        """List cached runs as (key, params, last_used), most recent first"""
+        conn = self._connect()
+        rows = conn.execute(
+            "SELECT key, params, last_used FROM runs ORDER BY last_used DESC"
+        ).fetchall()
+        conn.close()
+        return rows
+
+    def clear(self):
+        """Remove every cached run"""
+        conn = self._connect()
+        for (key,) in conn.execute("SELECT key FROM runs").fetchall():
+            self._drop(conn, key)
+        conn.commit()
+        conn.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Inspect the generation cache")
+    parser.add_argument("--root", default=CACHE_DIR, help="Cache directory")
+    parser.add_argument("--clear", action="store_true", help="Remove every entry")
+    args = parser.parse_args()
+
+    cache = ArtifactCache(args.root)
+    if args.clear:
+        cache.clear()
+    for key, params, last_used in cache.runs():
+        print(f"{key[:12]}  {time.ctime(last_used)}  {params}")
+    print(f"{cache.size() / 1024**2:.1f} MiB in {cache.root}")
@@ -0,0 +1,137 @@
+import sys
+import json
+import sqlite3
+import logging
+import argparse
+from typing import NamedTuple
+
+logger = logging.getLogger(__name__)
+
+OPERATIONS = ("insert", "update", "delete")
+
+
+class Change(NamedTuple):
+    seq: int
+    table_name: str
+    operation: str
+    row_key: str
+    row: dict
+    changed_at: str
+
+
+def _columns(conn, table):
+    """Column names and the primary key column of a table"""
+    info = conn.execute(f"PRAGMA table_info({table})").fetchall()
+    if not info:
+        raise ValueError(f"Table {table} does not exist")
+    columns = [row[1] for row in info]
+    keys = [row[1] for row in info if row[5]]
+    return columns, keys[0] if keys else "rowid"
+
+
+def enable_change_log(conn, tables):
+    """
+    Record every insert, update and delete on `tables` in a change_log table
+
+    Triggers append to the log inside the writing transaction, so the log
+    can never disagree with the tables it describes and every writer,
+    including bulk executemany paths, is captured without code changes.
+    Sequence numbers come from AUTOINCREMENT and are never reused. Rows
+    written before the log is enabled form the baseline snapshot.
+
+    Args:
+        conn: Open connection, or a path to a database file
+        tables: Table names to capture
+
+    Returns:
+        None
+    """
+    own = isinstance(conn, str)
+    if own:
+        conn = sqlite3.connect(conn)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS change_log (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        table_name TEXT NOT NULL,
+        operation TEXT NOT NULL,
+        row_key TEXT,
+        row_data TEXT,
+        changed_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+    )
+    """)
+    for table in [tables] if isinstance(tables, str) else tables:
+        columns, key = _columns(conn, table)
+        for operation in OPERATIONS:
+            row = "OLD" if operation == "delete" else "NEW"
+            payload = ", ".join(f"'{c}', {row}.{c}" for c in columns)
+            conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_change_log_{operation}
+            AFTER {operation.upper()} ON {table}
+            BEGIN
+                INSERT INTO change_log (table_name, operation, row_key, row_data)
+                VALUES ('{table}', '{operation}', {row}.{key}, json_object({payload}));
+            END
+            """)
+    conn.commit()
+    if own:
+        conn.close()
+
+
+def latest_seq(db_path):
+    """Highest sequence number in the log, 0 if it is empty or missing"""
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM change_log").fetchone()[0]
+    except sqlite3.OperationalError:
+        return 0
+    finally:
+        conn.close()
+
+
+def read_changes(db_path, since=0, limit=None, tables=None):
+    """
+    Read changes after a sequence number, oldest first
+
+    Args:
+        db_path: Database holding the change_log table
+        since: Last sequence number already applied downstream
+        limit: Maximum number of changes to return
+        tables: Optional table names to filter on
+
+    Returns:
+        list: Change tuples
+    """
+    sql = "SELECT seq, table_name, operation, row_key, row_data, changed_at FROM change_log WHERE seq > ?"
+    params = [since]
+    if tables:
+        sql += f" AND table_name IN ({', '.join('?' * len(tables))})"
+        params += list(tables)
+    sql += " ORDER BY seq"
+    if limit:
+        sql += " LIMIT ?"
+        params.append(limit)
+
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    rows = conn.execute(sql, params).fetchall()
+    conn.close()
+    return [
+        Change(seq, table, op, key, json.loads(data), at)
+        for seq, table, op, key, data, at in rows
+    ]
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(
+        description="Print changes from a database's change log as JSON lines"
+    )
+    parser.add_argument("db", help="Database with a change_log table")
+    parser.add_argument(
+        "--since", type=int, default=0, help="Last sequence number already applied"
+    )
+    parser.add_argument("--limit", type=int, default=None, help="Maximum changes")
+    parser.add_argument("--table", action="append", help="Only this table (repeatable)")
+    args = parser.parse_args()
+
+    for change in read_changes(args.db, args.since, args.limit, args.table):
+        sys.stdout.write(json.dumps(change._asdict()) + "\n")
@@ -87,3 +87,55 @@ BLOOD_TYPE_BY_ETHNICITY = {
         ("AB negative", 0.004),
     ],
 }
+
+# Relative likelihood of a blood drive by weekday (Monday first), averaging 1.0
+DRIVE_WEEKDAY_FACTORS = [1.05, 1.1, 1.1, 1.05, 1.0, 1.0, 0.7]
+
+# Seasonal swing in drive likelihood: two peaks a year (spring and autumn)
+# with the troughs landing in the summer and winter-holiday shortages
+DRIVE_SEASONAL_AMPLITUDE = 0.15
+DRIVE_SEASONAL_PEAK_DAY = 105  # day of year, mid-April
+
+# Drive likelihood on a public holiday relative to an ordinary day
+DRIVE_HOLIDAY_FACTOR = 0.2
+
+# Fixed-date holidays as (month, day)
+FIXED_HOLIDAYS = [(1, 1), (7, 4), (12, 24), (12, 25), (12, 31)]
+
+# Floating holidays as (month, weekday, nth); weekday 0 is Monday, nth -1 is last
+FLOATING_HOLIDAYS = [
+    (5, 0, -1),  # Memorial Day
+    (9, 0, 1),  # Labor Day
+    (11, 3, 4),  # Thanksgiving
+]
+
+# Red cell compatibility: recipient blood type -> donor types it can receive
+BLOOD_COMPATIBILITY = {
+    "O negative": ["O negative"],
+    "O positive": ["O negative", "O positive"],
+    "A negative": ["O negative", "A negative"],
+    "A positive": ["O negative", "O positive", "A negative", "A positive"],
+    "B negative": ["O negative", "B negative"],
+    "B positive": ["O negative", "O positive", "B negative", "B positive"],
+    "AB negative": ["O negative", "A negative", "B negative", "AB negative"],
+    "AB positive": [
+        "O negative",
+        "O positive",
+        "A negative",
+        "A positive",
+        "B negative",
+        "B positive",
+        "AB negative",
+        "AB positive",
+    ],
+}
+
+# Bounding box of the contiguous US as (min_lat, max_lat, min_lon, max_lon)
+CONTIGUOUS_US_BOUNDS = (24.5, 49.4, -124.8, -66.9)
+
+# Synthetic geography: donors live in one of REGION_COUNT ZIP-code regions,
+# each with its own ethnicity mix scattered around ETHNICITY_DISTRIBUTION.
+# Higher concentration keeps regional mixes closer to the national one.
+REGION_COUNT = 3000
+REGION_MIX_CONCENTRATION = 40
+REGION_SEED = 2024
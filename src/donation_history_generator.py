@@ -1,19 +1,81 @@
 import os
 import sqlite3
 import random
-import uuid
 from datetime import datetime, timedelta
 import logging
+import pickle
+from id_generator import IdGenerator
+from records import DonationRecord, write_sqlite
+from change_log import enable_change_log
+from summary_tables import donor_blood_types, ensure_summaries, record_donations
 
-# Setup logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Physical layouts for the donations table. "rowid" is the original table;
+# the others are WITHOUT ROWID tables clustered on their primary key, so a
+# date range or one donor's history sits on neighbouring pages.
+DONATION_LAYOUTS = {
+    "rowid": None,
+    "date": "PRIMARY KEY (donation_date, bag_id), UNIQUE (bag_id)",
+    "donor": "PRIMARY KEY (donor_id, donation_date, bag_id), UNIQUE (bag_id)",
+}
+
+# Sort keys matching each clustered primary key, for inserting in key order
+LAYOUT_SORT_KEYS = {
+    "rowid": None,
+    "date": lambda e: (e.donation_date, e.bag_id),
+    "donor": lambda e: (e.donor_id, e.donation_date, e.bag_id),
+}
+
+
+def donations_schema(layout="rowid"):
+    """
+    CREATE TABLE statement for the donations table in the given layout
+
+    Args:
+        layout: One of DONATION_LAYOUTS
+
+    Returns:
+        str: SQL statement
+    """
+    if layout not in DONATION_LAYOUTS:
+        raise ValueError(
+            f"Unknown donation layout {layout!r}, expected one of {list(DONATION_LAYOUTS)}"
+        )
+    if layout == "rowid":
+        return """
+        CREATE TABLE IF NOT EXISTS donations (
+            bag_id TEXT PRIMARY KEY,
+            donor_id TEXT,
+            event_id TEXT,
+            donation_date DATE,
+            test_date DATE,
+            test_result BOOLEAN,
+            status TEXT,
+            FOREIGN KEY (donor_id) REFERENCES donors(donor_id)
+        )
+        """
+    return f"""
+        CREATE TABLE IF NOT EXISTS donations (
+            bag_id TEXT NOT NULL,
+            donor_id TEXT NOT NULL,
+            event_id TEXT,
+            donation_date DATE NOT NULL,
+            test_date DATE,
+            test_result BOOLEAN,
+            status TEXT,
+            {DONATION_LAYOUTS[layout]},
+            FOREIGN KEY (donor_id) REFERENCES donors(donor_id)
+        ) WITHOUT ROWID
+        """
+
 
 class DonationHistoryGenerator:
     """Generates historical donation records based on specified parameters"""
 
-    def __init__(self, donor_db_path, donation_db_path, seed=42):
+    def __init__(
+        self, donor_db_path, donation_db_path, seed=42, layout="rowid", donor_cache=True
+    ):
         """
         Initialize the donation history generator
 
@@ -21,8 +83,18 @@ class DonationHistoryGenerator:
             donor_db_path: Path to the donors database
             donation_db_path: Path to the donations database
             seed: Random seed for reproducibility
+            layout: Physical layout of a newly created donations table, one of
+                DONATION_LAYOUTS
+            donor_cache: Pick donors for historical runs from the memory-mapped
+                columnar cache instead of querying SQLite on every drive
         """
+        donations_schema(layout)
         random.seed(seed)
+        self.layout = layout
+        self.use_donor_cache = donor_cache
+        self.donor_cache = None
+        self.seed = seed
+        self.ids = IdGenerator(seed)
         self.donor_db_path = donor_db_path
         self.donation_db_path = donation_db_path
 
@@ -31,29 +103,79 @@ class DonationHistoryGenerator:
         conn = sqlite3.connect(self.donation_db_path)
         cursor = conn.cursor()
 
+        cursor.execute(donations_schema(self.layout))
+        ensure_summaries(
+            conn, "donations",
+            self.donor_db_path if os.path.exists(self.donor_db_path) else None,
+        )
+
+        # Single-row record of a historical run, written in the same
+        # transaction as each simulated day so a crash can resume cleanly
         cursor.execute("""
-        CREATE TABLE IF NOT EXISTS donations (
-            bag_id TEXT PRIMARY KEY,
-            donor_id TEXT,
-            event_id TEXT,
-            donation_date DATE,
-            test_date DATE,
-            test_result BOOLEAN,
-            status TEXT,
-            FOREIGN KEY (donor_id) REFERENCES donors(donor_id)
+        CREATE TABLE IF NOT EXISTS generation_checkpoint (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            start_date DATE,
+            num_days INTEGER,
+            min_units INTEGER,
+            max_units INTEGER,
+            percent_chance REAL,
+            dynamic BOOLEAN,
+            seed INTEGER,
+            last_completed_date DATE,
+            rng_state BLOB,
+            completed BOOLEAN DEFAULT 0
         )
         """)
 
         conn.commit()
+        # Donations and donor updates made from here on are captured for
+        # incremental downstream loads
+        enable_change_log(conn, "donations")
         conn.close()
+        if os.path.exists(self.donor_db_path):
+            enable_change_log(self.donor_db_path, "donors")
         logger.info(f"Initialized donation database at {self.donation_db_path}")
 
-    def get_eligible_donors(self, current_date_str):
+    def connect_with_donors(self, db_path=None):
+        """
+        Open the donations database with the donors database attached
+
+        Writes to both files through this connection commit atomically, so
+        donations, donor updates and the checkpoint never drift apart.
+
+        Args:
+            db_path: Donations file to open, defaults to the main one
+
+        Returns:
+            sqlite3.Connection
+        """
+        conn = sqlite3.connect(db_path or self.donation_db_path)
+        conn.execute("ATTACH DATABASE ? AS donor_db", (self.donor_db_path,))
+        return conn
+
+    def open_donor_cache(self):
+        """
+        Map the columnar donor cache, rebuilding it if the database changed
+
+        While open, drives pick donors from the cache and keep its
+        last_donation column in step with the donor updates they write.
+
+        Returns:
+            DonorCache
+        """
+        # NumPy stays off the daily path, which never opens the cache
+        from donor_cache import DonorCache
+
+        self.donor_cache = DonorCache.open(self.donor_db_path)
+        return self.donor_cache
+
+    def get_eligible_donors(self, current_date_str, conn=None):
         """
         Get list of eligible donors who haven't donated in the past 56 days
         
         Args:
             current_date_str: Current date in 'YYYY-MM-DD' format
+            conn: Optional open connection from connect_with_donors()
             
         Returns:
             List of eligible donor records
@@ -62,8 +184,10 @@ class DonationHistoryGenerator:
             logger.error(f"Donor database not found at {self.donor_db_path}")
             return []
 
+        own_conn = conn is None
         try:
-            conn = sqlite3.connect(self.donor_db_path)
+            if own_conn:
+                conn = sqlite3.connect(self.donor_db_path)
             cursor = conn.cursor()
             
             # Convert date string to datetime for comparison
@@ -79,7 +203,8 @@ class DonationHistoryGenerator:
             """, (cutoff_date_str,))
             
             eligible_donors = cursor.fetchall()
-            conn.close()
+            if own_conn:
+                conn.close()
             
             logger.info(f"Found {len(eligible_donors)} eligible donors for {current_date_str}")
             return eligible_donors
@@ -138,9 +263,9 @@ class DonationHistoryGenerator:
             donor_blood_type: Blood type of the donor
 
         Returns:
-            dict: Donation event data
+            DonationRecord: Donation event data
         """
-        event_id = str(uuid.uuid4())
+        event_id = self.ids.uuid7(donation_date)
 
         # Generate donation with a random time between 8am and 5pm
         donation_datetime = datetime.strptime(donation_date, "%Y-%m-%d")
@@ -152,22 +277,22 @@ class DonationHistoryGenerator:
         # Test date is the day after donation
         test_date = (donation_datetime + timedelta(days=1)).strftime("%Y-%m-%d")
 
-        return {
-            "bag_id": f"{donor_blood_type}-{str(uuid.uuid4())[:8]}",
-            "donor_id": donor_id,
-            "event_id": event_id,
-            "donation_date": donation_date,
-            "test_date": test_date,
-            "test_result": random.random() < 0.998,  # 99.8% pass rate
-            "status": "available" if random.random() < 0.95 else "used",
-        }
+        return DonationRecord(
+            bag_id=self.ids.bag_id(donation_date, donor_blood_type),
+            donor_id=donor_id,
+            event_id=event_id,
+            donation_date=donation_date,
+            test_date=test_date,
+            test_result=random.random() < 0.998,  # 99.8% pass rate
+            status="available" if random.random() < 0.95 else "used",
+        )
 
     def save_donation_events(self, events):
         """
         Save donation events to the database
 
         Args:
-            events: List of donation event dictionaries
+            events: List of DonationRecord
 
         Returns:
             bool: True if successful
@@ -180,24 +305,7 @@ class DonationHistoryGenerator:
             conn = sqlite3.connect(self.donation_db_path)
             cursor = conn.cursor()
 
-            for event in events:
-                # Fixed: Added all necessary fields from event to the INSERT statement
-                cursor.execute(
-                    """
-                    INSERT INTO donations 
-                    (bag_id, donor_id, event_id, donation_date, test_date, test_result, status)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        event["bag_id"],
-                        event["donor_id"],
-                        event["event_id"],
-                        event["donation_date"],
-                        event["test_date"],
-                        event["test_result"],
-                        event["status"],
-                    ),
-                )
+            self.insert_donations(cursor, events)
 
             conn.commit()
             conn.close()
@@ -208,7 +316,67 @@ class DonationHistoryGenerator:
             logger.error(f"Error saving donation events: {e}")
             return False
 
-    def generate_daily_donations(self, date_str, min_units, max_units, percent_chance):
+    def donor_blood_types(self, events, conn=None):
+        """
+        Blood type of each event's donor, read from the donors database
+
+        Args:
+            events: DonationRecord instances
+            conn: Optional connection from connect_with_donors(); used so
+                the lookup runs inside the caller's transaction
+
+        Returns:
+            dict: {donor_id: blood_type}
+        """
+        donor_ids = [event.donor_id for event in events]
+        if conn is not None:
+            attached = [row[1] for row in conn.execute("PRAGMA database_list")]
+            if "donor_db" in attached:
+                return donor_blood_types(conn, donor_ids)
+        if not os.path.exists(self.donor_db_path):
+            return {}
+        donor_conn = sqlite3.connect(self.donor_db_path)
+        try:
+            return donor_blood_types(donor_conn, donor_ids)
+        finally:
+            donor_conn.close()
+
+    def insert_donations(self, cursor, events, blood_types=None):
+        """
+        Insert donation events with a single executemany
+
+        With a clustered layout events are sorted into primary key order
+        first, so they append to the B-tree instead of splitting pages. The
+        daily_units summary is updated on the same cursor, so it commits with
+        the rows.
+
+        Args:
+            cursor: Cursor on the donations database
+            events: DonationRecord instances
+            blood_types: {donor_id: blood_type} for the events' donors;
+                looked up with donor_blood_types() if not given
+        """
+        if blood_types is None:
+            blood_types = self.donor_blood_types(events, cursor.connection)
+        key = LAYOUT_SORT_KEYS[self.layout]
+        if key is not None:
+            events = sorted(events, key=key)
+        write_sqlite(cursor, "donations", events, DonationRecord)
+        record_donations(cursor, events, blood_types)
+
+    @staticmethod
+    def _record_donations(cursor, events):
+        """Bump last_donation_date and total_donations for each event's donor"""
+        cursor.executemany(
+            """
+            UPDATE donors 
+            SET last_donation_date = ?, total_donations = COALESCE(total_donations, 0) + 1 
+            WHERE donor_id = ?
+            """,
+            [(event.donation_date, event.donor_id) for event in events],
+        )
+
+    def generate_daily_donations(self, date_str, min_units, max_units, percent_chance, conn=None):
         """
         Generate donations for a single day if a blood drive occurs
 
@@ -217,6 +385,8 @@ class DonationHistoryGenerator:
             min_units: Minimum number of units to collect
             max_units: Maximum number of units to collect
             percent_chance: Chance of a blood drive occurring
+            conn: Optional open connection from connect_with_donors(), passed
+                on to generate_drive_donations()
 
         Returns:
             list: List of donation events, empty if no blood drive
@@ -228,89 +398,247 @@ class DonationHistoryGenerator:
 
         # Determine number of units to collect
         units_to_collect = random.randint(min_units, max_units)
+        return self.generate_drive_donations(date_str, units_to_collect, conn)
+
+    def generate_drive_donations(self, date_str, units_to_collect, conn=None):
+        """
+        Generate donations for a blood drive with a known target
+
+        Donor updates for the drive are written with one batched UPDATE. With
+        a connection from connect_with_donors() they join the caller's
+        transaction; otherwise they are committed to the donors database here.
+
+        Args:
+            date_str: The date of the blood drive in 'YYYY-MM-DD' format
+            units_to_collect: Target number of units for the drive
+            conn: Optional open connection from connect_with_donors()
+
+        Returns:
+            list: List of donation events
+        """
         logger.info(f"Blood drive on {date_str} with target of {units_to_collect} units")
 
-        # Get eligible donors for this date
-        eligible_donors = self.get_eligible_donors(date_str)
-        if not eligible_donors:
+        if self.donor_cache is not None:
+            donors = self._sample_cached_donors(date_str, units_to_collect)
+        else:
+            donors = self._sample_donors(date_str, units_to_collect, conn)
+        if not donors:
             logger.warning(f"No eligible donors available for {date_str}")
             return []
 
+        donation_events = [
+            self.generate_donation_event(date_str, donor_id, blood_type)
+            for donor_id, blood_type in donors
+        ]
+
+        # Update the donors' information
+        if conn is not None:
+            self._record_donations(conn.cursor(), donation_events)
+        else:
+            donor_conn = sqlite3.connect(self.donor_db_path)
+            self._record_donations(donor_conn.cursor(), donation_events)
+            donor_conn.commit()
+            donor_conn.close()
+
+        logger.info(f"Generated {len(donation_events)} donations for {date_str}")
+        return donation_events
+
+    def _sample_donors(self, date_str, units_to_collect, conn=None):
+        """Up to units_to_collect random eligible (donor_id, blood_type) pairs"""
+        eligible_donors = self.get_eligible_donors(date_str, conn)
+
         # Column indices from the donors table
         DONOR_ID_IDX = 0
         BLOOD_TYPE_IDX = 7
 
-        donation_events = []
         random.shuffle(eligible_donors)  # Randomize donor order
+        return [
+            (donor[DONOR_ID_IDX], donor[BLOOD_TYPE_IDX])
+            for donor in eligible_donors[:units_to_collect]
+        ]
 
-        # Go through donors until we collect enough units or run out of eligible donors
-        for donor in eligible_donors:
-            if len(donation_events) >= units_to_collect:
-                break
-
-            donor_id = donor[DONOR_ID_IDX]
-            blood_type = donor[BLOOD_TYPE_IDX]
-
-            # Create donation event
-            donation_event = self.generate_donation_event(date_str, donor_id, blood_type)
-            donation_events.append(donation_event)
+    def _sample_cached_donors(self, date_str, units_to_collect):
+        """
+        Same as _sample_donors, filtering and sampling on the cache's arrays
 
-            # Update donor's information
-            self.update_donor_donation_info(donor_id, date_str)
+        Only the chosen donors are turned into Python values. Their
+        last_donation is set in the cache straight away, matching the
+        UPDATE the caller writes.
+        """
+        cache = self.donor_cache
+        eligible = cache.eligible(date_str)
+        picks = random.sample(range(len(eligible)), min(units_to_collect, len(eligible)))
+        positions = eligible[picks]
+        cache.record_donations(positions, date_str)
+        return [
+            (cache.value("donor_id", p), cache.value("blood_type", p)) for p in positions
+        ]
+
+    def load_checkpoint(self, conn=None):
+        """
+        Read the checkpoint of the last historical run, if any
 
-        logger.info(f"Generated {len(donation_events)} donations for {date_str}")
-        return donation_events
+        Args:
+            conn: Optional open connection to the donations database
 
-    def generate_historical_data(self, num_days, min_units, max_units, percent_chance):
+        Returns:
+            dict: Checkpoint columns, or None if no run has been recorded
+        """
+        if conn is None and not os.path.exists(self.donation_db_path):
+            return None
+        own_conn = conn is None
+        if own_conn:
+            conn = sqlite3.connect(self.donation_db_path)
+        try:
+            cursor = conn.execute("SELECT * FROM generation_checkpoint WHERE id = 1")
+            row = cursor.fetchone()
+            columns = [d[0] for d in cursor.description]
+        except sqlite3.OperationalError:
+            # Databases created before checkpointing have no such table
+            row = None
+        finally:
+            if own_conn:
+                conn.close()
+        return dict(zip(columns, row)) if row else None
+
+    def has_unfinished_run(self):
+        """True if a historical run was checkpointed but never completed"""
+        checkpoint = self.load_checkpoint()
+        return bool(checkpoint) and not checkpoint["completed"]
+
+    def _rng_state(self):
+        return pickle.dumps({"random": random.getstate(), "ids": self.ids.getstate()})
+
+    def _restore_rng_state(self, blob):
+        state = pickle.loads(blob)
+        random.setstate(state["random"])
+        self.ids.setstate(state["ids"])
+
+    def generate_historical_data(
+        self, num_days, min_units, max_units, percent_chance, dynamic=True, resume=True
+    ):
         """
         Generate historical donation data for the specified number of days
 
+        The whole calendar is planned up front, so only drive days are visited.
+        Each drive day's donations, donor updates and the checkpoint (last
+        completed day plus RNG state) commit as one transaction. If an
+        unfinished run is found it is resumed with its recorded parameters.
+
         Args:
             num_days: Number of days in the past to generate data for
             min_units: Minimum number of units per blood drive
             max_units: Maximum number of units per blood drive
             percent_chance: Percentage chance of a blood drive on any day
+            dynamic: Vary the drive chance by weekday, season and holidays
+            resume: Continue an unfinished checkpointed run if there is one
 
         Returns:
             bool: True if successful
         """
+        # NumPy is only needed for planning, keep it off the daily path
+        from drive_calendar import plan_drives
+
         # Initialize the donation database first to ensure table exists
         self.initialize_donation_database()
 
-        # Get the current date and calculate start date
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=num_days)
+        conn = self.connect_with_donors()
+        cursor = conn.cursor()
+        checkpoint = self.load_checkpoint(conn)
+
+        if resume and checkpoint and not checkpoint["completed"]:
+            start_date = datetime.strptime(checkpoint["start_date"], "%Y-%m-%d")
+            num_days = checkpoint["num_days"]
+            min_units = checkpoint["min_units"]
+            max_units = checkpoint["max_units"]
+            percent_chance = checkpoint["percent_chance"]
+            dynamic = bool(checkpoint["dynamic"])
+            self.seed = checkpoint["seed"]
+            last_completed = checkpoint["last_completed_date"]
+            if checkpoint["rng_state"] is not None:
+                self._restore_rng_state(checkpoint["rng_state"])
+            logger.info(
+                f"Resuming historical run from {start_date:%Y-%m-%d} after {last_completed}"
+            )
+        else:
+            # Get the current date and calculate start date
+            start_date = datetime.now() - timedelta(days=num_days)
+            last_completed = None
+            cursor.execute(
+                """
+                INSERT OR REPLACE INTO generation_checkpoint
+                (id, start_date, num_days, min_units, max_units, percent_chance, dynamic, seed, last_completed_date, rng_state, completed)
+                VALUES (1, ?, ?, ?, ?, ?, ?, ?, NULL, ?, 0)
+                """,
+                (
+                    start_date.strftime("%Y-%m-%d"),
+                    num_days,
+                    min_units,
+                    max_units,
+                    percent_chance,
+                    dynamic,
+                    self.seed,
+                    self._rng_state(),
+                ),
+            )
+            conn.commit()
+
+        # Opened after every schema change to the donors file, so the cache
+        # stamp matches the database the drives start from
+        if self.use_donor_cache:
+            self.open_donor_cache()
+
+        drives = plan_drives(
+            start_date.date(),
+            num_days + 1,
+            percent_chance,
+            min_units,
+            max_units,
+            self.seed,
+            dynamic,
+        )
 
-        current_date = start_date
         total_events = 0
-        total_days_processed = 0
+        try:
+            for drive_number, (date_str, units_to_collect) in enumerate(drives, start=1):
+                if last_completed and date_str <= last_completed:
+                    continue
 
-        while current_date <= end_date:
-            date_str = current_date.strftime("%Y-%m-%d")
-            total_days_processed += 1
+                # Generate and save this drive's donations as one unit
+                daily_events = self.generate_drive_donations(
+                    date_str, units_to_collect, conn
+                )
+                if daily_events:
+                    self.insert_donations(cursor, daily_events)
+                cursor.execute(
+                    """
+                    UPDATE generation_checkpoint
+                    SET last_completed_date = ?, rng_state = ?
+                    WHERE id = 1
+                    """,
+                    (date_str, self._rng_state()),
+                )
+                conn.commit()
+                total_events += len(daily_events)
 
-            # Generate donations for this day
-            daily_events = self.generate_daily_donations(
-                date_str, min_units, max_units, percent_chance
-            )
+                # Log progress every 30 drives
+                if drive_number % 30 == 0:
+                    logger.info(
+                        f"Processed {drive_number}/{len(drives)} blood drives, generated {total_events} events so far"
+                    )
 
-            # Save events if any were generated
-            if daily_events:
-                success = self.save_donation_events(daily_events)
-                if success:
-                    total_events += len(daily_events)
-                    logger.info(f"Successfully saved {len(daily_events)} events for {date_str}")
-                else:
-                    logger.error(f"Failed to save events for {date_str}")
-
-            # Move to next day
-            current_date += timedelta(days=1)
-
-            # Log progress every 30 days
-            if total_days_processed % 30 == 0:
-                logger.info(
-                    f"Processed {total_days_processed}/{num_days} days, generated {total_events} events so far"
-                )
+            cursor.execute("UPDATE generation_checkpoint SET completed = 1 WHERE id = 1")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            # The cache may hold updates that were rolled back
+            self.donor_cache = None
+            raise
+        finally:
+            conn.close()
+
+        if self.donor_cache is not None:
+            self.donor_cache.sync()
 
         logger.info(
             f"Historical data generation complete. Generated {total_events} donations over {num_days} days"
@@ -321,6 +649,9 @@ class DonationHistoryGenerator:
         """
         Generate a separate SQLite file for today's donations
 
+        The day's donations and the donor updates they imply commit as one
+        transaction across both files, so a failure leaves neither behind.
+
         Args:
             min_units: Minimum number of units per blood drive
             max_units: Maximum number of units per blood drive
@@ -330,63 +661,60 @@ class DonationHistoryGenerator:
             str: Path to the generated file, or None if no blood drive
         """
         today = datetime.now().strftime("%Y-%m-%d")
-
-        # Generate today's donations
-        daily_events = self.generate_daily_donations(
-            today, min_units, max_units, percent_chance
-        )
-
-        if not daily_events:
-            logger.info(f"No blood drive today ({today})")
-            return None
+        enable_change_log(self.donor_db_path, "donors")
 
         # Create a new database file for today
         data_dir = os.path.dirname(self.donation_db_path)
         today_db_path = os.path.join(data_dir, f"{today}_activity.sqlite3")
+        created = not os.path.exists(today_db_path)
 
         # Create the database and table
-        conn = sqlite3.connect(today_db_path)
+        conn = self.connect_with_donors(today_db_path)
         cursor = conn.cursor()
+        daily_events = None
+        try:
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS donations (
+                bag_id TEXT PRIMARY KEY,
+                donor_id TEXT,
+                event_id TEXT,
+                donation_date DATE,
+                test_date DATE,
+                test_result BOOLEAN,
+                status TEXT
+            )
+            """)
 
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS donations (
-            bag_id TEXT PRIMARY KEY,
-            donor_id TEXT,
-            event_id TEXT,
-            donation_date DATE,
-            test_date DATE,
-            test_result BOOLEAN,
-            status TEXT
-        )
-        """)
+            ensure_summaries(conn, "donations")
+            enable_change_log(conn, "donations")
+            conn.commit()
 
-        # Save the events
-        for event in daily_events:
-            cursor.execute(
-                """
-                INSERT INTO donations 
-                (bag_id, donor_id, event_id, donation_date, test_date, test_result, status)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    event["bag_id"],
-                    event["donor_id"],
-                    event["event_id"],
-                    event["donation_date"],
-                    event["test_date"],
-                    event["test_result"],
-                    event["status"],
-                ),
+            # Generate today's donations; donor updates join this transaction
+            daily_events = self.generate_daily_donations(
+                today, min_units, max_units, percent_chance, conn
             )
+            if daily_events:
+                # Save the events
+                self.insert_donations(cursor, daily_events)
+                conn.commit()
+        except Exception:
+            conn.rollback()
+            daily_events = None
+            raise
+        finally:
+            conn.close()
+            if not daily_events and created:
+                os.remove(today_db_path)
 
-        conn.commit()
-        conn.close()
+        if not daily_events:
+            logger.info(f"No blood drive today ({today})")
+            return None
 
         logger.info(
             f"Generated {len(daily_events)} donations for today, saved to {today_db_path}"
         )
         return today_db_path
-        
+
     def check_donation_records(self):
         """
         Check if donation records exist in the database
@@ -0,0 +1,231 @@
+import os
+import json
+import shutil
+import sqlite3
+import logging
+import argparse
+from datetime import date
+
+import numpy as np
+
+from query_service import database_version
+
+logger = logging.getLogger(__name__)
+
+CACHE_SUFFIX = ".columns"
+META = "meta.json"
+
+# Text columns stored as uint8 codes into a vocabulary kept in the metadata
+CATEGORICAL = ("blood_type", "sex", "ethnicity")
+
+# Days a donor must wait between donations
+DONATION_INTERVAL = 56
+
+# Python ordinal of a date from SQLite's julianday(); 0 stands for "never"
+ORDINAL_SQL = "COALESCE(CAST(julianday({}) - 1721424.5 AS INTEGER), 0)"
+
+BUILD_CHUNK = 100_000
+
+
+def cache_dir(db_path):
+    """Directory holding the columnar cache of a donors database"""
+    return os.path.abspath(db_path) + CACHE_SUFFIX
+
+
+class DonorCache:
+    """
+    Fixed-width columns of the donors table, memory-mapped from .npy files
+
+    Columns are rowid (int64), donor_id (fixed-width bytes), blood_type, sex
+    and ethnicity codes (uint8), age (int16) and last_donation (int32 date
+    ordinal, 0 if the donor never gave). Opening a valid cache maps the
+    files without reading them, so startup costs the same at any size.
+    The cache is valid while the database's version stamp matches the one
+    it was built from; last_donation is mapped copy-on-write so a
+    simulation can update it in memory and sync() it back afterwards.
+    """
+
+    def __init__(self, db_path, directory, columns, vocab, stamp):
+        self.db_path = db_path
+        self.directory = directory
+        self.columns = columns
+        self.vocab = vocab
+        self.stamp = stamp
+
+    @classmethod
+    def open(cls, db_path, rebuild=False):
+        """
+        Map the cache for db_path, building it first if missing or stale
+
+        Args:
+            db_path: Donors database
+            rebuild: Rebuild even if the cache looks current
+
+        Returns:
+            DonorCache
+        """
+        directory = cache_dir(db_path)
+        stamp = list(database_version(db_path))
+        meta = None
+        meta_path = os.path.join(directory, META)
+        if not rebuild and os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta["stamp"] != stamp:
+                logger.info(f"Donor cache for {db_path} is stale, rebuilding")
+                meta = None
+        if meta is None:
+            meta = cls.build(db_path, directory, stamp)
+
+        columns = {
+            name: np.load(
+                os.path.join(directory, f"{name}.npy"),
+                mmap_mode="c" if name == "last_donation" else "r",
+            )
+            for name in meta["columns"]
+        }
+        return cls(db_path, directory, columns, meta["vocab"], stamp)
+
+    @staticmethod
+    def build(db_path, directory, stamp=None):
+        """
+        Write the columnar cache of a donors database
+
+        Rows are read in rowid order, in chunks, and go straight into
+        preallocated arrays. The metadata holding the version stamp is
+        written last, so an interrupted build is never mistaken for a
+        valid cache.
+
+        Returns:
+            dict: The metadata written
+        """
+        stamp = stamp or list(database_version(db_path))
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        count = conn.execute("SELECT COUNT(*) FROM donors").fetchone()[0]
+        width = conn.execute("SELECT COALESCE(MAX(LENGTH(donor_id)), 1) FROM donors").fetchone()[0]
+
+        columns = {
+            "rowid": np.empty(count, dtype=np.int64),
+            "donor_id": np.empty(count, dtype=f"S{width}"),
+            "age": np.empty(count, dtype=np.int16),
+            "last_donation": np.empty(count, dtype=np.int32),
+            **{name: np.empty(count, dtype=np.uint8) for name in CATEGORICAL},
+        }
+        codes = {name: {} for name in CATEGORICAL}
+        cursor = conn.execute(f"""
+            SELECT rowid, donor_id, COALESCE(age, -1), {ORDINAL_SQL.format("last_donation_date")},
+                   {", ".join(CATEGORICAL)}
+            FROM donors ORDER BY rowid
+        """)
+        start = 0
+        while True:
+            rows = cursor.fetchmany(BUILD_CHUNK)
+            if not rows:
+                break
+            stop = start + len(rows)
+            fields = list(zip(*rows))
+            columns["rowid"][start:stop] = fields[0]
+            columns["donor_id"][start:stop] = [d.encode() for d in fields[1]]
+            columns["age"][start:stop] = fields[2]
+            columns["last_donation"][start:stop] = fields[3]
+            for name, values in zip(CATEGORICAL, fields[4:]):
+                lookup = codes[name]
+                columns[name][start:stop] = [
+                    lookup.setdefault(v, len(lookup)) for v in values
+                ]
+            start = stop
+        conn.close()
+
+        os.makedirs(directory, exist_ok=True)
+        meta_path = os.path.join(directory, META)
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        for name, values in columns.items():
+            np.save(os.path.join(directory, f"{name}.npy"), values)
+        meta = {
+            "stamp": stamp,
+            "rows": count,
+            "columns": list(columns),
+            "vocab": {name: list(lookup) for name, lookup in codes.items()},
+        }
+        with open(meta_path + ".tmp", "w") as f:
+            json.dump(meta, f)
+        os.replace(meta_path + ".tmp", meta_path)
+        logger.info(f"Built donor cache for {count} donors at {directory}")
+        return meta
+
+    def __len__(self):
+        return len(self.columns["rowid"])
+
+    def eligible(self, on_date, interval=DONATION_INTERVAL):
+        """
+        Positions of donors who may donate on a date
+
+        Args:
+            on_date: 'YYYY-MM-DD' string or date
+            interval: Days required since the last donation
+
+        Returns:
+            np.ndarray: int64 positions in rowid order
+        """
+        if isinstance(on_date, str):
+            on_date = date.fromisoformat(on_date)
+        return np.flatnonzero(self.columns["last_donation"] <= on_date.toordinal() - interval)
+
+    def value(self, name, position):
+        """Decoded value of one column for the donor at position"""
+        raw = self.columns[name][position]
+        if name in self.vocab:
+            return self.vocab[name][raw]
+        if name == "donor_id":
+            return raw.decode()
+        return raw.item()
+
+    def record_donations(self, positions, on_date):
+        """Set last_donation for donors who gave on a date"""
+        if isinstance(on_date, str):
+            on_date = date.fromisoformat(on_date)
+        self.columns["last_donation"][positions] = on_date.toordinal()
+
+    def sync(self):
+        """
+        Persist last_donation and re-stamp the cache after the caller's writes
+
+        Only call this right after committing the same donor updates to the
+        database, with no other writer in between; the cache then matches
+        the database again and the next start needs no rebuild.
+        """
+        path = os.path.join(self.directory, "last_donation.npy")
+        meta_path = os.path.join(self.directory, META)
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta["stamp"] != self.stamp:
+            logger.warning(f"Donor cache at {self.directory} changed underneath, not syncing")
+            return False
+        np.save(path + ".tmp.npy", np.asarray(self.columns["last_donation"]))
+        os.replace(path + ".tmp.npy", path)
+        self.stamp = meta["stamp"] = list(database_version(self.db_path))
+        with open(meta_path + ".tmp", "w") as f:
+            json.dump(meta, f)
+        os.replace(meta_path + ".tmp", meta_path)
+        return True
+
+    def clear(self):
+        """Delete the cache files"""
+        self.columns = {}
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    from main import DONOR_DB_PATH
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(
+        description="Build or inspect the columnar donor cache next to a donors database"
+    )
+    parser.add_argument("--db", default=DONOR_DB_PATH, help="Donors database")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild even if current")
+    args = parser.parse_args()
+
+    cache = DonorCache.open(args.db, rebuild=args.rebuild)
+    print(f"{len(cache)} donors cached at {cache.directory}")
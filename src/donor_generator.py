@@ -1,25 +1,47 @@
-import uuid
 import random
+from functools import lru_cache
 from datetime import datetime, timedelta
 from faker import Faker
 import factory
 from constants import (
     AGE_DISTRIBUTION_2024,
     SEX_DISTRIBUTION_2024,
-    ETHNICITY_DISTRIBUTION,
-    BLOOD_TYPE_BY_ETHNICITY,
 )
+from id_generator import IdGenerator
+from records import DonorRecord
+from geography import (
+    ETHNICITIES,
+    regions,
+    region_table,
+    ethnicity_table,
+    blood_type_table,
+)
+
+
+@lru_cache(maxsize=None)
+def get_fake():
+    """Shared Faker instance, built on first use since loading locales is slow"""
+    return Faker()
+
 
-fake = Faker()
+# Donor IDs are time-ordered and derived from the run seed; reseed with
+# donor_ids.seed(seed) to reproduce a run
+donor_ids = IdGenerator()
 
 
 class DonorFactory(factory.Factory):
     class Meta:
-        model = dict
+        model = DonorRecord
 
-    donor_id = factory.LazyFunction(lambda: str(uuid.uuid4()))
-    unique_id = factory.LazyFunction(lambda: f"DON-{str(uuid.uuid4())[:8]}")
-    name = factory.LazyFunction(fake.name)
+    class Params:
+        region = factory.LazyFunction(lambda: DonorFactory._generate_region())
+        donation_history = factory.LazyAttribute(
+            lambda obj: DonorFactory._generate_donation_dates(obj.birthdate, obj.age)
+        )
+
+    donor_id = factory.LazyFunction(lambda: donor_ids.uuid7())
+    unique_id = factory.LazyFunction(lambda: donor_ids.unique_id("DON"))
+    name = factory.LazyFunction(lambda: get_fake().name())
 
     age = factory.LazyAttribute(lambda _: DonorFactory._generate_age())
     birthdate = factory.LazyAttribute(
@@ -29,20 +51,18 @@ class DonorFactory(factory.Factory):
     )
 
     sex = factory.LazyAttribute(lambda _: DonorFactory._generate_sex())
-    ethnicity = factory.LazyAttribute(lambda _: DonorFactory._generate_ethnicity())
+    zip_code = factory.LazyAttribute(lambda obj: regions()[obj.region].zip_code)
+    ethnicity = factory.LazyAttribute(
+        lambda obj: DonorFactory._generate_ethnicity(obj.region)
+    )
     blood_type = factory.LazyAttribute(
         lambda obj: DonorFactory._generate_blood_type(obj.ethnicity)
     )
 
-    first_donation_date = factory.LazyAttribute(
-        lambda obj: DonorFactory._generate_donation_dates(obj.birthdate, obj.age)[0]
-    )
-    last_donation_date = factory.LazyAttribute(
-        lambda obj: DonorFactory._generate_donation_dates(obj.birthdate, obj.age)[1]
-    )
-    total_donations = factory.LazyAttribute(
-        lambda obj: DonorFactory._generate_donation_dates(obj.birthdate, obj.age)[2]
-    )
+    # Drawn once per donor so the first date, last date and count agree
+    first_donation_date = factory.LazyAttribute(lambda obj: obj.donation_history[0])
+    last_donation_date = factory.LazyAttribute(lambda obj: obj.donation_history[1])
+    total_donations = factory.LazyAttribute(lambda obj: obj.donation_history[2])
 
     @staticmethod
     def _generate_age():
@@ -63,25 +83,18 @@ class DonorFactory(factory.Factory):
         return "Male" if random.random() <= SEX_DISTRIBUTION_2024[0][1] else "Female"
 
     @staticmethod
-    def _generate_ethnicity():
-        ethnicity_rand = random.random()
-        cumulative_prob = 0
-        for eth, prob in ETHNICITY_DISTRIBUTION:
-            cumulative_prob += prob
-            if ethnicity_rand <= cumulative_prob:
-                return eth
-        return ETHNICITY_DISTRIBUTION[0][0]
+    def _generate_region():
+        return region_table().sample(random.random())
+
+    @staticmethod
+    def _generate_ethnicity(region=None):
+        # Alias tables are built once per region and cached, so each draw is O(1)
+        return ETHNICITIES[ethnicity_table(region).sample(random.random())]
 
     @staticmethod
     def _generate_blood_type(ethnicity):
-        blood_type_dist = BLOOD_TYPE_BY_ETHNICITY[ethnicity]
-        blood_type_rand = random.random()
-        cumulative_prob = 0
-        for bt, prob in blood_type_dist:
-            cumulative_prob += prob
-            if blood_type_rand <= cumulative_prob:
-                return bt
-        return blood_type_dist[0][0]
+        table, blood_types = blood_type_table(ethnicity)
+        return blood_types[table.sample(random.random())]
 
     @staticmethod
     def _generate_donation_dates(birthdate_str, age):
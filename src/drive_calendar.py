@@ -0,0 +1,112 @@
+import calendar
+import logging
+from datetime import date, timedelta
+
+import numpy as np
+
+from constants import (
+    DRIVE_WEEKDAY_FACTORS,
+    DRIVE_SEASONAL_AMPLITUDE,
+    DRIVE_SEASONAL_PEAK_DAY,
+    DRIVE_HOLIDAY_FACTOR,
+    FIXED_HOLIDAYS,
+    FLOATING_HOLIDAYS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def holidays(year):
+    """
+    Public holidays for a year
+
+    Args:
+        year: Calendar year
+
+    Returns:
+        list: date objects for FIXED_HOLIDAYS and FLOATING_HOLIDAYS
+    """
+    days = [date(year, month, day) for month, day in FIXED_HOLIDAYS]
+    for month, weekday, nth in FLOATING_HOLIDAYS:
+        matches = [
+            week[weekday]
+            for week in calendar.monthcalendar(year, month)
+            if week[weekday]
+        ]
+        days.append(date(year, month, matches[nth - 1 if nth > 0 else nth]))
+    return days
+
+
+def drive_probabilities(start_date, num_days, percent_chance, dynamic=True):
+    """
+    Probability of a blood drive on each day of a date range
+
+    Args:
+        start_date: First day of the range (date)
+        num_days: Number of days in the range
+        percent_chance: Average percentage chance of a blood drive
+        dynamic: Apply weekday, seasonal and holiday effects; if False every
+            day has the same probability
+
+    Returns:
+        np.ndarray: Probabilities in [0, 1], one per day
+    """
+    rate = np.full(num_days, percent_chance / 100, dtype=np.float64)
+    if not dynamic:
+        return rate
+
+    ordinals = start_date.toordinal() + np.arange(num_days)
+    # date.toordinal() 1 is a Monday, so (ordinal - 1) % 7 is date.weekday()
+    rate *= np.asarray(DRIVE_WEEKDAY_FACTORS)[(ordinals - 1) % 7]
+
+    last_date = start_date + timedelta(days=num_days - 1)
+    year_starts = {
+        year: date(year, 1, 1).toordinal()
+        for year in range(start_date.year, last_date.year + 1)
+    }
+    # Day of year, measured from each day's own 1 January
+    starts = np.array(list(year_starts.values()))
+    day_of_year = ordinals - starts[np.searchsorted(starts, ordinals, side="right") - 1]
+    rate *= 1 + DRIVE_SEASONAL_AMPLITUDE * np.cos(
+        4 * np.pi * (day_of_year - DRIVE_SEASONAL_PEAK_DAY) / 365.25
+    )
+
+    holiday_ordinals = [
+        day.toordinal() for year in year_starts for day in holidays(year)
+    ]
+    rate[np.isin(ordinals, holiday_ordinals)] *= DRIVE_HOLIDAY_FACTOR
+
+    return np.clip(rate, 0.0, 1.0)
+
+
+def plan_drives(
+    start_date, num_days, percent_chance, min_units, max_units, seed=42, dynamic=True
+):
+    """
+    Decide which days have a blood drive and each drive's target units
+
+    All days are drawn in one vectorised step, so callers only need to visit
+    the drive days.
+
+    Args:
+        start_date: First day of the range (date)
+        num_days: Number of days in the range
+        percent_chance: Average percentage chance of a blood drive
+        min_units: Minimum number of units per blood drive
+        max_units: Maximum number of units per blood drive
+        seed: Random seed for reproducibility
+        dynamic: Apply weekday, seasonal and holiday effects
+
+    Returns:
+        list: (date_str, units_to_collect) tuples in date order
+    """
+    rng = np.random.default_rng(seed)
+    probabilities = drive_probabilities(start_date, num_days, percent_chance, dynamic)
+    drive_days = np.flatnonzero(rng.random(num_days) < probabilities)
+    units = rng.integers(min_units, max_units, size=len(drive_days), endpoint=True)
+
+    logger.info(f"Planned {len(drive_days)} blood drives over {num_days} days")
+    return [
+        ((start_date + timedelta(days=int(offset))).strftime("%Y-%m-%d"), int(n))
+        for offset, n in zip(drive_days, units)
+    ]
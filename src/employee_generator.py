@@ -2,36 +2,48 @@ import os
 import uuid
 import sqlite3
 import logging
+import argparse
+from datetime import date
+from functools import lru_cache
 from faker import Faker
 import factory
+from records import EmployeeRecord, write_sqlite
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 DATA_DIR = os.path.join(ROOT_DIR, "data")
-os.makedirs(DATA_DIR, exist_ok=True)
 EMPLOYEE_DB_PATH = os.path.join(DATA_DIR, "employees.sqlite3")
 
-fake = Faker()
+# Ten years of hire dates, counted in days so the window exists on Feb 29
+HIRE_WINDOW_DAYS = 3652
+
+
+@lru_cache(maxsize=None)
+def get_fake():
+    """Shared Faker instance, built on first use since loading locales is slow"""
+    return Faker()
 
 
 class EmployeeFactory(factory.Factory):
     class Meta:
-        model = dict
+        model = EmployeeRecord
 
     employee_id = factory.LazyFunction(lambda: str(uuid.uuid4()))
-    name = factory.LazyFunction(lambda: fake.name())
+    name = factory.LazyFunction(lambda: get_fake().name())
     hire_date = factory.LazyFunction(
-        lambda: fake.date_between(start_date="-10y", end_date="today")
+        lambda: get_fake()
+        .date_between(start_date="-10y", end_date="today")
+        .isoformat()
     )
 
 
-def create_employee_db():
+def create_employee_db(db_path=EMPLOYEE_DB_PATH):
     """Create the employees database if it doesn't exist."""
-    logger.info(f"Creating employees database at {EMPLOYEE_DB_PATH}")
+    logger.info(f"Creating employees database at {db_path}")
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
 
-    conn = sqlite3.connect(EMPLOYEE_DB_PATH)
+    conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
 
     cursor.execute("""
@@ -63,7 +75,7 @@ def generate_employees(num_employees=50):
         try:
             cursor.execute(
                 "INSERT INTO employees (employee_id, name, hire_date) VALUES (?, ?, ?)",
-                (employee["employee_id"], employee["name"], employee["hire_date"]),
+                employee,
             )
         except sqlite3.IntegrityError:
             logger.warning(f"Duplicate employee ID generated, skipping")
@@ -75,9 +87,64 @@ def generate_employees(num_employees=50):
     logger.info(f"Successfully generated {num_employees} employees")
 
 
-def get_employee_count():
+def generate_employees_bulk(num_employees, seed=42, db_path=EMPLOYEE_DB_PATH):
+    """
+    Generate a large roster of employees in one vectorised pass.
+
+    Hire dates are drawn as day offsets over the last ten years, names come
+    from the pooled Faker name lists, and all rows are written with a single
+    INSERT OR IGNORE executemany in one transaction, so duplicate IDs are
+    dropped by SQLite rather than caught row by row.
+
+    Args:
+        num_employees: Number of employees to generate
+        seed: Random seed for reproducibility
+        db_path: Path to the employees database
+
+    Returns:
+        int: Number of employees inserted
+    """
+    import numpy as np
+    from name_pool import draw_names
+    from id_generator import IdGenerator
+
+    logger.info(f"Generating {num_employees} employees in bulk")
+    create_employee_db(db_path)
+
+    rng = np.random.default_rng(seed)
+    today = date.today()
+    offsets = rng.integers(0, HIRE_WINDOW_DAYS, size=num_employees, endpoint=True)
+    hire_dates = np.datetime_as_string(
+        np.datetime64(today, "D") - offsets.astype("timedelta64[D]")
+    ).tolist()
+
+    sexes = np.where(rng.random(num_employees) < 0.5, "Male", "Female")
+    names = draw_names(sexes, rng.random(num_employees), rng.random(num_employees))
+
+    employee_ids = IdGenerator(seed).uuid7_batch(num_employees)
+
+    conn = sqlite3.connect(db_path)
+    with conn:
+        before = conn.total_changes
+        write_sqlite(
+            conn,
+            "employees",
+            zip(employee_ids, names, hire_dates),
+            EmployeeRecord,
+            ignore_conflicts=True,
+        )
+        inserted = conn.total_changes - before
+    conn.close()
+
+    if inserted < num_employees:
+        logger.warning(f"Skipped {num_employees - inserted} duplicate employee IDs")
+    logger.info(f"Successfully generated {inserted} employees")
+    return inserted
+
+
+def get_employee_count(db_path=EMPLOYEE_DB_PATH):
     """Get the count of employees in the database."""
-    conn = sqlite3.connect(EMPLOYEE_DB_PATH)
+    conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
 
     cursor.execute("SELECT COUNT(*) FROM employees")
@@ -89,5 +156,21 @@ def get_employee_count():
 
 
 if __name__ == "__main__":
-    generate_employees()
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Generate employees")
+    parser.add_argument(
+        "--num_employees", type=int, default=50, help="Number of employees"
+    )
+    parser.add_argument(
+        "--bulk", action="store_true", help="Use the vectorised bulk generator"
+    )
+    parser.add_argument(
+        "--seed", type=int, default=42, help="Random seed for the bulk generator"
+    )
+    args = parser.parse_args()
+
+    if args.bulk:
+        generate_employees_bulk(args.num_employees, args.seed)
+    else:
+        generate_employees(args.num_employees)
     logger.info(f"Total employees in database: {get_employee_count()}")
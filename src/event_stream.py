@@ -0,0 +1,446 @@
+import os
+import time
+import zlib
+import queue
+import random
+import socket
+import sqlite3
+import logging
+import argparse
+import threading
+from datetime import date
+
+from id_generator import IdGenerator
+
+logger = logging.getLogger(__name__)
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DATA_DIR = os.path.join(ROOT_DIR, "data")
+DONOR_DB_PATH = os.path.join(DATA_DIR, "donors.sqlite3")
+HOSPITAL_DB_PATH = os.path.join(DATA_DIR, "hospitals.sqlite3")
+
+# Minimum days between whole-blood donations
+DONATION_INTERVAL = 56
+
+# Days of drives planned at a time as the simulated clock advances
+PLAN_DAYS = 365
+
+
+class TokenBucket:
+    """Rate limiter allowing `rate` tokens per second with bursts up to `burst`"""
+
+    def __init__(self, rate, burst=None):
+        """
+        Initialize the bucket
+
+        Args:
+            rate: Tokens added per second
+            burst: Bucket capacity, defaults to one second's worth
+        """
+        self.rate = float(rate)
+        self.capacity = float(burst or rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def consume(self, n):
+        """Block until n tokens are available, then take them"""
+        while True:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            if self.tokens >= n or n > self.capacity and self.tokens >= self.capacity:
+                self.tokens -= n
+                return
+            time.sleep((min(n, self.capacity) - self.tokens) / self.rate)
+
+
+class DonationStream:
+    """
+    Endless feed of donation, donor-update and blood-request events
+
+    Follows the same rules as DonationHistoryGenerator: drives are planned
+    with the drive calendar, donors must wait DONATION_INTERVAL days between
+    donations and each donation is tested the next day. Donor state is held
+    in memory instead of being written back, so the databases are only read.
+
+    Events are produced as (key, json_line) records. The key is the donor ID
+    (or NPI for requests), so per-donor ordering survives partitioning.
+    """
+
+    def __init__(
+        self,
+        donor_db_path=DONOR_DB_PATH,
+        hospital_db_path=HOSPITAL_DB_PATH,
+        seed=42,
+        start_date=None,
+        percent_chance=30,
+        min_units=20,
+        max_units=200,
+        request_ratio=0.5,
+    ):
+        """
+        Initialize the stream
+
+        Args:
+            donor_db_path: Donors database to read the starting state from
+            hospital_db_path: Hospitals database; request events are only
+                emitted if it exists
+            seed: Random seed for reproducibility
+            start_date: First simulated day, defaults to the day after the
+                latest donation in the donors table
+            percent_chance: Average percentage chance of a blood drive
+            min_units: Minimum number of units per blood drive
+            max_units: Maximum number of units per blood drive
+            request_ratio: Blood requests per donation
+        """
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.ids = IdGenerator(seed)
+        self.percent_chance = percent_chance
+        self.min_units = min_units
+        self.max_units = max_units
+        self.request_ratio = request_ratio
+
+        conn = sqlite3.connect(f"file:{donor_db_path}?mode=ro", uri=True)
+        rows = conn.execute(
+            "SELECT donor_id, blood_type, last_donation_date, total_donations FROM donors"
+        ).fetchall()
+        conn.close()
+        if not rows:
+            raise ValueError(f"No donors found in {donor_db_path}")
+
+        self.donor_ids = [r[0] for r in rows]
+        self.blood_types = [r[1] for r in rows]
+        self.totals = [r[3] or 0 for r in rows]
+        last = [date.fromisoformat(r[2]).toordinal() if r[2] else 0 for r in rows]
+        if start_date is None:
+            start_date = date.fromordinal(max(last) + 1)
+        self.day = start_date.toordinal()
+
+        # Eligible donor indexes, plus donors waiting out their interval keyed
+        # by the day they become eligible again
+        self.eligible = []
+        self.cooldown = {}
+        for i, ordinal in enumerate(last):
+            release = ordinal + DONATION_INTERVAL
+            if release <= self.day:
+                self.eligible.append(i)
+            else:
+                self.cooldown.setdefault(release, []).append(i)
+
+        self.npis = []
+        if hospital_db_path and os.path.exists(hospital_db_path):
+            conn = sqlite3.connect(f"file:{hospital_db_path}?mode=ro", uri=True)
+            self.npis = [r[0] for r in conn.execute("SELECT NPI FROM hospitals")]
+            conn.close()
+
+        self._plan = []
+        self._plan_start = self.day
+        self._pending = []
+
+    def _next_drive(self):
+        """Advance the simulated clock to the next drive day"""
+        from drive_calendar import plan_drives
+
+        while not self._plan:
+            start = date.fromordinal(self._plan_start)
+            self._plan = plan_drives(
+                start,
+                PLAN_DAYS,
+                self.percent_chance,
+                self.min_units,
+                self.max_units,
+                seed=self.seed + self._plan_start,
+            )[::-1]
+            self._plan_start += PLAN_DAYS
+        date_str, units = self._plan.pop()
+        drive_day = date.fromisoformat(date_str).toordinal()
+        for day in range(self.day + 1, drive_day + 1):
+            self.eligible.extend(self.cooldown.pop(day, ()))
+        self.day = drive_day
+        return date_str, units
+
+    def _drive_events(self):
+        """Generate every event for the next drive, in time order"""
+        date_str, units = self._next_drive()
+        rng = self.rng
+        eligible = self.eligible
+        ids = self.ids
+        release = self.day + DONATION_INTERVAL
+        test_date = date.fromordinal(self.day + 1).isoformat()
+        units = min(units, len(eligible))
+
+        # Drive times between 8am and 5pm, sorted so events leave in time order
+        minutes = sorted(rng.randrange(480, 1080) for _ in range(units))
+        event_ids = ids.uuid7_batch(units, date_str)
+        requests = [
+            bool(self.npis) and rng.random() < self.request_ratio for _ in range(units)
+        ]
+        request_ids = iter(ids.uuid7_batch(sum(requests), date_str))
+        records = []
+        released = []
+        for minute, event_id, request in zip(minutes, event_ids, requests):
+            # Swap-remove a random eligible donor in O(1)
+            j = rng.randrange(len(eligible))
+            eligible[j], eligible[-1] = eligible[-1], eligible[j]
+            i = eligible.pop()
+            released.append(i)
+
+            donor_id = self.donor_ids[i]
+            blood_type = self.blood_types[i]
+            self.totals[i] += 1
+            timestamp = f"{date_str}T{minute // 60:02d}:{minute % 60:02d}:00"
+            # IDs, dates and blood types never need JSON escaping
+            records.append((
+                donor_id,
+                f'{{"type":"donation","event_id":"{event_id}",'
+                f'"bag_id":"{ids.bag_id(date_str, blood_type)}",'
+                f'"donor_id":"{donor_id}","donation_datetime":"{timestamp}",'
+                f'"test_date":"{test_date}",'
+                f'"test_result":{"true" if rng.random() < 0.998 else "false"},'
+                f'"status":"{"available" if rng.random() < 0.95 else "used"}"}}\n',
+            ))
+            records.append((
+                donor_id,
+                f'{{"type":"donor_update","donor_id":"{donor_id}",'
+                f'"last_donation_date":"{date_str}",'
+                f'"total_donations":{self.totals[i]}}}\n',
+            ))
+            if request:
+                npi = self.npis[rng.randrange(len(self.npis))]
+                records.append((
+                    str(npi),
+                    f'{{"type":"blood_request","request_id":"{next(request_ids)}",'
+                    f'"NPI":{npi},"request_datetime":"{timestamp}",'
+                    f'"units_requested":{rng.randint(1, 4)},'
+                    f'"blood_type":"{blood_type}","status":"pending"}}\n',
+                ))
+        self.cooldown.setdefault(release, []).extend(released)
+        return records
+
+    def next_batch(self, size):
+        """
+        Return the next `size` records
+
+        Args:
+            size: Number of records
+
+        Returns:
+            list: (key, json_line) tuples
+        """
+        while len(self._pending) < size:
+            self._pending.extend(self._drive_events())
+        batch = self._pending[:size]
+        del self._pending[:size]
+        return batch
+
+
+class JsonlFileSink:
+    """Appends records to a newline-delimited JSON file that can be tailed"""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "a", buffering=1024 * 1024)
+
+    def send(self, records):
+        self.file.write("".join(line for _, line in records))
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class UnixSocketSink:
+    """
+    Serves records to one consumer over a Unix domain socket
+
+    sendall() blocks once the consumer stops reading and the kernel buffer
+    fills, which throttles the emitter to the consumer's pace.
+    """
+
+    def __init__(self, path, accept_timeout=None):
+        """
+        Bind the socket and wait for a consumer to connect
+
+        Args:
+            path: Socket path, replaced if it already exists
+            accept_timeout: Seconds to wait for a consumer, None waits forever
+        """
+        self.path = path
+        if os.path.exists(path):
+            os.remove(path)
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(path)
+        self.server.listen(1)
+        self.server.settimeout(accept_timeout)
+        logger.info(f"Waiting for a consumer on {path}")
+        self.conn, _ = self.server.accept()
+        self.conn.settimeout(None)
+
+    def send(self, records):
+        self.conn.sendall("".join(line for _, line in records).encode())
+
+    def close(self):
+        self.conn.close()
+        self.server.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class QueueSink:
+    """
+    In-process stand-in for a Kafka topic
+
+    Records are partitioned by a stable hash of their key into bounded
+    queues of batches. send() blocks while the target partition is full, so
+    slow consumers push back on the emitter.
+    """
+
+    def __init__(self, partitions=4, max_batches=64):
+        """
+        Initialize the topic
+
+        Args:
+            partitions: Number of partitions
+            max_batches: Batches each partition holds before producers block
+        """
+        self.partitions = [queue.Queue(max_batches) for _ in range(partitions)]
+        self.offsets = [0] * partitions
+
+    def send(self, records):
+        n = len(self.partitions)
+        grouped = [[] for _ in range(n)]
+        for key, line in records:
+            grouped[zlib.crc32(key.encode()) % n].append(line)
+        for partition, lines in zip(self.partitions, grouped):
+            if lines:
+                partition.put(lines)
+
+    def poll(self, partition, timeout=None):
+        """
+        Take the next batch from a partition
+
+        Args:
+            partition: Partition number
+            timeout: Seconds to wait, None waits forever
+
+        Returns:
+            list: JSON lines, empty on timeout, or None once the topic is closed
+        """
+        try:
+            lines = self.partitions[partition].get(timeout=timeout)
+        except queue.Empty:
+            return []
+        if lines is not None:
+            self.offsets[partition] += len(lines)
+        return lines
+
+    def close(self):
+        for partition in self.partitions:
+            partition.put(None)
+
+
+def emit(stream, sink, rate=None, batch_size=1000, max_events=None, duration=None):
+    """
+    Pump records from a stream into a sink
+
+    Args:
+        stream: DonationStream
+        sink: Object with send(records)
+        rate: Target events per second, None for as fast as the sink accepts
+        batch_size: Records generated and sent together
+        max_events: Stop after this many events
+        duration: Stop after this many seconds
+
+    Returns:
+        dict: events, seconds, events_per_sec and blocked_seconds (time spent
+            waiting on the sink, a measure of backpressure)
+    """
+    bucket = TokenBucket(rate, burst=max(rate, batch_size)) if rate else None
+    started = time.monotonic()
+    deadline = started + duration if duration else None
+    sent = 0
+    blocked = 0.0
+
+    while (max_events is None or sent < max_events) and (
+        deadline is None or time.monotonic() < deadline
+    ):
+        size = batch_size if max_events is None else min(batch_size, max_events - sent)
+        records = stream.next_batch(size)
+        if bucket:
+            bucket.consume(len(records))
+        before = time.monotonic()
+        sink.send(records)
+        blocked += time.monotonic() - before
+        sent += len(records)
+
+    elapsed = time.monotonic() - started
+    return {
+        "events": sent,
+        "seconds": elapsed,
+        "events_per_sec": sent / elapsed if elapsed else 0.0,
+        "blocked_seconds": blocked,
+    }
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Stream live donation events")
+    parser.add_argument(
+        "--sink", choices=["file", "socket", "queue"], default="file", help="Sink type"
+    )
+    parser.add_argument(
+        "--path",
+        default=os.path.join(DATA_DIR, "events.jsonl"),
+        help="JSONL file or Unix socket path",
+    )
+    parser.add_argument(
+        "--rate", type=float, default=None, help="Events per second (default: unlimited)"
+    )
+    parser.add_argument("--batch_size", type=int, default=1000, help="Records per send")
+    parser.add_argument("--seconds", type=float, default=None, help="Run time limit")
+    parser.add_argument("--max_events", type=int, default=None, help="Event limit")
+    parser.add_argument("--donors", default=DONOR_DB_PATH, help="Donors database")
+    parser.add_argument("--percent_chance", type=float, default=30)
+    parser.add_argument("--min_units", type=int, default=20)
+    parser.add_argument("--max_units", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    stream = DonationStream(
+        args.donors,
+        seed=args.seed,
+        percent_chance=args.percent_chance,
+        min_units=args.min_units,
+        max_units=args.max_units,
+    )
+    if args.sink == "file":
+        sink = JsonlFileSink(args.path)
+    elif args.sink == "socket":
+        sink = UnixSocketSink(args.path)
+    else:
+        # Drain the stand-in topic in the background so the run can be timed
+        sink = QueueSink()
+
+        def drain(partition):
+            while sink.poll(partition) is not None:
+                pass
+
+        for p in range(len(sink.partitions)):
+            threading.Thread(target=drain, args=(p,), daemon=True).start()
+
+    try:
+        stats = emit(
+            stream, sink, args.rate, args.batch_size, args.max_events, args.seconds
+        )
+    except (BrokenPipeError, ConnectionResetError):
+        logger.info("Consumer disconnected")
+    else:
+        logger.info(
+            f"Sent {stats['events']} events in {stats['seconds']:.1f}s "
+            f"({stats['events_per_sec']:.0f}/s, {stats['blocked_seconds']:.1f}s blocked on the sink)"
+        )
+    finally:
+        sink.close()
@@ -0,0 +1,174 @@
+import random
+from functools import lru_cache
+from typing import NamedTuple
+
+from constants import (
+    ETHNICITY_DISTRIBUTION,
+    BLOOD_TYPE_BY_ETHNICITY,
+    REGION_COUNT,
+    REGION_MIX_CONCENTRATION,
+    REGION_SEED,
+)
+
+ETHNICITIES = [eth for eth, _ in ETHNICITY_DISTRIBUTION]
+
+
+class Region(NamedTuple):
+    zip_code: str
+    population: float
+    ethnicity_weights: tuple
+
+
+class AliasTable:
+    """Walker/Vose alias table: O(1) draws from a discrete distribution"""
+
+    __slots__ = ("prob", "alias", "n")
+
+    def __init__(self, weights):
+        """
+        Build the table
+
+        Args:
+            weights: Non-negative weights, one per outcome
+        """
+        n = len(weights)
+        total = float(sum(weights))
+        scaled = [w * n / total for w in weights]
+        prob = [1.0] * n
+        alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        # Whatever is left over is 1.0 up to rounding
+        self.prob = prob
+        self.alias = alias
+        self.n = n
+
+    def sample(self, u):
+        """
+        Draw an outcome index from a single uniform in [0, 1)
+
+        The integer part of u * n picks the column and the fractional part
+        is the coin flip between the column and its alias.
+        """
+        scaled = u * self.n
+        column = int(scaled)
+        if column >= self.n:
+            column = self.n - 1
+        return column if scaled - column < self.prob[column] else self.alias[column]
+
+    def sample_array(self, uniforms):
+        """Vectorised sample() over a NumPy array of uniforms"""
+        import numpy as np
+
+        prob, alias = self.arrays()
+        scaled = np.asarray(uniforms) * self.n
+        column = np.minimum(scaled.astype(np.int64), self.n - 1)
+        return np.where(scaled - column < prob[column], column, alias[column])
+
+    def arrays(self):
+        """The table as NumPy (prob, alias) arrays"""
+        import numpy as np
+
+        return np.asarray(self.prob), np.asarray(self.alias, dtype=np.int64)
+
+
+@lru_cache(maxsize=None)
+def regions(count=REGION_COUNT, seed=REGION_SEED):
+    """
+    Build the synthetic ZIP-code regions
+
+    Populations are log-normal; each region's ethnicity mix is a Dirichlet
+    draw centred on ETHNICITY_DISTRIBUTION, so the population-weighted
+    national mix stays close to the published figures.
+
+    Args:
+        count: Number of regions
+        seed: Random seed for the geography (independent of the run seed)
+
+    Returns:
+        tuple: Region records, sorted by ZIP code
+    """
+    rng = random.Random(seed)
+    zip_codes = sorted(rng.sample(range(501, 99951), count))
+    built = []
+    for zip_code in zip_codes:
+        population = rng.lognormvariate(10, 1)
+        draws = [
+            rng.gammavariate(REGION_MIX_CONCENTRATION * share, 1.0)
+            for _, share in ETHNICITY_DISTRIBUTION
+        ]
+        total = sum(draws)
+        built.append(
+            Region(f"{zip_code:05d}", population, tuple(d / total for d in draws))
+        )
+    return tuple(built)
+
+
+@lru_cache(maxsize=None)
+def region_table(count=REGION_COUNT, seed=REGION_SEED):
+    """Alias table over regions, weighted by population"""
+    return AliasTable([r.population for r in regions(count, seed)])
+
+
+@lru_cache(maxsize=None)
+def ethnicity_table(region_index=None, count=REGION_COUNT, seed=REGION_SEED):
+    """
+    Alias table over ETHNICITIES for one region, built on first use
+
+    Args:
+        region_index: Index into regions(), or None for the national mix
+    """
+    if region_index is None:
+        return AliasTable([share for _, share in ETHNICITY_DISTRIBUTION])
+    return AliasTable(regions(count, seed)[region_index].ethnicity_weights)
+
+
+@lru_cache(maxsize=None)
+def blood_type_table(ethnicity):
+    """Alias table over blood types for an ethnicity, with the type names"""
+    dist = BLOOD_TYPE_BY_ETHNICITY[ethnicity]
+    return AliasTable([p for _, p in dist]), [bt for bt, _ in dist]
+
+
+@lru_cache(maxsize=None)
+def stacked_ethnicity_tables(count=REGION_COUNT, seed=REGION_SEED):
+    """
+    Every region's ethnicity alias table stacked into NumPy arrays
+
+    Returns:
+        tuple: (prob, alias) arrays of shape (count, len(ETHNICITIES))
+    """
+    import numpy as np
+
+    tables = [ethnicity_table(i, count, seed) for i in range(count)]
+    prob = np.array([t.prob for t in tables])
+    alias = np.array([t.alias for t in tables], dtype=np.int64)
+    return prob, alias
+
+
+def sample_region_ethnicities(region_index, uniforms, count=REGION_COUNT, seed=REGION_SEED):
+    """
+    Vectorised ethnicity draws, each from its own region's alias table
+
+    Args:
+        region_index: NumPy array of region indices
+        uniforms: NumPy array of uniforms in [0, 1), one per draw
+
+    Returns:
+        np.ndarray: Indices into ETHNICITIES
+    """
+    import numpy as np
+
+    prob, alias = stacked_ethnicity_tables(count, seed)
+    n = prob.shape[1]
+    scaled = np.asarray(uniforms) * n
+    column = np.minimum(scaled.astype(np.int64), n - 1)
+    keep = scaled - column < prob[region_index, column]
+    return np.where(keep, column, alias[region_index, column])
@@ -1,17 +1,18 @@
 import os
 import sqlite3
 import logging
+import argparse
+from constants import BLOOD_COMPATIBILITY, CONTIGUOUS_US_BOUNDS
 
-# Setup logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Ensure required directories exist
 ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 DATA_DIR = os.path.join(ROOT_DIR, "data")
-os.makedirs(DATA_DIR, exist_ok=True)
 HOSPITAL_DB_PATH = os.path.join(DATA_DIR, "hospitals.sqlite3")
 
+# Generated networks live beside the fixed hospitals table, never in it
+NETWORK_TABLE = "hospital_network"
+
 
 def create_hospitals_db(db_filename="hospitals.sqlite3"):
     """Creates an SQLite3 database with the hospitals table and populates it with data."""
@@ -103,6 +104,212 @@ def create_hospitals_db(db_filename="hospitals.sqlite3"):
     conn.close()
 
 
+def npi_check_digit(base):
+    """
+    Luhn check digit for a 9-digit NPI base
+
+    NPIs are validated with the Luhn formula over the base prefixed by the
+    card issuer identifier 80840, which is equivalent to adding 24.
+    """
+    total = 24
+    for position, digit in enumerate(reversed(str(base))):
+        value = int(digit)
+        if position % 2 == 0:
+            value *= 2
+            if value > 9:
+                value -= 9
+        total += value
+    return (10 - total % 10) % 10
+
+
+def generate_hospital_network(
+    num_hospitals, seed=42, bounds=CONTIGUOUS_US_BOUNDS, num_metros=None
+):
+    """
+    Generate a synthetic network of hospitals of any size
+
+    Hospitals cluster around randomly placed metro areas inside `bounds`,
+    each with a valid NPI, a point of contact and a bed capacity.
+
+    Args:
+        num_hospitals: Number of hospitals to generate
+        seed: Random seed for reproducibility
+        bounds: (min_lat, max_lat, min_lon, max_lon) to place metros in
+        num_metros: Number of metro clusters, defaults to ~1 per 20 hospitals
+
+    Returns:
+        list: (NPI, address, tel, POC, latitude, longitude, capacity) tuples
+    """
+    import numpy as np
+    from name_pool import draw_names
+
+    rng = np.random.default_rng(seed)
+    min_lat, max_lat, min_lon, max_lon = bounds
+    num_metros = num_metros or max(1, num_hospitals // 20)
+
+    metro_lat = rng.uniform(min_lat, max_lat, num_metros)
+    metro_lon = rng.uniform(min_lon, max_lon, num_metros)
+    metro_spread = rng.uniform(0.05, 0.5, num_metros)  # degrees
+    metro = rng.integers(0, num_metros, num_hospitals)
+    lat = np.clip(
+        metro_lat[metro] + rng.normal(0, 1, num_hospitals) * metro_spread[metro],
+        min_lat,
+        max_lat,
+    )
+    lon = np.clip(
+        metro_lon[metro] + rng.normal(0, 1, num_hospitals) * metro_spread[metro],
+        min_lon,
+        max_lon,
+    )
+
+    # Median ~150 beds with a long tail of large medical centres
+    capacity = np.clip(rng.lognormal(np.log(150), 0.7, num_hospitals), 10, 2500)
+
+    # NPIs for organisations start with 1 or 2: 9 digits plus a check digit
+    bases = 100_000_000 + rng.choice(200_000_000, num_hospitals, replace=False)
+    npis = [base * 10 + npi_check_digit(base) for base in bases.tolist()]
+
+    contacts = draw_names(
+        np.where(rng.random(num_hospitals) < 0.5, "Male", "Female"),
+        rng.random(num_hospitals),
+        rng.random(num_hospitals),
+    )
+    streets = draw_names(
+        np.full(num_hospitals, "Female"),
+        rng.random(num_hospitals),
+        rng.random(num_hospitals),
+    )
+    numbers = rng.integers(1, 9999, num_hospitals, endpoint=True)
+    phones = rng.integers(2_000_000_000, 9_999_999_999, num_hospitals, endpoint=True)
+
+    return [
+        (
+            npi,
+            f"{number} {street.split()[1]} Medical Dr",
+            f"+1{phone}",
+            contact,
+            round(la, 6),
+            round(lo, 6),
+            int(beds),
+        )
+        for npi, number, street, phone, contact, la, lo, beds in zip(
+            npis,
+            numbers.tolist(),
+            streets,
+            phones.tolist(),
+            contacts,
+            lat.tolist(),
+            lon.tolist(),
+            capacity.tolist(),
+        )
+    ]
+
+
+def create_hospital_network_db(db_path, num_hospitals, seed=42):
+    """
+    Write a generated network into its own table of a hospitals database
+
+    The hospital_network table keeps the columns of the fixed list in
+    create_hospitals_db and adds coordinates and bed capacity. It is replaced
+    on every run, and an existing hospitals table is left untouched.
+
+    Args:
+        db_path: Path of the SQLite file to create or add the network to
+        num_hospitals: Number of hospitals to generate
+        seed: Random seed for reproducibility
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    cursor.execute(f"DROP TABLE IF EXISTS {NETWORK_TABLE}")
+    cursor.execute(f"""
+        CREATE TABLE {NETWORK_TABLE} (
+            NPI INTEGER PRIMARY KEY,
+            address TEXT,
+            tel TEXT,
+            POC TEXT,
+            latitude REAL,
+            longitude REAL,
+            capacity INTEGER
+        )
+    """)
+    cursor.executemany(
+        f"""
+        INSERT INTO {NETWORK_TABLE} (NPI, address, tel, POC, latitude, longitude, capacity)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        generate_hospital_network(num_hospitals, seed),
+    )
+
+    conn.commit()
+    conn.close()
+    logger.info(f"Generated {num_hospitals} hospitals and saved to {db_path}")
+
+
+def load_hospital_index(db_path, cell_size_km=50.0):
+    """
+    Build a spatial index over a generated hospital network, keyed by NPI
+
+    Args:
+        db_path: Path to a database from create_hospital_network_db
+        cell_size_km: Grid cell size of the index
+
+    Returns:
+        GridIndex
+    """
+    from spatial_index import GridIndex
+
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(f"SELECT NPI, latitude, longitude FROM {NETWORK_TABLE}").fetchall()
+    conn.close()
+    return GridIndex(rows, cell_size_km)
+
+
+def nearest_compatible(index, lat, lon, recipient_type, stock, units=1, k=1):
+    """
+    Find the nearest hospitals holding blood a recipient can receive
+
+    Args:
+        index: GridIndex keyed by NPI
+        lat: Latitude of the request
+        lon: Longitude of the request
+        recipient_type: Blood type of the recipient
+        stock: {NPI: {blood_type: units}} inventory
+        units: Minimum compatible units a hospital must hold
+        k: Number of hospitals to return
+
+    Returns:
+        list: (distance_km, NPI) tuples, closest first
+    """
+    donor_types = BLOOD_COMPATIBILITY[recipient_type]
+
+    def has_stock(npi):
+        inventory = stock.get(npi, {})
+        return sum(inventory.get(bt, 0) for bt in donor_types) >= units
+
+    return index.nearest(lat, lon, k=k, predicate=has_stock)
+
+
 if __name__ == "__main__":
-    create_hospitals_db(HOSPITAL_DB_PATH)
-    print("hospitals.sqlite3 created successfully.")
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Create the hospitals database")
+    parser.add_argument(
+        "--network",
+        type=int,
+        default=None,
+        help="Generate a synthetic network of this many hospitals in its own table "
+        "instead of the fixed list",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=42, help="Random seed for reproducibility"
+    )
+    args = parser.parse_args()
+
+    # Ensure required directories exist
+    os.makedirs(DATA_DIR, exist_ok=True)
+    if args.network:
+        create_hospital_network_db(HOSPITAL_DB_PATH, args.network, args.seed)
+        print(f"{NETWORK_TABLE} table written to hospitals.sqlite3.")
+    else:
+        create_hospitals_db(HOSPITAL_DB_PATH)
+        print("hospitals.sqlite3 created successfully.")
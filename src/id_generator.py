@@ -0,0 +1,204 @@
+import random
+from datetime import date, datetime, timezone
+
+# Width of the UUIDv7 rand_a field, used here as a monotonic counter
+COUNTER_BITS = 12
+COUNTER_MAX = (1 << COUNTER_BITS) - 1
+
+# Batches at least this large are formatted with NumPy
+VECTORISE_THRESHOLD = 1024
+
+# Character positions of the 32 hex digits in a canonical UUID string
+HEX_POSITIONS = [i for i in range(36) if i not in (8, 13, 18, 23)]
+HEX_DIGITS = b"0123456789abcdef"
+
+
+def to_unix_ms(when=None):
+    """
+    Convert a date, datetime or 'YYYY-MM-DD' string to Unix milliseconds
+
+    Naive values are read as UTC so the same simulated date gives the same
+    timestamp on every machine. None means midnight today.
+    """
+    if when is None:
+        when = date.today()
+    if isinstance(when, str):
+        # fromisoformat is several times faster than strptime
+        when = datetime.fromisoformat(when)
+    if not isinstance(when, datetime):
+        when = datetime(when.year, when.month, when.day)
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return int(when.timestamp() * 1000)
+
+
+def uuid7_from_parts(unix_ms, counter, rand_bits):
+    """
+    Assemble a UUIDv7 string from its timestamp, counter and random bits
+
+    Args:
+        unix_ms: 48-bit Unix timestamp in milliseconds
+        counter: 12-bit sequence stored in the rand_a field
+        rand_bits: 62 random bits for the rand_b field
+
+    Returns:
+        str: Canonical UUID string
+    """
+    value = (
+        (unix_ms & 0xFFFFFFFFFFFF) << 80
+        | 0x7 << 76
+        | (counter & COUNTER_MAX) << 64
+        | 0b10 << 62
+        | (rand_bits & ((1 << 62) - 1))
+    )
+    # Same text as str(uuid.UUID(int=value)), without building the object
+    h = f"{value:032x}"
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+def uuid7_array(unix_ms, counters, rand_bits):
+    """
+    Vectorised uuid7_from_parts over NumPy arrays
+
+    Args:
+        unix_ms: uint64 array of millisecond timestamps
+        counters: uint64 array of 12-bit counters
+        rand_bits: uint64 array holding 62 random bits each
+
+    Returns:
+        list: Canonical UUID strings
+    """
+    import numpy as np
+
+    unix_ms = np.asarray(unix_ms, dtype=np.uint64)
+    counters = np.asarray(counters, dtype=np.uint64)
+    rand_bits = np.asarray(rand_bits, dtype=np.uint64)
+    hi = (
+        ((unix_ms & np.uint64(0xFFFFFFFFFFFF)) << np.uint64(16))
+        | np.uint64(0x7000)
+        | (counters & np.uint64(COUNTER_MAX))
+    )
+    lo = (rand_bits & np.uint64((1 << 62) - 1)) | np.uint64(1 << 63)
+
+    raw = np.stack([hi, lo], axis=1).astype(">u8").view(np.uint8).reshape(-1, 16)
+    nibbles = np.empty((len(raw), 32), dtype=np.uint8)
+    nibbles[:, 0::2] = raw >> 4
+    nibbles[:, 1::2] = raw & 0x0F
+    text = np.full((len(raw), 36), ord("-"), dtype=np.uint8)
+    digits = np.frombuffer(HEX_DIGITS, dtype=np.uint8)
+    text[:, HEX_POSITIONS] = digits[nibbles]
+    return text.view("S36").ravel().astype("U36").tolist()
+
+
+class IdGenerator:
+    """Generates time-ordered, seed-derived identifiers"""
+
+    def __init__(self, seed=42):
+        """
+        Initialize the ID generator
+
+        Args:
+            seed: Random seed for reproducibility
+        """
+        self.seed(seed)
+
+    def seed(self, seed):
+        """Reset the generator so the same seed gives the same IDs again"""
+        self._rng = random.Random(seed)
+        self._last_ms = -1
+        self._counter = 0
+        self._bag_sequences = {}
+
+    def getstate(self):
+        """Return the generator state, for checkpointing"""
+        return (
+            self._rng.getstate(),
+            self._last_ms,
+            self._counter,
+            dict(self._bag_sequences),
+        )
+
+    def setstate(self, state):
+        """Restore a state returned by getstate()"""
+        rng_state, self._last_ms, self._counter, bag_sequences = state
+        self._rng.setstate(rng_state)
+        self._bag_sequences = dict(bag_sequences)
+
+    def uuid7(self, when=None):
+        """
+        Generate a UUIDv7 whose timestamp is the given (simulated) time
+
+        IDs are strictly increasing for a generator: a timestamp at or before
+        the previous one reuses it and bumps the counter instead, so primary
+        key inserts always land at the right-hand edge of the index.
+
+        Args:
+            when: date, datetime or 'YYYY-MM-DD' string, defaults to today
+
+        Returns:
+            str: UUID string
+        """
+        unix_ms = to_unix_ms(when)
+        if unix_ms <= self._last_ms:
+            self._counter += 1
+            if self._counter > COUNTER_MAX:
+                self._last_ms += 1
+                self._counter = 0
+        else:
+            self._last_ms = unix_ms
+            self._counter = 0
+        return uuid7_from_parts(self._last_ms, self._counter, self._rng.getrandbits(62))
+
+    def uuid7_batch(self, count, when=None):
+        """
+        Generate `count` UUIDv7s, identical to calling uuid7(when) repeatedly
+
+        Args:
+            count: Number of IDs to generate
+            when: date, datetime or 'YYYY-MM-DD' string, defaults to today
+
+        Returns:
+            list: UUID strings in increasing order
+        """
+        if count <= 0:
+            return []
+        unix_ms = to_unix_ms(when)
+        if unix_ms <= self._last_ms:
+            start = (self._last_ms << COUNTER_BITS) + self._counter + 1
+        else:
+            start = unix_ms << COUNTER_BITS
+        stop = start + count
+        self._last_ms = (stop - 1) >> COUNTER_BITS
+        self._counter = (stop - 1) & COUNTER_MAX
+
+        rand = self._rng.getrandbits
+        rand_bits = [rand(62) for _ in range(count)]
+        if count < VECTORISE_THRESHOLD:
+            return [
+                uuid7_from_parts(position >> COUNTER_BITS, position, bits)
+                for position, bits in zip(range(start, stop), rand_bits)
+            ]
+
+        import numpy as np
+
+        positions = np.arange(start, stop, dtype=np.uint64)
+        return uuid7_array(positions >> np.uint64(COUNTER_BITS), positions, rand_bits)
+
+    def bag_id(self, donation_date, blood_type):
+        """
+        Generate a bag ID of the form 'YYYYMMDD-NNNNNN-<blood type>'
+
+        Args:
+            donation_date: Donation date in 'YYYY-MM-DD' format
+            blood_type: Blood type of the unit
+
+        Returns:
+            str: Bag ID, sorting by collection date then sequence
+        """
+        sequence = self._bag_sequences.get(donation_date, 0) + 1
+        self._bag_sequences[donation_date] = sequence
+        return f"{donation_date.replace('-', '')}-{sequence:06d}-{blood_type}"
+
+    def unique_id(self, prefix):
+        """Generate a short '<prefix>-xxxxxxxx' identifier"""
+        return f"{prefix}-{self._rng.getrandbits(32):08x}"
@@ -3,24 +3,22 @@ import sqlite3
 import random
 import argparse
 import logging
-from donor_generator import DonorFactory
 from donation_history_generator import DonationHistoryGenerator
+from summary_tables import ensure_summaries, record_donors
 
-# Setup logging
-logging.basicConfig(level=logging.INFO)
+# Faker, factory_boy and NumPy are imported inside the functions that need
+# them, so the daily-update path starts without loading them
 logger = logging.getLogger(__name__)
 
-# Ensure required directories exist
 ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 DATA_DIR = os.path.join(ROOT_DIR, "data")
-os.makedirs(DATA_DIR, exist_ok=True)
 DONOR_DB_PATH = os.path.join(DATA_DIR, "donors.sqlite3")
 DONATION_DB_PATH = os.path.join(DATA_DIR, "donations.sqlite3")
 
 
-def create_donor_database():
+def create_donor_database(db_path=DONOR_DB_PATH):
     """Create the donors database schema"""
-    conn = sqlite3.connect(DONOR_DB_PATH)
+    conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     cursor.execute("""
     CREATE TABLE IF NOT EXISTS donors (
@@ -34,47 +32,74 @@ def create_donor_database():
         blood_type TEXT,
         first_donation_date DATE,
         last_donation_date DATE,
-        total_donations INTEGER
+        total_donations INTEGER,
+        zip_code TEXT
     )
     """)
+    ensure_summaries(conn, "donors")
+    conn.commit()
+    conn.close()
+    logger.info(f"Created donor database schema at {db_path}")
+
+
+def ensure_donor_summaries(db_path=DONOR_DB_PATH):
+    """Create and backfill any donor summary tables an existing database lacks"""
+    conn = sqlite3.connect(db_path)
+    ensure_summaries(conn, "donors")
     conn.commit()
     conn.close()
-    logger.info(f"Created donor database schema at {DONOR_DB_PATH}")
 
 
-def populate_donor_database(num_donors=3000):
+def populate_donor_database(num_donors=3000, seed=42):
     """Generate donors and populate the database"""
-    conn = sqlite3.connect(DONOR_DB_PATH)
-    cursor = conn.cursor()
+    from donor_generator import DonorFactory, donor_ids
+    from records import ColumnBuffer, DonorRecord, DONOR_CATEGORIES, write_sqlite
 
+    donor_ids.seed(seed)
+    donors = ColumnBuffer(DonorRecord, DONOR_CATEGORIES)
     for _ in range(num_donors):
-        donor = DonorFactory()
-        cursor.execute(
-            """
-            INSERT INTO donors (donor_id, unique_id, name, birthdate, age, sex, ethnicity, blood_type, first_donation_date, last_donation_date, total_donations)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                donor["donor_id"],
-                donor["unique_id"],
-                donor["name"],
-                donor["birthdate"],
-                donor["age"],
-                donor["sex"],
-                donor["ethnicity"],
-                donor["blood_type"],
-                donor["first_donation_date"],
-                donor["last_donation_date"],
-                donor["total_donations"],
-            ),
-        )
+        donors.append(DonorFactory())
 
+    conn = sqlite3.connect(DONOR_DB_PATH)
+    ensure_summaries(conn, "donors")
+    write_sqlite(conn, "donors", donors)
+    record_donors(conn, donors.rows())
     conn.commit()
     conn.close()
     logger.info(f"Generated {num_donors} donors and saved to {DONOR_DB_PATH}")
 
 
-def main(num_days=1000, percent_chance=30, min_units=20, max_units=200, seed=42):
+def validate_generated_data():
+    """
+    Check generated data against the target distributions and log a report
+
+    Returns:
+        bool: True if every check passed
+    """
+    from validation import validate_database, format_report
+
+    results = validate_database(DONOR_DB_PATH, DONATION_DB_PATH)
+    passed = all(r.passed for r in results)
+    if passed:
+        logger.info(f"Validation passed:\n{format_report(results)}")
+    else:
+        logger.warning(f"Validation found problems:\n{format_report(results)}")
+    return passed
+
+
+def main(
+    num_days=1000,
+    percent_chance=30,
+    min_units=20,
+    max_units=200,
+    seed=42,
+    scale_factor=None,
+    dynamic_calendar=True,
+    validate=True,
+    use_cache=True,
+    link_cache=False,
+    donation_layout="rowid",
+):
     """
     Main function to run the donation history generation
 
@@ -84,17 +109,35 @@ def main(num_days=1000, percent_chance=30, min_units=20, max_units=200, seed=42)
         min_units: Minimum number of units collected per blood drive
         max_units: Maximum number of units collected per blood drive
         seed: Random seed for reproducibility
+        scale_factor: If set, generate donors in scale-factor mode with
+            DONORS_PER_SCALE_FACTOR * scale_factor rows instead of DonorFactory
+        dynamic_calendar: Vary the drive chance by weekday, season and holidays
+        validate: Run the statistical validation suite on newly generated data
+        use_cache: Restore a fresh run from the artifact cache when one with the
+            same parameters, seed, constants and code has been generated before
+        link_cache: Hard-link cached files instead of copying them
+        donation_layout: Physical layout of a new donations table: "rowid",
+            or "date"/"donor" for a WITHOUT ROWID table clustered on that key
     """
+    # Ensure required directories exist
+    os.makedirs(DATA_DIR, exist_ok=True)
+
     # Set random seed
     random.seed(seed)
 
     # Create donation history generator
-    generator = DonationHistoryGenerator(DONOR_DB_PATH, DONATION_DB_PATH, seed)
+    generator = DonationHistoryGenerator(
+        DONOR_DB_PATH, DONATION_DB_PATH, seed, layout=donation_layout
+    )
 
     try:
         donor_db_exists = os.path.exists(DONOR_DB_PATH)
         donation_db_exists = os.path.exists(DONATION_DB_PATH)
 
+        # Donor databases made before the summary tables get them here
+        if donor_db_exists:
+            ensure_donor_summaries()
+
         # Case 1: Donor database exists but donation database doesn't
         if donor_db_exists and not donation_db_exists:
             logger.info("Donor database found but donation database not found.")
@@ -103,10 +146,21 @@ def main(num_days=1000, percent_chance=30, min_units=20, max_units=200, seed=42)
 
             logger.info(f"Generating {num_days} days of historical donation data...")
             generator.generate_historical_data(
-                num_days, min_units, max_units, percent_chance
+                num_days, min_units, max_units, percent_chance, dynamic_calendar
             )
+            if validate:
+                validate_generated_data()
 
-        # Case 2: Both databases exist (daily update)
+        # Case 2: A historical run was interrupted part-way
+        elif donor_db_exists and generator.has_unfinished_run():
+            logger.info("Unfinished historical run found. Resuming from checkpoint...")
+            generator.generate_historical_data(
+                num_days, min_units, max_units, percent_chance, dynamic_calendar
+            )
+            if validate:
+                validate_generated_data()
+
+        # Case 3: Both databases exist (daily update)
         elif donor_db_exists and donation_db_exists:
             logger.info("Both donor and donation databases found.")
 
@@ -126,19 +180,52 @@ def main(num_days=1000, percent_chance=30, min_units=20, max_units=200, seed=42)
             else:
                 logger.info("No blood drive occurred today")
 
-        # Case 3: Neither database exists
+        # Case 4: Neither database exists
         else:
+            if use_cache:
+                from artifact_cache import ArtifactCache, cache_key
+
+                params = {
+                    "num_days": num_days,
+                    "percent_chance": percent_chance,
+                    "min_units": min_units,
+                    "max_units": max_units,
+                    "seed": seed,
+                    "scale_factor": scale_factor,
+                    "dynamic_calendar": dynamic_calendar,
+                    "donation_layout": donation_layout,
+                }
+                cache = ArtifactCache()
+                key = cache_key(params)
+                artifacts = {
+                    "donors": DONOR_DB_PATH,
+                    "donations": DONATION_DB_PATH,
+                }
+                if cache.get(key, artifacts, link=link_cache):
+                    logger.info(f"Restored databases from cache entry {key[:12]}")
+                    logger.info("Process completed successfully")
+                    return
+
             logger.info("Donor database not found. Creating and populating...")
             create_donor_database()
-            populate_donor_database()
+            if scale_factor is None:
+                populate_donor_database(seed=seed)
+            else:
+                from scale_factor import populate_scale_factor_database
+
+                populate_scale_factor_database(DONOR_DB_PATH, scale_factor, seed)
 
             logger.info("Initializing donation database...")
             generator.initialize_donation_database()
 
             logger.info(f"Generating {num_days} days of historical donation data...")
             generator.generate_historical_data(
-                num_days, min_units, max_units, percent_chance
+                num_days, min_units, max_units, percent_chance, dynamic_calendar
             )
+            if validate:
+                validate_generated_data()
+            if use_cache:
+                cache.put(key, artifacts, params)
 
         logger.info("Process completed successfully")
     except Exception as e:
@@ -147,6 +234,9 @@ def main(num_days=1000, percent_chance=30, min_units=20, max_units=200, seed=42)
 
 
 if __name__ == "__main__":
+    # Setup logging
+    logging.basicConfig(level=logging.INFO)
+
     # Parse command line arguments
     parser = argparse.ArgumentParser(description="Generate blood donation data")
     parser.add_argument(
@@ -176,6 +266,42 @@ if __name__ == "__main__":
     parser.add_argument(
         "--seed", type=int, default=42, help="Random seed for reproducibility"
     )
+    parser.add_argument(
+        "--scale_factor",
+        type=float,
+        default=None,
+        help="Generate donors in counter-based scale-factor mode (1.0 = 3000 donors)",
+    )
+
+    parser.add_argument(
+        "--flat_calendar",
+        action="store_true",
+        help="Use the same drive chance every day instead of weekday, seasonal and holiday effects",
+    )
+
+    parser.add_argument(
+        "--skip_validation",
+        action="store_true",
+        help="Do not run the statistical validation suite after generating data",
+    )
+
+    parser.add_argument(
+        "--no_cache",
+        action="store_true",
+        help="Always regenerate instead of restoring a cached run",
+    )
+    parser.add_argument(
+        "--link_cache",
+        action="store_true",
+        help="Hard-link cached databases instead of copying; they become read-only",
+    )
+
+    parser.add_argument(
+        "--donation_layout",
+        choices=["rowid", "date", "donor"],
+        default="rowid",
+        help="Store donations in a rowid table or a WITHOUT ROWID table clustered by date or donor",
+    )
 
     args = parser.parse_args()
 
@@ -186,4 +312,10 @@ if __name__ == "__main__":
         min_units=args.min_units,
         max_units=args.max_units,
         seed=args.seed,
+        scale_factor=args.scale_factor,
+        dynamic_calendar=not args.flat_calendar,
+        validate=not args.skip_validation,
+        use_cache=not args.no_cache,
+        link_cache=args.link_cache,
+        donation_layout=args.donation_layout,
     )
@@ -0,0 +1,436 @@
+import os
+import math
+import queue
+import random
+import logging
+import argparse
+import multiprocessing
+from collections import Counter
+from datetime import date, timedelta
+from typing import NamedTuple
+
+from constants import BLOOD_TYPE_BY_ETHNICITY, ETHNICITY_DISTRIBUTION
+from donation_history_generator import DonationHistoryGenerator
+
+logger = logging.getLogger(__name__)
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+NETWORK_DIR = os.path.join(ROOT_DIR, "data", "network")
+
+BLOOD_TYPES = [bt for bt, _ in BLOOD_TYPE_BY_ETHNICITY[ETHNICITY_DISTRIBUTION[0][0]]]
+
+# Seconds a worker waits at the daily barrier before giving up on the others
+BARRIER_TIMEOUT = 600
+
+
+class CenterConfig(NamedTuple):
+    """One regional blood bank"""
+
+    name: str
+    num_donors: int = 3000
+    percent_chance: float = 30
+    min_units: int = 20
+    max_units: int = 200
+    daily_demand: float = 30.0  # mean units used per day by its hospitals
+    safety_days: float = 3.0  # stock kept back before offering a surplus
+
+
+class Transfer(NamedTuple):
+    source: int
+    destination: int
+    blood_type: str
+    units: int
+
+
+def national_blood_type_mix():
+    """Share of each blood type in the US population, in BLOOD_TYPES order"""
+    mix = Counter()
+    for ethnicity, share in ETHNICITY_DISTRIBUTION:
+        for blood_type, p in BLOOD_TYPE_BY_ETHNICITY[ethnicity]:
+            mix[blood_type] += share * p
+    total = sum(mix.values())
+    return [mix[bt] / total for bt in BLOOD_TYPES]
+
+
+def default_centers(count, seed=42):
+    """
+    A network of centers with varied size, drive calendar and demand
+
+    Demand is drawn independently of collection, so some centers run a
+    surplus and others depend on transfers.
+
+    Args:
+        count: Number of centers
+        seed: Random seed for reproducibility
+
+    Returns:
+        list: CenterConfig for each center
+    """
+    rng = random.Random(seed)
+    centers = []
+    for i in range(count):
+        percent_chance = rng.uniform(15, 45)
+        min_units = rng.randint(10, 40)
+        max_units = min_units + rng.randint(60, 200)
+        collected = percent_chance / 100 * (min_units + max_units) / 2
+        centers.append(
+            CenterConfig(
+                name=f"center_{i:03d}",
+                # Enough donors that the 56-day deferral never runs the pool dry
+                num_donors=int(collected * 90),
+                percent_chance=percent_chance,
+                min_units=min_units,
+                max_units=max_units,
+                daily_demand=collected * rng.uniform(0.7, 1.3),
+            )
+        )
+    return centers
+
+
+def plan_transfers(positions):
+    """
+    Match surplus units with shortfalls, blood type by blood type
+
+    Every worker runs this on the same positions and gets the same plan, so
+    no coordinator is needed. Largest surpluses fill largest shortfalls
+    first; ties go to the lower center index.
+
+    Args:
+        positions: positions[center][type] = stock above (+) or below (-)
+            the center's safety stock
+
+    Returns:
+        list: Transfer tuples
+    """
+    def largest_first(entry):
+        return -entry[0], entry[1]
+
+    transfers = []
+    for t, blood_type in enumerate(BLOOD_TYPES):
+        surplus = sorted(
+            ([p[t], i] for i, p in enumerate(positions) if p[t] > 0), key=largest_first
+        )
+        needs = sorted(
+            ([-p[t], i] for i, p in enumerate(positions) if p[t] < 0), key=largest_first
+        )
+        s = n = 0
+        while s < len(surplus) and n < len(needs):
+            units = min(surplus[s][0], needs[n][0])
+            transfers.append(Transfer(surplus[s][1], needs[n][1], blood_type, units))
+            surplus[s][0] -= units
+            needs[n][0] -= units
+            if not surplus[s][0]:
+                s += 1
+            if not needs[n][0]:
+                n += 1
+    return transfers
+
+
+class Center:
+    """A center's partition and running inventory inside a worker process"""
+
+    def __init__(self, index, config, directory, start_date, num_days, seed, donor_start, as_of):
+        """
+        Generate the center's donors and open its partition
+
+        Args:
+            index: Position of the center in the network
+            config: CenterConfig
+            directory: Partition directory for this center
+            start_date: First simulated day (date)
+            num_days: Number of simulated days
+            seed: Network seed
+            donor_start: First row of the network-wide donor population, so
+                donor IDs never collide between centers
+            as_of: Reference date for donor ages
+        """
+        # Heavy imports stay inside the worker that needs them
+        from main import create_donor_database
+        from scale_factor import populate_donor_slice
+        from drive_calendar import plan_drives
+
+        self.index = index
+        self.config = config
+        os.makedirs(directory, exist_ok=True)
+        donor_db = os.path.join(directory, "donors.sqlite3")
+        create_donor_database(donor_db)
+        populate_donor_slice(donor_db, donor_start, donor_start + config.num_donors, seed, as_of)
+
+        self.generator = DonationHistoryGenerator(
+            donor_db, os.path.join(directory, "donations.sqlite3"), seed + index
+        )
+        self.generator.initialize_donation_database()
+        self.generator.open_donor_cache()
+        # Centers share a process's global random module; each keeps its own
+        # state so results do not depend on how centers map to workers
+        self.rng_state = random.getstate()
+        self.demand_rng = random.Random(f"{seed}-demand-{index}")
+        self.drives = dict(
+            plan_drives(
+                start_date,
+                num_days,
+                config.percent_chance,
+                config.min_units,
+                config.max_units,
+                seed + index,
+            )
+        )
+
+        self.conn = self.generator.connect_with_donors()
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS inventory (
+            inventory_date DATE NOT NULL,
+            blood_type TEXT NOT NULL,
+            collected INTEGER NOT NULL,
+            used INTEGER NOT NULL,
+            shortage INTEGER NOT NULL,
+            transferred_in INTEGER NOT NULL,
+            transferred_out INTEGER NOT NULL,
+            stock INTEGER NOT NULL,
+            PRIMARY KEY (inventory_date, blood_type)
+        ) WITHOUT ROWID
+        """)
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS transfers (
+            transfer_date DATE NOT NULL,
+            source TEXT NOT NULL,
+            destination TEXT NOT NULL,
+            blood_type TEXT NOT NULL,
+            units INTEGER NOT NULL
+        )
+        """)
+        self.conn.commit()
+
+        mix = national_blood_type_mix()
+        self.mean_demand = [config.daily_demand * share for share in mix]
+        self.target = [math.ceil(config.safety_days * d) for d in self.mean_demand]
+        self.stock = [0] * len(BLOOD_TYPES)
+        self.day = None
+        self.totals = Counter()
+
+    def collect_and_use(self, date_str):
+        """
+        Run the day's drive, if any, then draw the hospitals' demand
+
+        Returns:
+            list: Stock above or below the safety stock, per blood type
+        """
+        collected = Counter()
+        units = self.drives.get(date_str)
+        if units:
+            random.setstate(self.rng_state)
+            events = self.generator.generate_drive_donations(date_str, units, self.conn)
+            self.rng_state = random.getstate()
+            if events:
+                blood_types = self.generator.donor_blood_types(events, self.conn)
+                self.generator.insert_donations(self.conn.cursor(), events, blood_types)
+                collected.update(blood_types[e.donor_id] for e in events)
+
+        self.day = []
+        for t, blood_type in enumerate(BLOOD_TYPES):
+            mean = self.mean_demand[t]
+            wanted = max(0, round(self.demand_rng.gauss(mean, math.sqrt(mean))))
+            self.stock[t] += collected[blood_type]
+            used = min(wanted, self.stock[t])
+            self.stock[t] -= used
+            self.day.append([collected[blood_type], used, wanted - used, 0, 0])
+        self.totals["collected"] += sum(collected.values())
+        return [s - target for s, target in zip(self.stock, self.target)]
+
+    def settle(self, date_str, transfers, names):
+        """Apply the day's transfers and commit the day as one transaction"""
+        rows = []
+        for transfer in transfers:
+            t = BLOOD_TYPES.index(transfer.blood_type)
+            if transfer.source == self.index:
+                self.stock[t] -= transfer.units
+                self.day[t][4] += transfer.units
+            else:
+                self.stock[t] += transfer.units
+                self.day[t][3] += transfer.units
+            rows.append((
+                date_str,
+                names[transfer.source],
+                names[transfer.destination],
+                transfer.blood_type,
+                transfer.units,
+            ))
+        self.conn.executemany("INSERT INTO transfers VALUES (?, ?, ?, ?, ?)", rows)
+        self.conn.executemany(
+            "INSERT INTO inventory VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (date_str, blood_type, *self.day[t], self.stock[t])
+                for t, blood_type in enumerate(BLOOD_TYPES)
+            ],
+        )
+        self.conn.commit()
+        for collected, used, shortage, received, sent in self.day:
+            self.totals["used"] += used
+            self.totals["shortage"] += shortage
+            self.totals["received"] += received
+            self.totals["sent"] += sent
+
+    def summary(self):
+        self.conn.close()
+        self.generator.donor_cache.sync()
+        return {
+            "name": self.config.name,
+            **self.totals,
+            "stock": sum(self.stock),
+        }
+
+
+def _run_worker(assigned, centers, output_dir, start_date, num_days, seed, as_of, barrier, positions, results):
+    """
+    Simulate the centers at indices `assigned`, in lockstep with the others
+
+    Each day a worker writes its centers' positions into one of two shared
+    slots, waits once at the barrier, and reads every position back. The
+    slots alternate by day, so writing tomorrow's positions never races a
+    slower worker still reading today's.
+    """
+    try:
+        names = [c.name for c in centers]
+        offsets = [0]
+        for c in centers:
+            offsets.append(offsets[-1] + c.num_donors)
+        local = [
+            Center(
+                i,
+                centers[i],
+                os.path.join(output_dir, centers[i].name),
+                start_date,
+                num_days,
+                seed,
+                offsets[i],
+                as_of,
+            )
+            for i in assigned
+        ]
+        width = len(BLOOD_TYPES)
+        slot_size = len(centers) * width
+        for day in range(num_days):
+            date_str = (start_date + timedelta(days=day)).strftime("%Y-%m-%d")
+            base = (day % 2) * slot_size
+            for center in local:
+                offset = base + center.index * width
+                positions[offset:offset + width] = center.collect_and_use(date_str)
+            barrier.wait(BARRIER_TIMEOUT)
+            snapshot = positions[base:base + slot_size]
+            plan = plan_transfers(
+                [snapshot[i * width:(i + 1) * width] for i in range(len(centers))]
+            )
+            for center in local:
+                center.settle(
+                    date_str,
+                    [t for t in plan if center.index in (t.source, t.destination)],
+                    names,
+                )
+        results.put([center.summary() for center in local])
+    except BaseException:
+        # Release the other workers instead of leaving them at the barrier
+        barrier.abort()
+        raise
+
+
+def simulate_network(
+    centers,
+    num_days,
+    output_dir=NETWORK_DIR,
+    seed=42,
+    workers=None,
+    as_of=None,
+):
+    """
+    Simulate regional centers concurrently, exchanging surplus units daily
+
+    Centers are split round-robin over worker processes. Each center
+    generates its own donors (a disjoint slice of one network-wide
+    population) and writes donations, inventory and transfers to its own
+    partition, output_dir/<center name>/.
+
+    Args:
+        centers: CenterConfig list
+        num_days: Number of days to simulate, ending yesterday
+        output_dir: Directory for the center partitions
+        seed: Random seed for reproducibility
+        workers: Worker processes, defaults to the CPU count
+        as_of: Reference date for donor ages, defaults to today
+
+    Returns:
+        list: Per-center summary dicts in center order
+    """
+    as_of = as_of or date.today()
+    start_date = as_of - timedelta(days=num_days)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(centers)))
+    os.makedirs(output_dir, exist_ok=True)
+
+    ctx = multiprocessing.get_context()
+    barrier = ctx.Barrier(workers)
+    positions = ctx.Array("q", 2 * len(centers) * len(BLOOD_TYPES), lock=False)
+    results = ctx.Queue()
+    processes = [
+        ctx.Process(
+            target=_run_worker,
+            args=(
+                list(range(w, len(centers), workers)),
+                centers,
+                output_dir,
+                start_date,
+                num_days,
+                seed,
+                as_of,
+                barrier,
+                positions,
+                results,
+            ),
+        )
+        for w in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    summaries = []
+    while len(summaries) < len(centers):
+        try:
+            summaries.extend(results.get(timeout=1))
+        except queue.Empty:
+            if any(p.exitcode not in (None, 0) for p in processes):
+                break
+    for process in processes:
+        process.join()
+    failed = [p.exitcode for p in processes if p.exitcode != 0]
+    if failed:
+        raise RuntimeError(f"{len(failed)} of {workers} workers failed (exit codes {failed})")
+
+    order = {c.name: i for i, c in enumerate(centers)}
+    summaries.sort(key=lambda s: order[s["name"]])
+    logger.info(
+        f"Simulated {len(centers)} centers over {num_days} days with {workers} workers"
+    )
+    return summaries
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    parser = argparse.ArgumentParser(
+        description="Simulate a network of regional blood banks exchanging surplus units"
+    )
+    parser.add_argument("--centers", type=int, default=50, help="Number of centers")
+    parser.add_argument("--num_days", type=int, default=365, help="Days to simulate")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes")
+    parser.add_argument("--output", default=NETWORK_DIR, help="Directory for the partitions")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for reproducibility")
+    args = parser.parse_args()
+
+    summaries = simulate_network(
+        default_centers(args.centers, args.seed),
+        args.num_days,
+        args.output,
+        args.seed,
+        args.workers,
+    )
+    columns = ["collected", "used", "shortage", "sent", "received", "stock"]
+    print(f"{'center':<12}" + "".join(f"{c:>11}" for c in columns))
+    for s in summaries:
+        print(f"{s['name']:<12}" + "".join(f"{s.get(c, 0):>11}" for c in columns))
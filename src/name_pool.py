@@ -0,0 +1,68 @@
+from functools import lru_cache
+
+import numpy as np
+from faker.providers.person.en_US import Provider as PersonProvider
+
+
+@lru_cache(maxsize=None)
+def name_pool(sex):
+    """
+    Build a weighted pool of first names for the given sex and of last names
+
+    The pools come straight from Faker's en_US person provider, so names drawn
+    from them look like ``fake.name()`` output but can be indexed by any
+    source of uniforms instead of Faker's own RNG.
+
+    Args:
+        sex: "Male" or "Female"
+
+    Returns:
+        tuple: (first_names, first_cdf, last_names, last_cdf) where the cdf
+        arrays are normalised cumulative weights for ``np.searchsorted``
+    """
+    first = (
+        PersonProvider.first_names_male
+        if sex == "Male"
+        else PersonProvider.first_names_female
+    )
+    last = PersonProvider.last_names
+    return (
+        tuple(first),
+        _cdf(list(first.values())),
+        tuple(last),
+        _cdf(list(last.values())),
+    )
+
+
+def _cdf(weights):
+    cdf = np.cumsum(np.asarray(weights, dtype=np.float64))
+    return cdf / cdf[-1]
+
+
+def draw_names(sexes, first_uniforms, last_uniforms):
+    """
+    Pick a "First Last" name for each row, matching first names to sex
+
+    Args:
+        sexes: Sequence of "Male"/"Female" values
+        first_uniforms: Array of uniforms in [0, 1) used for the first name
+        last_uniforms: Array of uniforms in [0, 1) used for the last name
+
+    Returns:
+        list: Full names, one per row
+    """
+    sexes = np.asarray(sexes)
+    names = np.empty(len(sexes), dtype=object)
+    for sex in ("Male", "Female"):
+        mask = sexes == sex
+        if not mask.any():
+            continue
+        first, first_cdf, last, last_cdf = name_pool(sex)
+        first_idx = np.searchsorted(first_cdf, first_uniforms[mask], side="right")
+        last_idx = np.searchsorted(last_cdf, last_uniforms[mask], side="right")
+        first_idx = np.minimum(first_idx, len(first) - 1)
+        last_idx = np.minimum(last_idx, len(last) - 1)
+        names[mask] = [
+            f"{first[f]} {last[l]}" for f, l in zip(first_idx, last_idx)
+        ]
+    return names.tolist()
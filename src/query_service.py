@@ -0,0 +1,318 @@
+import os
+import re
+import queue
+import sqlite3
+import logging
+import argparse
+import threading
+from collections import OrderedDict
+from urllib.parse import quote
+
+logger = logging.getLogger(__name__)
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DATA_DIR = os.path.join(ROOT_DIR, "data")
+DONOR_DB_PATH = os.path.join(DATA_DIR, "donors.sqlite3")
+DONATION_DB_PATH = os.path.join(DATA_DIR, "donations.sqlite3")
+
+# String literals, quoted identifiers, comments and whitespace runs
+SQL_TOKEN_RE = re.compile(
+    r"""('(?:[^']|'')*'|"(?:[^"]|"")*")|(--[^\n]*|/\*.*?\*/)|(\s+)|(;)""",
+    re.S,
+)
+
+# Offset and size of the "file change counter" in the SQLite database header
+CHANGE_COUNTER_OFFSET = 24
+CHANGE_COUNTER_SIZE = 4
+
+
+def split_statements(sql):
+    """
+    Normalize SQL text and split it into statements
+
+    Comments are dropped, whitespace outside string literals collapses to a
+    single space and trailing semicolons are removed, so the same query
+    written with different formatting maps to the same cache key.
+
+    Args:
+        sql: One or more SQL statements
+
+    Returns:
+        list: Normalized statements
+    """
+    statements = []
+    current = []
+
+    def flush():
+        statement = "".join(current).strip()
+        if statement:
+            statements.append(statement)
+        current.clear()
+
+    position = 0
+    for match in SQL_TOKEN_RE.finditer(sql):
+        if match.start() > position:
+            current.append(sql[position : match.start()])
+        literal, comment, space, semicolon = match.groups()
+        if literal:
+            current.append(literal)
+        elif semicolon:
+            flush()
+        elif current and current[-1] != " ":
+            current.append(" ")
+        position = match.end()
+    current.append(sql[position:])
+    flush()
+
+    return statements
+
+
+def normalize_sql(sql):
+    """Normalize a single SQL statement for use as a cache key"""
+    statements = split_statements(sql)
+    if len(statements) != 1:
+        raise ValueError(f"Expected one SQL statement, found {len(statements)}")
+    return statements[0]
+
+
+def database_version(db_path):
+    """
+    Version stamp for a database file
+
+    Combines the file identity and size with the change counter SQLite bumps
+    in the header on every committed write, so any regeneration, daily
+    update or replacement of the file yields a new stamp.
+
+    Args:
+        db_path: Path to the SQLite file
+
+    Returns:
+        tuple: (inode, size, mtime_ns, change_counter)
+    """
+    stat = os.stat(db_path)
+    with open(db_path, "rb") as f:
+        f.seek(CHANGE_COUNTER_OFFSET)
+        counter = int.from_bytes(f.read(CHANGE_COUNTER_SIZE), "big")
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns, counter)
+
+
+class QueryService:
+    """Read-only, result-cached query access to the generated databases"""
+
+    def __init__(
+        self,
+        db_path=DONOR_DB_PATH,
+        attach=None,
+        pool_size=4,
+        cache_size=256,
+        max_cached_rows=100_000,
+        mmap_size=256 * 1024 * 1024,
+        immutable=True,
+    ):
+        """
+        Initialize the query service
+
+        Args:
+            db_path: Main database, whose tables resolve without a schema prefix
+            attach: Optional {schema_name: path} of further databases to attach
+            pool_size: Maximum number of pooled read-only connections
+            cache_size: Maximum number of cached query results
+            max_cached_rows: Results larger than this are returned but not cached
+            mmap_size: Bytes of each database to memory-map
+            immutable: Open with immutable=1, skipping SQLite's file locking;
+                the version check below reopens connections when files
+                change, but a query that overlaps a write may read torn
+                pages. Pass False for files written while being read
+        """
+        self.databases = {"main": os.path.abspath(db_path)}
+        for name, path in (attach or {}).items():
+            self.databases[name] = os.path.abspath(path)
+        self.pool_size = pool_size
+        self.cache_size = cache_size
+        self.max_cached_rows = max_cached_rows
+        self.mmap_size = mmap_size
+        self.immutable = immutable
+
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        # Signalled whenever a pooled connection is returned or one is closed
+        self._available = threading.Condition(self._lock)
+        self._pool = queue.LifoQueue()
+        self._open_connections = 0
+        self._pool_version = None
+
+    def _uri(self, path):
+        flags = "mode=ro&immutable=1" if self.immutable else "mode=ro"
+        return f"file:{quote(path)}?{flags}"
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self._uri(self.databases["main"]), uri=True, check_same_thread=False
+        )
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        for name, path in self.databases.items():
+            if name == "main":
+                continue
+            conn.execute("ATTACH DATABASE ? AS " + name, (self._uri(path),))
+            conn.execute(f"PRAGMA {name}.mmap_size = {int(self.mmap_size)}")
+        return conn
+
+    def version(self):
+        """Current version stamp of every database the service reads"""
+        return tuple(database_version(path) for path in self.databases.values())
+
+    def _check_version(self):
+        """Drop pooled connections and cached results if any file changed"""
+        version = self.version()
+        with self._lock:
+            if version != self._pool_version:
+                if self._pool_version is not None:
+                    logger.info("Database files changed, invalidating query cache")
+                self._drain_pool()
+                self._cache.clear()
+                self._pool_version = version
+        return version
+
+    def _drain_pool(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+            self._open_connections -= 1
+        self._available.notify_all()
+
+    def _acquire(self):
+        with self._available:
+            while True:
+                try:
+                    return self._pool.get_nowait()
+                except queue.Empty:
+                    pass
+                if self._open_connections < self.pool_size:
+                    self._open_connections += 1
+                    break
+                self._available.wait()
+        try:
+            return self._connect()
+        except Exception:
+            with self._available:
+                self._open_connections -= 1
+                self._available.notify()
+            raise
+
+    def _release(self, conn, version):
+        with self._available:
+            if version == self._pool_version:
+                self._pool.put(conn)
+                self._available.notify()
+                return
+            # Closing frees a slot, so a waiter may open a fresh connection
+            self._open_connections -= 1
+            self._available.notify()
+        conn.close()
+
+    def execute(self, sql, params=()):
+        """
+        Run a read-only query, serving repeated queries from the cache
+
+        Args:
+            sql: A single SQL statement
+            params: Query parameters
+
+        Returns:
+            tuple: (column_names, rows)
+        """
+        statement = normalize_sql(sql)
+        version = self._check_version()
+        key = (statement, tuple(params), version)
+
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key]
+            self.misses += 1
+
+        conn = self._acquire()
+        try:
+            cursor = conn.execute(statement, params)
+            columns = tuple(d[0] for d in cursor.description or ())
+            rows = cursor.fetchall()
+        finally:
+            self._release(conn, version)
+
+        result = (columns, rows)
+        # A write landed during the query. With immutable=1 SQLite takes no
+        # locks, so the result is only guaranteed when no writer is active
+        # (open with immutable=False for files written while being read);
+        # either way it must not be cached under the older version
+        if self.version() != version:
+            return result
+
+        if len(rows) <= self.max_cached_rows:
+            with self._lock:
+                self._cache[key] = result
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return result
+
+    def run_file(self, path):
+        """
+        Run every statement in a SQL file, such as those in queries/
+
+        Args:
+            path: Path to the SQL file
+
+        Returns:
+            list: (statement, column_names, rows) for each statement
+        """
+        with open(path) as f:
+            statements = split_statements(f.read())
+        return [(s, *self.execute(s)) for s in statements]
+
+    def invalidate(self):
+        """Drop every cached result and pooled connection"""
+        with self._lock:
+            self._cache.clear()
+            self._drain_pool()
+            self._pool_version = None
+
+    def close(self):
+        """Close all pooled connections"""
+        self.invalidate()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(
+        description="Run SQL files against the generated databases"
+    )
+    parser.add_argument("files", nargs="+", help="SQL files to run")
+    parser.add_argument(
+        "--db", default=DONOR_DB_PATH, help="Main database to query"
+    )
+    parser.add_argument(
+        "--donations",
+        default=DONATION_DB_PATH,
+        help="Donations database, attached as 'donations' when it exists",
+    )
+    args = parser.parse_args()
+
+    attach = {"donations": args.donations} if os.path.exists(args.donations) else None
+    with QueryService(args.db, attach=attach) as service:
+        for path in args.files:
+            for statement, columns, rows in service.run_file(path):
+                print(statement)
+                print(" | ".join(columns))
+                for row in rows:
+                    print(" | ".join(str(v) for v in row))
+                print()
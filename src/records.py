@@ -0,0 +1,228 @@
+import csv
+import sys
+from array import array
+from typing import NamedTuple
+
+
+class DonorRecord(NamedTuple):
+    """One row of the donors table, in column order"""
+
+    donor_id: str
+    unique_id: str
+    name: str
+    birthdate: str
+    age: int
+    sex: str
+    ethnicity: str
+    blood_type: str
+    first_donation_date: str
+    last_donation_date: str
+    total_donations: int
+    zip_code: str
+
+
+class DonationRecord(NamedTuple):
+    """One row of the donations table, in column order"""
+
+    bag_id: str
+    donor_id: str
+    event_id: str
+    donation_date: str
+    test_date: str
+    test_result: bool
+    status: str
+
+
+class EmployeeRecord(NamedTuple):
+    """One row of the employees table, in column order"""
+
+    employee_id: str
+    name: str
+    hire_date: str
+
+
+# Low-cardinality text columns worth storing as interned codes
+DONOR_CATEGORIES = ("sex", "ethnicity", "blood_type", "zip_code")
+DONATION_CATEGORIES = ("donation_date", "test_date", "status")
+
+# array typecodes for numeric annotations
+TYPECODES = {int: "q", bool: "b", float: "d"}
+
+
+class Categories:
+    """Interned values of a categorical column and their integer codes"""
+
+    __slots__ = ("values", "codes")
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def code(self, value):
+        """Code for value, assigning the next one on first sight"""
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class ColumnBuffer:
+    """
+    Column-oriented store for NamedTuple records
+
+    Numeric fields live in typed arrays and categorical text fields as
+    integer codes into an interned value list, so a buffered row costs a
+    few bytes per column instead of a dict or tuple of Python objects.
+    Remaining text fields are kept as lists of str.
+    """
+
+    def __init__(self, record_type, categorical=()):
+        """
+        Initialize an empty buffer
+
+        Args:
+            record_type: NamedTuple class describing a row
+            categorical: Names of text fields to store as codes
+        """
+        self.record_type = record_type
+        self.fields = record_type._fields
+        self.categories = {name: Categories() for name in categorical}
+        self.columns = {}
+        for name in self.fields:
+            if name in self.categories:
+                self.columns[name] = array("I")
+            else:
+                typecode = TYPECODES.get(record_type.__annotations__.get(name))
+                self.columns[name] = array(typecode) if typecode else []
+        self._appenders = [
+            (self.columns[name].append, self.categories.get(name))
+            for name in self.fields
+        ]
+
+    def append(self, record):
+        """Add one record (any sequence in field order)"""
+        for (append, categories), value in zip(self._appenders, record):
+            append(categories.code(value) if categories else value)
+
+    def extend(self, records):
+        """Add every record from an iterable"""
+        for record in records:
+            self.append(record)
+
+    def __len__(self):
+        return len(self.columns[self.fields[0]])
+
+    def column(self, name):
+        """Decoded values of one column"""
+        values = self.columns[name]
+        if name in self.categories:
+            return [self.categories[name].values[code] for code in values]
+        if self.record_type.__annotations__.get(name) is bool:
+            return [bool(v) for v in values]
+        return list(values)
+
+    def codes(self, name):
+        """
+        NumPy view of a numeric or categorical column without copying
+
+        Returns:
+            tuple: (array, category values or None)
+        """
+        import numpy as np
+
+        values = np.frombuffer(self.columns[name], dtype=self.columns[name].typecode)
+        categories = self.categories.get(name)
+        return values, categories.values if categories else None
+
+    def rows(self):
+        """Iterate over rows as plain tuples in field order"""
+        columns = []
+        for name in self.fields:
+            values = self.columns[name]
+            if name in self.categories:
+                columns.append(map(self.categories[name].values.__getitem__, values))
+            elif self.record_type.__annotations__.get(name) is bool:
+                columns.append(map(bool, values))
+            else:
+                columns.append(values)
+        return zip(*columns)
+
+    def records(self):
+        """Iterate over rows as record_type instances"""
+        return map(self.record_type._make, self.rows())
+
+    def clear(self):
+        """Drop buffered rows, keeping the interned categories"""
+        for name, values in self.columns.items():
+            del values[:]
+
+    def nbytes(self):
+        """Approximate bytes held by the column storage"""
+        total = 0
+        for name, values in self.columns.items():
+            if isinstance(values, array):
+                total += values.itemsize * len(values)
+            else:
+                total += sys.getsizeof(values) + sum(map(sys.getsizeof, values))
+        for categories in self.categories.values():
+            total += sum(map(sys.getsizeof, categories.values))
+        return total
+
+
+def _source(source, record_type):
+    if isinstance(source, ColumnBuffer):
+        return source.record_type, source.rows()
+    if record_type is None:
+        raise ValueError("record_type is required unless writing a ColumnBuffer")
+    return record_type, source
+
+
+def write_sqlite(cursor, table, source, record_type=None, ignore_conflicts=False):
+    """
+    Insert records with a single executemany
+
+    Records are tuples in column order, so they are handed to SQLite as-is.
+
+    Args:
+        cursor: SQLite cursor or connection
+        table: Destination table, with columns named after the record fields
+        source: ColumnBuffer, or an iterable of records or plain tuples
+        record_type: NamedTuple class, required unless source is a ColumnBuffer
+        ignore_conflicts: Use INSERT OR IGNORE
+
+    Returns:
+        int: Number of rows inserted
+    """
+    record_type, rows = _source(source, record_type)
+    fields = record_type._fields
+    verb = "INSERT OR IGNORE" if ignore_conflicts else "INSERT"
+    result = cursor.executemany(
+        f"{verb} INTO {table} ({', '.join(fields)}) "
+        f"VALUES ({', '.join('?' * len(fields))})",
+        rows,
+    )
+    return result.rowcount
+
+
+def write_csv(path, source, record_type=None):
+    """
+    Write records to a CSV file with a header row
+
+    Args:
+        path: Destination file path
+        source: ColumnBuffer, or an iterable of records or plain tuples
+        record_type: NamedTuple class, required unless source is a ColumnBuffer
+
+    Returns:
+        int: Number of rows written
+    """
+    record_type, rows = _source(source, record_type)
+    written = 0
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(record_type._fields)
+        for row in rows:
+            writer.writerow(row)
+            written += 1
+    return written
@@ -0,0 +1,317 @@
+import os
+import sqlite3
+import argparse
+import logging
+from datetime import date
+
+import numpy as np
+
+from constants import (
+    AGE_DISTRIBUTION_2024,
+    SEX_DISTRIBUTION_2024,
+    ETHNICITY_DISTRIBUTION,
+    BLOOD_TYPE_BY_ETHNICITY,
+)
+from name_pool import draw_names
+from geography import regions, region_table, sample_region_ethnicities
+from id_generator import COUNTER_BITS, to_unix_ms, uuid7_array
+from records import DonorRecord, write_sqlite
+from summary_tables import ensure_summaries, record_donors
+
+logger = logging.getLogger(__name__)
+
+# Scale factor 1 matches the size of the shipped donors.sqlite3
+DONORS_PER_SCALE_FACTOR = 3000
+
+# Philox4x32-10 constants (Salmon et al., "Parallel Random Numbers: As Easy as 1, 2, 3")
+PHILOX_M0 = np.uint64(0xD2511F53)
+PHILOX_M1 = np.uint64(0xCD9E8D57)
+PHILOX_W0 = np.uint32(0x9E3779B9)
+PHILOX_W1 = np.uint32(0xBB67AE85)
+PHILOX_ROUNDS = 10
+
+# Each donor row draws from its own counters; the stream word keeps the
+# demographics, donation history, name and id on separate blocks
+STREAM_DEMOGRAPHICS = 0
+STREAM_HISTORY = 1
+STREAM_NAMES = 2
+STREAM_IDS = 3
+
+MASK32 = np.uint64(0xFFFFFFFF)
+
+
+def philox4x32(counters, key):
+    """
+    Philox4x32-10 counter-based generator, vectorised over counters
+
+    Args:
+        counters: uint32 array of shape (n, 4)
+        key: Pair of 32-bit key words
+
+    Returns:
+        np.ndarray: uint32 array of shape (n, 4) with the random output
+    """
+    ctr = np.asarray(counters, dtype=np.uint32)
+    c0, c1, c2, c3 = (ctr[:, i].astype(np.uint64) for i in range(4))
+    k0 = np.uint32(key[0])
+    k1 = np.uint32(key[1])
+
+    with np.errstate(over="ignore"):
+        for round_no in range(PHILOX_ROUNDS):
+            if round_no:
+                k0 = np.uint32(k0 + PHILOX_W0)
+                k1 = np.uint32(k1 + PHILOX_W1)
+            prod0 = PHILOX_M0 * c0
+            prod1 = PHILOX_M1 * c2
+            hi0, lo0 = prod0 >> np.uint64(32), prod0 & MASK32
+            hi1, lo1 = prod1 >> np.uint64(32), prod1 & MASK32
+            c0 = hi1 ^ c1 ^ np.uint64(k0)
+            c1 = lo1
+            c2 = hi0 ^ c3 ^ np.uint64(k1)
+            c3 = lo0
+
+    return np.stack([c0, c1, c2, c3], axis=1).astype(np.uint32)
+
+
+def row_random_bits(start, stop, seed, stream):
+    """
+    Draw four 32-bit words for every row index in [start, stop)
+
+    The output for a row depends only on (seed, row index, stream), so any
+    slice can be produced on its own and yields the same values it would
+    have had as part of a bigger run.
+
+    Args:
+        start: First row index (inclusive)
+        stop: Last row index (exclusive)
+        seed: Run seed, used as the Philox key
+        stream: Which block of draws to produce for each row
+
+    Returns:
+        np.ndarray: uint32 array of shape (stop - start, 4)
+    """
+    rows = np.arange(start, stop, dtype=np.uint64)
+    counters = np.empty((len(rows), 4), dtype=np.uint32)
+    counters[:, 0] = rows & MASK32
+    counters[:, 1] = rows >> np.uint64(32)
+    counters[:, 2] = stream
+    counters[:, 3] = 0
+    seed = int(seed) & 0xFFFFFFFFFFFFFFFF
+    return philox4x32(counters, (seed & 0xFFFFFFFF, seed >> 32))
+
+
+def to_uniform(bits):
+    """Map uint32 words to floats in the open interval (0, 1)"""
+    return (bits.astype(np.float64) + 0.5) / 4294967296.0
+
+
+def donor_count(scale_factor):
+    """Number of donor rows for a given scale factor"""
+    return int(round(scale_factor * DONORS_PER_SCALE_FACTOR))
+
+
+def _cdf(probabilities):
+    cdf = np.cumsum(np.asarray(probabilities, dtype=np.float64))
+    return cdf / cdf[-1]
+
+
+def _pick(cdf, uniforms):
+    return np.minimum(np.searchsorted(cdf, uniforms, side="left"), len(cdf) - 1)
+
+
+# Distribution tables flattened once into arrays for searchsorted
+AGE_LOW = np.array(
+    [a.start if isinstance(a, range) else a for a, _ in AGE_DISTRIBUTION_2024]
+)
+AGE_WIDTH = np.array(
+    [len(a) if isinstance(a, range) else 1 for a, _ in AGE_DISTRIBUTION_2024]
+)
+AGE_CDF = _cdf([p for _, p in AGE_DISTRIBUTION_2024])
+ETHNICITIES = np.array([e for e, _ in ETHNICITY_DISTRIBUTION], dtype=object)
+ZIP_CODES = np.array([r.zip_code for r in regions()], dtype=object)
+BLOOD_TYPES = np.array(
+    [bt for bt, _ in BLOOD_TYPE_BY_ETHNICITY[ETHNICITIES[0]]], dtype=object
+)
+BLOOD_TYPE_CDFS = np.stack(
+    [_cdf([p for _, p in BLOOD_TYPE_BY_ETHNICITY[e]]) for e in ETHNICITIES]
+)
+
+
+def _format_dates(ordinals):
+    epoch = date(1970, 1, 1).toordinal()
+    days = (np.asarray(ordinals, dtype=np.int64) - epoch).astype("datetime64[D]")
+    return np.datetime_as_string(days).tolist()
+
+
+def _donor_uuids(start, stop, words, as_of):
+    """
+    Time-ordered donor IDs for rows [start, stop)
+
+    The row index fills the UUIDv7 counter and carries into the timestamp,
+    exactly as IdGenerator does when its counter overflows, so IDs sort in
+    row order and inserts append to the primary key index.
+    """
+    rows = np.arange(start, stop, dtype=np.uint64)
+    unix_ms = np.uint64(to_unix_ms(as_of)) + (rows >> np.uint64(COUNTER_BITS))
+    rand_bits = (words[:, 0].astype(np.uint64) << np.uint64(32)) | words[:, 1]
+    return uuid7_array(unix_ms, rows, rand_bits)
+
+
+def generate_donor_rows(start, stop, seed=42, as_of=None):
+    """
+    Generate donor rows [start, stop) of a scale-factor dataset
+
+    Rows follow the same distributions as ``DonorFactory`` but every value
+    is derived from a counter-based RNG keyed by the seed and the row
+    index, so slices can be generated independently and in any order.
+
+    Args:
+        start: First row index (inclusive)
+        stop: Last row index (exclusive)
+        seed: Random seed for reproducibility
+        as_of: Reference date for ages and donation dates, defaults to today
+
+    Returns:
+        list: Tuples in ``donors`` table column order
+    """
+    if stop <= start:
+        return []
+    as_of = as_of or date.today()
+    today = as_of.toordinal()
+
+    demo = to_uniform(row_random_bits(start, stop, seed, STREAM_DEMOGRAPHICS))
+    history = to_uniform(row_random_bits(start, stop, seed, STREAM_HISTORY))
+    names = to_uniform(row_random_bits(start, stop, seed, STREAM_NAMES))
+    id_bits = row_random_bits(start, stop, seed, STREAM_IDS)
+
+    # Age: pick a bucket, then a year inside the bucket
+    bucket = _pick(AGE_CDF, demo[:, 0])
+    age = AGE_LOW[bucket] + (demo[:, 1] * AGE_WIDTH[bucket]).astype(np.int64)
+
+    sex = np.where(demo[:, 2] <= SEX_DISTRIBUTION_2024[0][1], "Male", "Female")
+
+    # Region and then the region's own ethnicity mix, both via alias tables
+    region = region_table().sample_array(names[:, 2])
+    zip_codes = ZIP_CODES[region]
+    eth_idx = sample_region_ethnicities(region, demo[:, 3])
+    bt_cdf = BLOOD_TYPE_CDFS[eth_idx]
+    bt_idx = np.minimum(
+        (bt_cdf < history[:, 0][:, None]).sum(axis=1), BLOOD_TYPES.size - 1
+    )
+
+    # Donation dates mirror DonorFactory._generate_donation_dates
+    birth = today - age * 365
+    first_possible = birth + 17 * 365
+    window = today - first_possible
+    first = first_possible + (history[:, 1] * (window + 1)).astype(np.int64)
+    max_donations = np.minimum((today - first) // 56, 102)
+    total = np.where(
+        max_donations > 0,
+        1 + (history[:, 2] * np.maximum(max_donations, 1)).astype(np.int64),
+        1,
+    )
+    last = first + 56 * (total - 1)
+
+    full_names = draw_names(sex, names[:, 0], names[:, 1])
+    donor_ids = _donor_uuids(start, stop, id_bits, as_of)
+    unique_ids = [f"DON-{i:08x}" for i in range(start, stop)]
+
+    return list(
+        zip(
+            donor_ids,
+            unique_ids,
+            full_names,
+            _format_dates(birth),
+            age.tolist(),
+            sex.tolist(),
+            ETHNICITIES[eth_idx].tolist(),
+            BLOOD_TYPES[bt_idx].tolist(),
+            _format_dates(first),
+            _format_dates(last),
+            total.tolist(),
+            zip_codes.tolist(),
+        )
+    )
+
+
+def populate_donor_slice(db_path, start, stop, seed=42, as_of=None, chunk_size=100_000):
+    """
+    Write donor rows [start, stop) into the donors table at db_path
+
+    Args:
+        db_path: Path to a database with the ``donors`` table created
+        start: First row index (inclusive)
+        stop: Last row index (exclusive)
+        seed: Random seed for reproducibility
+        as_of: Reference date for ages and donation dates, defaults to today
+        chunk_size: Rows generated and inserted per batch
+
+    Returns:
+        int: Number of rows written
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    ensure_summaries(conn, "donors")
+    written = 0
+    for chunk_start in range(start, stop, chunk_size):
+        chunk_stop = min(chunk_start + chunk_size, stop)
+        rows = generate_donor_rows(chunk_start, chunk_stop, seed, as_of)
+        write_sqlite(cursor, "donors", rows, DonorRecord)
+        record_donors(cursor, rows)
+        conn.commit()
+        written += chunk_stop - chunk_start
+    conn.close()
+    logger.info(f"Generated donor rows {start}-{stop} and saved to {db_path}")
+    return written
+
+
+def populate_scale_factor_database(db_path, scale_factor, seed=42, as_of=None):
+    """
+    Populate the donors table with every row of the given scale factor
+
+    Args:
+        db_path: Path to a database with the ``donors`` table created
+        scale_factor: Dataset size, 1.0 == DONORS_PER_SCALE_FACTOR donors
+        seed: Random seed for reproducibility
+        as_of: Reference date for ages and donation dates, defaults to today
+
+    Returns:
+        int: Number of rows written
+    """
+    return populate_donor_slice(db_path, 0, donor_count(scale_factor), seed, as_of)
+
+
+if __name__ == "__main__":
+    from main import create_donor_database
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(
+        description="Generate a slice of a scale-factor donor dataset"
+    )
+    parser.add_argument(
+        "--scale_factor", type=float, default=1.0, help="Dataset scale factor"
+    )
+    parser.add_argument(
+        "--start", type=int, default=0, help="First donor row to generate"
+    )
+    parser.add_argument(
+        "--stop",
+        type=int,
+        default=None,
+        help="Row to stop before, defaults to the end of the scale factor",
+    )
+    parser.add_argument(
+        "--as_of",
+        type=date.fromisoformat,
+        default=None,
+        help="Reference date (YYYY-MM-DD), defaults to today",
+    )
+    parser.add_argument("--output", required=True, help="SQLite file to write")
+    parser.add_argument(
+        "--seed", type=int, default=42, help="Random seed for reproducibility"
+    )
+    args = parser.parse_args()
+
+    stop = args.stop if args.stop is not None else donor_count(args.scale_factor)
+    create_donor_database(os.path.abspath(args.output))
+    populate_donor_slice(args.output, args.start, stop, args.seed, args.as_of)
@@ -0,0 +1,368 @@
+import os
+import sys
+import json
+import shutil
+import struct
+import sqlite3
+import hashlib
+import logging
+import argparse
+import tempfile
+from datetime import datetime, timezone
+from urllib.parse import quote
+
+logger = logging.getLogger(__name__)
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DATA_DIR = os.path.join(ROOT_DIR, "data")
+PUBLISH_DIR = os.path.join(DATA_DIR, "snapshots")
+PUBLISHED_DBS = [
+    os.path.join(DATA_DIR, "donors.sqlite3"),
+    os.path.join(DATA_DIR, "donations.sqlite3"),
+]
+
+MANIFEST = "manifest.json"
+# Uncompressed copy of the last published version, diffed against on the
+# next publish; it is publisher state, not something to download
+STATE_DIR = ".state"
+
+DELTA_MAGIC = b"CCDELTA1"
+DELTA_HEADER = struct.Struct(">8sIII")  # magic, page_size, page_count, pages
+PAGE_NUMBER = struct.Struct(">I")
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError(
+            "Snapshots are compressed with zstd: pip install zstandard"
+        ) from e
+    return zstandard
+
+
+def file_digest(path):
+    """SHA-256 hex digest of a file"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def consistent_copy(db_path, target):
+    """
+    Copy a database page by page with the backup API
+
+    The copy is a committed state even while writers are active, and keeps
+    every page at its original page number, so unchanged pages diff clean.
+    """
+    source = sqlite3.connect(f"file:{quote(os.path.abspath(db_path))}?mode=ro", uri=True)
+    copy = sqlite3.connect(target)
+    source.backup(copy)
+    copy.close()
+    source.close()
+
+
+def _page_size(path):
+    with open(path, "rb") as f:
+        f.seek(16)
+        size = int.from_bytes(f.read(2), "big")
+    # The header stores 65536 as 1
+    return 65536 if size == 1 else size
+
+
+def diff_pages(old_path, new_path):
+    """
+    Pages of new_path that differ from old_path
+
+    Returns:
+        tuple: (page_size, page_count, [(page_number, page bytes), ...]) with
+            1-based page numbers; None if the page sizes differ
+    """
+    page_size = _page_size(new_path)
+    if _page_size(old_path) != page_size:
+        return None
+    changed = []
+    with open(old_path, "rb") as old, open(new_path, "rb") as new:
+        number = 0
+        while True:
+            page = new.read(page_size)
+            if not page:
+                break
+            number += 1
+            if old.read(page_size) != page:
+                changed.append((number, page))
+    return page_size, number, changed
+
+
+def encode_delta(page_size, page_count, pages, level):
+    """Serialize and compress a page delta"""
+    parts = [DELTA_HEADER.pack(DELTA_MAGIC, page_size, page_count, len(pages))]
+    for number, page in pages:
+        parts.append(PAGE_NUMBER.pack(number))
+        parts.append(page)
+    return _zstd().ZstdCompressor(level=level).compress(b"".join(parts))
+
+
+def apply_delta(path, blob):
+    """
+    Apply a compressed page delta to the database file at path in place
+
+    Returns:
+        int: Number of pages written
+    """
+    data = _zstd().ZstdDecompressor().decompress(blob)
+    magic, page_size, page_count, count = DELTA_HEADER.unpack_from(data)
+    if magic != DELTA_MAGIC:
+        raise ValueError("Not a CrimsonCache page delta")
+    offset = DELTA_HEADER.size
+    with open(path, "r+b") as f:
+        for _ in range(count):
+            (number,) = PAGE_NUMBER.unpack_from(data, offset)
+            offset += PAGE_NUMBER.size
+            f.seek((number - 1) * page_size)
+            f.write(data[offset:offset + page_size])
+            offset += page_size
+        f.truncate(page_count * page_size)
+    return count
+
+
+def _compress_file(source, target, level):
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        _zstd().ZstdCompressor(level=level).copy_stream(src, dst)
+
+
+def _decompress_file(source, target):
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        _zstd().ZstdDecompressor().copy_stream(src, dst)
+
+
+def load_manifest(directory):
+    """Manifest of a published database, or an empty one"""
+    path = os.path.join(directory, MANIFEST)
+    if not os.path.exists(path):
+        return {"versions": []}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save_manifest(directory, manifest):
+    tmp = os.path.join(directory, MANIFEST + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, os.path.join(directory, MANIFEST))
+
+
+def publish(db_path, publish_dir=PUBLISH_DIR, base_every=30, level=10):
+    """
+    Publish the current state of a database as the next version
+
+    Every version after the first gets a page delta against the previous
+    one, so any published copy can roll forward with deltas alone. A full
+    compressed base is also written for the first version, every
+    `base_every` versions and whenever the page size changes, which bounds
+    the chain a fresh download has to replay.
+
+    Args:
+        db_path: SQLite database to publish
+        publish_dir: Root directory of the published snapshots
+        base_every: Versions between full base snapshots
+        level: zstd compression level
+
+    Returns:
+        dict: Manifest entry of the new version, or None if nothing changed
+
+    Raises:
+        FileNotFoundError: If db_path does not exist; nothing is written
+    """
+    if not os.path.isfile(db_path):
+        raise FileNotFoundError(f"No database to publish at {db_path}")
+    name = os.path.splitext(os.path.basename(db_path))[0]
+    directory = os.path.join(publish_dir, name)
+    state_dir = os.path.join(directory, STATE_DIR)
+    os.makedirs(state_dir, exist_ok=True)
+    state = os.path.join(state_dir, f"{name}.sqlite3")
+
+    manifest = load_manifest(directory)
+    versions = manifest["versions"]
+    snapshot = os.path.join(state_dir, f"{name}.new")
+    consistent_copy(db_path, snapshot)
+    digest = file_digest(snapshot)
+
+    if versions and os.path.exists(state) and versions[-1]["sha256"] == digest:
+        os.remove(snapshot)
+        logger.info(f"{name} is unchanged since version {versions[-1]['version']}")
+        return None
+
+    version = versions[-1]["version"] + 1 if versions else 1
+    entry = {
+        "version": version,
+        "sha256": digest,
+        "size": os.path.getsize(snapshot),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "base": None,
+        "delta": None,
+    }
+
+    diff = None
+    if versions:
+        if not os.path.exists(state) or file_digest(state) != versions[-1]["sha256"]:
+            raise RuntimeError(f"Publisher state for {name} does not match the manifest")
+        diff = diff_pages(state, snapshot)
+    if diff is not None:
+        page_size, page_count, pages = diff
+        blob = encode_delta(page_size, page_count, pages, level)
+        delta_file = f"delta-{version:06d}.zst"
+        with open(os.path.join(directory, delta_file), "wb") as f:
+            f.write(blob)
+        entry["delta"] = {
+            "file": delta_file,
+            "from_version": version - 1,
+            "blob_sha256": hashlib.sha256(blob).hexdigest(),
+            "pages": len(pages),
+            "bytes": len(blob),
+        }
+
+    last_base = max((v["version"] for v in versions if v["base"]), default=None)
+    if diff is None or last_base is None or version - last_base >= base_every:
+        base_file = f"base-{version:06d}.sqlite3.zst"
+        base_path = os.path.join(directory, base_file)
+        _compress_file(snapshot, base_path, level)
+        entry["base"] = {
+            "file": base_file,
+            "blob_sha256": file_digest(base_path),
+            "bytes": os.path.getsize(base_path),
+        }
+
+    os.replace(snapshot, state)
+    versions.append(entry)
+    _save_manifest(directory, manifest)
+    logger.info(
+        f"Published {name} version {version}"
+        + (f", delta {entry['delta']['pages']} pages / {entry['delta']['bytes']} bytes" if entry["delta"] else "")
+        + (f", base {entry['base']['bytes']} bytes" if entry["base"] else "")
+    )
+    return entry
+
+
+def _verified_blob(directory, part):
+    with open(os.path.join(directory, part["file"]), "rb") as f:
+        blob = f.read()
+    if hashlib.sha256(blob).hexdigest() != part["blob_sha256"]:
+        raise ValueError(f"{part['file']} is corrupt (checksum mismatch)")
+    return blob
+
+
+def restore(directory, target, version=None):
+    """
+    Bring `target` to a published version, downloading as little as possible
+
+    If target already holds a published version, only the deltas after it
+    are applied; otherwise the newest base at or before the requested
+    version is unpacked and rolled forward. Every blob is checked against
+    the manifest, the result must hash to the version's sha256 and pass
+    PRAGMA quick_check, and target is replaced atomically.
+
+    Args:
+        directory: Published directory of one database (holds manifest.json)
+        target: Database file to create or update
+        version: Version to restore, defaults to the latest
+
+    Returns:
+        dict: {"version", "from_version", "base", "deltas"} describing the work
+    """
+    versions = {v["version"]: v for v in load_manifest(directory)["versions"]}
+    if not versions:
+        raise ValueError(f"Nothing has been published in {directory}")
+    version = version or max(versions)
+    if version not in versions:
+        raise ValueError(f"Version {version} is not in the manifest")
+
+    current = None
+    if os.path.exists(target):
+        digest = file_digest(target)
+        current = next((v for v, e in versions.items() if e["sha256"] == digest), None)
+        if current == version:
+            return {"version": version, "from_version": current, "base": None, "deltas": 0}
+
+    chain_ok = current is not None and current < version and all(
+        versions[v]["delta"] for v in range(current + 1, version + 1)
+    )
+    work = tempfile.NamedTemporaryFile(
+        dir=os.path.dirname(os.path.abspath(target)), suffix=".restore", delete=False
+    ).name
+    try:
+        base = None
+        if chain_ok:
+            start = current
+            shutil.copyfile(target, work)
+        else:
+            # Newest base from which every later version up to the target has a delta
+            start = next(
+                v for v in range(version, 0, -1)
+                if versions.get(v, {}).get("base")
+                and all(versions[u]["delta"] for u in range(v + 1, version + 1))
+            )
+            base = versions[start]["base"]["file"]
+            blob_path = os.path.join(directory, base)
+            _verified_blob(directory, versions[start]["base"])
+            _decompress_file(blob_path, work)
+        for v in range(start + 1, version + 1):
+            apply_delta(work, _verified_blob(directory, versions[v]["delta"]))
+
+        if file_digest(work) != versions[version]["sha256"]:
+            raise ValueError(f"Restored database does not match version {version}")
+        conn = sqlite3.connect(work)
+        check = conn.execute("PRAGMA quick_check").fetchone()[0]
+        conn.close()
+        if check != "ok":
+            raise ValueError(f"Restored database failed quick_check: {check}")
+        os.replace(work, target)
+    finally:
+        if os.path.exists(work):
+            os.remove(work)
+
+    logger.info(f"Restored {target} to version {version} from {start}")
+    return {
+        "version": version,
+        "from_version": current if chain_ok else None,
+        "base": base,
+        "deltas": version - start,
+    }
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(
+        description="Publish versioned database snapshots or restore from them"
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    pub = sub.add_parser("publish", help="Publish the current databases")
+    pub.add_argument("dbs", nargs="*", default=PUBLISHED_DBS, help="Databases to publish")
+    pub.add_argument("--publish_dir", default=PUBLISH_DIR, help="Snapshot directory")
+    pub.add_argument("--base_every", type=int, default=30, help="Versions between full bases")
+    pub.add_argument("--level", type=int, default=10, help="zstd compression level")
+
+    res = sub.add_parser("apply", help="Rebuild or update a database from snapshots")
+    res.add_argument("directory", help="Published directory of one database")
+    res.add_argument("target", help="Database file to create or update")
+    res.add_argument("--version", type=int, default=None, help="Version to restore")
+
+    args = parser.parse_args()
+    if args.command == "publish":
+        missing = [db_path for db_path in args.dbs if not os.path.isfile(db_path)]
+        for db_path in missing:
+            logger.warning(f"Skipping {db_path}: no such database")
+        if len(missing) == len(args.dbs):
+            sys.exit("No databases to publish")
+        for db_path in args.dbs:
+            if db_path not in missing:
+                publish(db_path, args.publish_dir, args.base_every, args.level)
+    else:
+        try:
+            result = restore(args.directory, args.target, args.version)
+        except ValueError as e:
+            sys.exit(str(e))
+        print(json.dumps(result))
@@ -0,0 +1,138 @@
+import math
+import heapq
+import itertools
+from collections import defaultdict
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def to_unit_vector(lat, lon):
+    """Convert latitude/longitude in degrees to a point on the unit sphere"""
+    phi = math.radians(lat)
+    lam = math.radians(lon)
+    return (
+        math.cos(phi) * math.cos(lam),
+        math.cos(phi) * math.sin(lam),
+        math.sin(phi),
+    )
+
+
+def chord_to_km(chord):
+    """Great-circle distance in km for a chord length on the unit sphere"""
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+
+def km_to_chord(km):
+    """Chord length on the unit sphere for a great-circle distance in km"""
+    return 2 * math.sin(min(math.pi, km / EARTH_RADIUS_KM) / 2)
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km between two latitude/longitude points"""
+    a = to_unit_vector(lat1, lon1)
+    b = to_unit_vector(lat2, lon2)
+    return chord_to_km(math.dist(a, b))
+
+
+class GridIndex:
+    """
+    Uniform grid over the unit sphere for nearest-facility lookups
+
+    Points are stored as 3D unit vectors, so straight-line (chord) distance
+    orders points exactly as great-circle distance does, with no projection
+    error at regional or national scale. A query searches cube shells of grid
+    cells outward from the query cell and stops as soon as no unsearched cell
+    can hold anything closer than the k-th best match so far.
+    """
+
+    def __init__(self, points, cell_size_km=50.0):
+        """
+        Build the index
+
+        Args:
+            points: Iterable of (key, latitude, longitude)
+            cell_size_km: Approximate edge length of a grid cell
+        """
+        self.cell_size = km_to_chord(cell_size_km)
+        self.cells = defaultdict(list)
+        self.size = 0
+        for key, lat, lon in points:
+            vector = to_unit_vector(lat, lon)
+            self.cells[self._cell(vector)].append((vector, key))
+            self.size += 1
+
+    def _cell(self, vector):
+        return tuple(math.floor(c / self.cell_size) for c in vector)
+
+    def _shell(self, center, radius):
+        """Occupied cells at Chebyshev distance `radius` from `center`"""
+        cx, cy, cz = center
+        for dx in range(-radius, radius + 1):
+            for dy in range(-radius, radius + 1):
+                edge = abs(dx) == radius or abs(dy) == radius
+                for dz in (
+                    range(-radius, radius + 1) if edge else (-radius, radius)
+                ):
+                    cell = (cx + dx, cy + dy, cz + dz)
+                    if cell in self.cells:
+                        yield cell
+
+    def nearest(self, lat, lon, k=1, predicate=None, max_distance_km=None):
+        """
+        Find the k nearest points, optionally only those matching a predicate
+
+        Args:
+            lat: Query latitude in degrees
+            lon: Query longitude in degrees
+            k: Number of matches to return
+            predicate: Optional callable taking a key, True to accept it
+            max_distance_km: Optional search radius
+
+        Returns:
+            list: (distance_km, key) tuples, closest first
+        """
+        query = to_unit_vector(lat, lon)
+        center = self._cell(query)
+        limit = km_to_chord(max_distance_km) if max_distance_km else 2.0
+        best = []  # max-heap of (-chord, tiebreak, key)
+        tiebreak = itertools.count()
+        # A unit sphere spans at most 2 / cell_size cells along any axis
+        max_radius = int(2 / self.cell_size) + 2
+
+        for radius in range(max_radius + 1):
+            # Anything in this shell or beyond is at least this far away
+            floor = (radius - 1) * self.cell_size
+            if floor > limit or (len(best) == k and floor > -best[0][0]):
+                break
+            # Past the point where walking shells costs more than the points
+            # themselves, scan every remaining cell directly
+            if radius and (2 * radius + 1) ** 3 > 4 * len(self.cells):
+                cells = (
+                    cell
+                    for cell in self.cells
+                    if max(abs(a - b) for a, b in zip(cell, center)) >= radius
+                )
+                self._collect(cells, query, k, predicate, limit, best, tiebreak)
+                break
+            self._collect(
+                self._shell(center, radius), query, k, predicate, limit, best, tiebreak
+            )
+
+        return [(chord_to_km(-neg), key) for neg, _, key in sorted(best, reverse=True)]
+
+    def _collect(self, cells, query, k, predicate, limit, best, tiebreak):
+        """Push points from `cells` that beat the current k-th best onto `best`"""
+        for cell in cells:
+            for vector, key in self.cells[cell]:
+                chord = math.dist(query, vector)
+                if chord > limit:
+                    continue
+                if len(best) == k and chord >= -best[0][0]:
+                    continue
+                if predicate is not None and not predicate(key):
+                    continue
+                item = (-chord, -next(tiebreak), key)
+                if len(best) < k:
+                    heapq.heappush(best, item)
+                else:
+                    heapq.heapreplace(best, item)
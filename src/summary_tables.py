@@ -0,0 +1,297 @@
+import sys
+import sqlite3
+import logging
+import argparse
+from collections import Counter
+
+from records import DonorRecord
+
+logger = logging.getLogger(__name__)
+
+# Bound parameters per blood type lookup, under SQLite's default limit
+LOOKUP_CHUNK = 900
+
+# Each summary: source table, schema, key columns and the GROUP BY that
+# defines it, plus any other table the query joins. Generators apply
+# deltas; the query is used for backfill, rebuild and checks.
+SUMMARIES = {
+    "daily_units": {
+        "source": "donations",
+        "schema": """
+        CREATE TABLE IF NOT EXISTS daily_units (
+            donation_date DATE NOT NULL,
+            blood_type TEXT NOT NULL,
+            units INTEGER NOT NULL,
+            PRIMARY KEY (donation_date, blood_type)
+        ) WITHOUT ROWID
+        """,
+        "keys": ("donation_date", "blood_type"),
+        "value": "units",
+        # Blood type comes from the donor, whatever format the bag IDs have
+        "joins": ("donors",),
+        "query": """
+        SELECT d.donation_date, r.blood_type, COUNT(*)
+        FROM donations d JOIN donors r ON r.donor_id = d.donor_id
+        GROUP BY 1, 2
+        """,
+    },
+    "donor_mix": {
+        "source": "donors",
+        "schema": """
+        CREATE TABLE IF NOT EXISTS donor_mix (
+            ethnicity TEXT NOT NULL,
+            blood_type TEXT NOT NULL,
+            donors INTEGER NOT NULL,
+            PRIMARY KEY (ethnicity, blood_type)
+        ) WITHOUT ROWID
+        """,
+        "keys": ("ethnicity", "blood_type"),
+        "value": "donors",
+        "query": "SELECT ethnicity, blood_type, COUNT(*) FROM donors GROUP BY 1, 2",
+    },
+    "age_histogram": {
+        "source": "donors",
+        "schema": """
+        CREATE TABLE IF NOT EXISTS age_histogram (
+            age INTEGER PRIMARY KEY,
+            donors INTEGER NOT NULL
+        )
+        """,
+        "keys": ("age",),
+        "value": "donors",
+        "query": "SELECT age, COUNT(*) FROM donors GROUP BY 1",
+    },
+}
+
+AGE_IDX = DonorRecord._fields.index("age")
+ETHNICITY_IDX = DonorRecord._fields.index("ethnicity")
+BLOOD_TYPE_IDX = DonorRecord._fields.index("blood_type")
+
+
+def _tables(conn, schema="main"):
+    return {
+        row[0]
+        for row in conn.execute(f"SELECT name FROM {schema}.sqlite_master WHERE type = 'table'")
+    }
+
+
+def _visible_tables(conn):
+    """Tables reachable by unqualified name, including attached databases"""
+    return set().union(*(_tables(conn, row[1]) for row in conn.execute("PRAGMA database_list")))
+
+
+def _attach_donors(conn, donor_db):
+    """Attach donor_db if the connection cannot see a donors table yet"""
+    if donor_db is None or "donors" in _visible_tables(conn):
+        return False
+    conn.execute("ATTACH DATABASE ? AS summary_donors", (donor_db,))
+    return True
+
+
+def donor_blood_types(conn, donor_ids):
+    """
+    Look up the blood type of each donor
+
+    Args:
+        conn: Connection on which a donors table is visible
+        donor_ids: Donor IDs to look up
+
+    Returns:
+        dict: {donor_id: blood_type} for the donors found
+    """
+    donor_ids = list(set(donor_ids))
+    blood_types = {}
+    for i in range(0, len(donor_ids), LOOKUP_CHUNK):
+        chunk = donor_ids[i:i + LOOKUP_CHUNK]
+        blood_types.update(conn.execute(
+            f"SELECT donor_id, blood_type FROM donors "
+            f"WHERE donor_id IN ({', '.join('?' * len(chunk))})",
+            chunk,
+        ))
+    return blood_types
+
+
+def ensure_summaries(conn, source, donor_db=None):
+    """
+    Create the summary tables for a source table, backfilling new ones
+
+    A summary created next to existing raw rows is filled from them, so
+    databases generated before the summaries existed stay consistent.
+
+    Args:
+        conn: Connection to the database holding `source`
+        source: "donors" or "donations"
+        donor_db: Donors database to attach for summaries that join donors,
+            if the connection does not already see one
+
+    Raises:
+        ValueError: If existing rows need a donors table to backfill and
+            none is available
+
+    Returns:
+        None
+    """
+    existing = _tables(conn)
+    # Only existing rows need a backfill, and with it any joined table
+    backfill = source in existing and conn.execute(
+        f"SELECT EXISTS (SELECT 1 FROM main.{source})"
+    ).fetchone()[0]
+    attached = _attach_donors(conn, donor_db) if backfill else False
+    try:
+        visible = _visible_tables(conn)
+        for name, summary in SUMMARIES.items():
+            if summary["source"] != source or name in existing:
+                continue
+            missing = set(summary.get("joins", ())) - visible
+            if backfill and missing:
+                raise ValueError(
+                    f"Backfilling {name} needs the {', '.join(sorted(missing))} table"
+                )
+            conn.execute(summary["schema"])
+            if backfill:
+                conn.execute(f"INSERT INTO {name} {summary['query']}")
+                logger.info(f"Backfilled {name} from {source}")
+        if attached:
+            conn.commit()
+    finally:
+        if attached:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.execute("DETACH DATABASE summary_donors")
+
+
+def _upsert(cursor, name, deltas):
+    summary = SUMMARIES[name]
+    keys = summary["keys"]
+    value = summary["value"]
+    cursor.executemany(
+        f"INSERT INTO {name} ({', '.join(keys)}, {value}) "
+        f"VALUES ({', '.join('?' * (len(keys) + 1))}) "
+        f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {value} = {value} + excluded.{value}",
+        [(*key, count) for key, count in deltas.items()],
+    )
+
+
+def record_donations(cursor, events, blood_types):
+    """
+    Add a batch of new donations to daily_units
+
+    Call on the cursor that inserted the donations, so the summary commits
+    or rolls back with them. Like the summary's join, donations whose donor
+    is unknown are not counted.
+
+    Args:
+        cursor: Cursor on the donations database
+        events: DonationRecord instances just inserted
+        blood_types: {donor_id: blood_type} covering the events' donors
+    """
+    deltas = Counter(
+        (event.donation_date, blood_types[event.donor_id])
+        for event in events
+        if event.donor_id in blood_types
+    )
+    _upsert(cursor, "daily_units", deltas)
+
+
+def record_donors(cursor, rows):
+    """
+    Add a batch of new donors to donor_mix and age_histogram
+
+    Donation updates do not touch the summarised columns, so only inserts
+    need recording.
+
+    Args:
+        cursor: Cursor on the donors database
+        rows: DonorRecord instances or tuples in donors column order
+    """
+    mix = Counter()
+    ages = Counter()
+    for row in rows:
+        mix[row[ETHNICITY_IDX], row[BLOOD_TYPE_IDX]] += 1
+        ages[row[AGE_IDX],] += 1
+    _upsert(cursor, "donor_mix", mix)
+    _upsert(cursor, "age_histogram", ages)
+
+
+def check_summaries(db_path, rebuild=False, donor_db=None):
+    """
+    Compare every summary in a database with its raw table
+
+    Args:
+        db_path: Donors or donations database
+        rebuild: Replace any summary that differs with a fresh GROUP BY
+        donor_db: Donors database that donation summaries are joined with;
+            summaries that need it are skipped when it is not given
+
+    Returns:
+        dict: {summary name: rows that differ, as (key, stored, expected)}
+    """
+    conn = sqlite3.connect(db_path)
+    existing = _tables(conn)
+    _attach_donors(conn, donor_db)
+    visible = _visible_tables(conn)
+    mismatches = {}
+    for name, summary in SUMMARIES.items():
+        if summary["source"] not in existing:
+            continue
+        missing = set(summary.get("joins", ())) - visible
+        if missing:
+            logger.warning(
+                f"Skipping {name} in {db_path}: needs the {', '.join(sorted(missing))} table"
+            )
+            continue
+        keys = len(summary["keys"])
+        expected = {row[:keys]: row[keys] for row in conn.execute(summary["query"])}
+        stored = {}
+        if name in existing:
+            stored = {row[:keys]: row[keys] for row in conn.execute(f"SELECT * FROM {name}")}
+        mismatches[name] = [
+            (key, stored.get(key), expected.get(key))
+            for key in sorted(expected.keys() | stored.keys(), key=repr)
+            if stored.get(key) != expected.get(key)
+        ]
+        if rebuild and (mismatches[name] or name not in existing):
+            conn.execute(summary["schema"])
+            conn.execute(f"DELETE FROM {name}")
+            conn.execute(f"INSERT INTO {name} {summary['query']}")
+            logger.info(f"Rebuilt {name} in {db_path}")
+    conn.commit()
+    conn.close()
+    return mismatches
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(
+        description="Check summary tables against the raw data, optionally rebuilding them"
+    )
+    parser.add_argument("dbs", nargs="+", help="Donors and/or donations databases")
+    parser.add_argument(
+        "--donor_db",
+        default=None,
+        help="Donors database for donation summaries (default: a donors database in dbs)",
+    )
+    parser.add_argument(
+        "--rebuild", action="store_true", help="Rebuild summaries that do not match"
+    )
+    args = parser.parse_args()
+
+    donor_db = args.donor_db
+    if donor_db is None:
+        for db_path in args.dbs:
+            conn = sqlite3.connect(db_path)
+            has_donors = "donors" in _tables(conn)
+            conn.close()
+            if has_donors:
+                donor_db = db_path
+                break
+
+    failed = False
+    for db_path in args.dbs:
+        for name, rows in check_summaries(db_path, args.rebuild, donor_db).items():
+            status = "ok" if not rows else f"{len(rows)} rows differ"
+            print(f"{db_path}: {name} {status}")
+            for key, stored, expected in rows[:10]:
+                print(f"    {key}: stored {stored}, expected {expected}")
+            failed = failed or (bool(rows) and not args.rebuild)
+    sys.exit(1 if failed else 0)
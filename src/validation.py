@@ -0,0 +1,416 @@
+import os
+import sys
+import math
+import sqlite3
+import logging
+import argparse
+from typing import NamedTuple
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from constants import (
+    AGE_DISTRIBUTION_2024,
+    SEX_DISTRIBUTION_2024,
+    ETHNICITY_DISTRIBUTION,
+    BLOOD_TYPE_BY_ETHNICITY,
+)
+
+logger = logging.getLogger(__name__)
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DATA_DIR = os.path.join(ROOT_DIR, "data")
+DONOR_DB_PATH = os.path.join(DATA_DIR, "donors.sqlite3")
+DONATION_DB_PATH = os.path.join(DATA_DIR, "donations.sqlite3")
+
+# Minimum days between whole-blood donations
+MIN_DONATION_INTERVAL = 56
+
+# Chi-square bins with fewer expected observations are pooled together
+MIN_EXPECTED_COUNT = 5
+
+# Rows per rowid range when aggregating the donors table
+CHUNK_ROWS = 250_000
+
+
+class CheckResult(NamedTuple):
+    name: str
+    test: str
+    statistic: float
+    p_value: float
+    passed: bool
+    detail: str = ""
+
+
+def _gamma_series(a, x):
+    """Regularised lower incomplete gamma P(a, x) by its power series"""
+    term = total = 1.0 / a
+    n = a
+    for _ in range(10_000):
+        n += 1
+        term *= x / n
+        total += term
+        if abs(term) < abs(total) * 1e-15:
+            break
+    return total * math.exp(-x + a * math.log(x) - math.lgamma(a))
+
+
+def _gamma_continued_fraction(a, x):
+    """Regularised upper incomplete gamma Q(a, x) by Lentz's continued fraction"""
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+    for i in range(1, 10_000):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-15:
+            break
+    return h * math.exp(-x + a * math.log(x) - math.lgamma(a))
+
+
+def chi_square_sf(statistic, dof):
+    """Survival function (p-value) of the chi-square distribution"""
+    if statistic <= 0:
+        return 1.0
+    a = dof / 2
+    x = statistic / 2
+    if x < a + 1:
+        return 1.0 - _gamma_series(a, x)
+    return _gamma_continued_fraction(a, x)
+
+
+def kolmogorov_sf(statistic, n):
+    """
+    Asymptotic p-value of the one-sample Kolmogorov-Smirnov statistic
+
+    Conservative for discrete distributions such as whole-year ages.
+    """
+    t = (math.sqrt(n) + 0.12 + 0.11 / math.sqrt(n)) * statistic
+    if t < 1e-3:
+        return 1.0
+    total = sum(
+        2 * (-1) ** (k - 1) * math.exp(-2 * k * k * t * t) for k in range(1, 101)
+    )
+    return min(1.0, max(0.0, total))
+
+
+def chi_square_test(observed, expected_probabilities):
+    """
+    Pearson chi-square goodness-of-fit test
+
+    Bins whose expected count is below MIN_EXPECTED_COUNT are pooled.
+
+    Args:
+        observed: Observed counts per category
+        expected_probabilities: Expected probabilities per category (any scale)
+
+    Returns:
+        tuple: (statistic, p_value, degrees_of_freedom)
+    """
+    observed = np.asarray(observed, dtype=np.float64)
+    probabilities = np.asarray(expected_probabilities, dtype=np.float64)
+    expected = probabilities / probabilities.sum() * observed.sum()
+
+    small = expected < MIN_EXPECTED_COUNT
+    if small.any() and not small.all():
+        observed = np.append(observed[~small], observed[small].sum())
+        expected = np.append(expected[~small], expected[small].sum())
+    keep = expected > 0
+    observed, expected = observed[keep], expected[keep]
+
+    dof = len(observed) - 1
+    if dof < 1:
+        return 0.0, 1.0, 0
+    statistic = float(((observed - expected) ** 2 / expected).sum())
+    return statistic, chi_square_sf(statistic, dof), dof
+
+
+def expected_age_probabilities(ages):
+    """Expected probability of each whole-year age under AGE_DISTRIBUTION_2024"""
+    total = sum(p for _, p in AGE_DISTRIBUTION_2024)
+    probabilities = dict.fromkeys(ages, 0.0)
+    for age, p in AGE_DISTRIBUTION_2024:
+        years = age if isinstance(age, range) else [age]
+        for year in years:
+            probabilities[year] = p / total / len(years)
+    return probabilities
+
+
+def _age_bin(age):
+    """Label of the AGE_DISTRIBUTION_2024 bin an age (or bin) falls in"""
+    if isinstance(age, range):
+        return f"{age.start}-{age.stop - 1}"
+    for bucket, _ in AGE_DISTRIBUTION_2024:
+        if isinstance(bucket, range) and age in bucket:
+            return f"{bucket.start}-{bucket.stop - 1}"
+    return str(age)
+
+
+def expected_ethnicity_probabilities():
+    """
+    Ethnicity mix the generators actually sample from
+
+    With geography each region has its own mix, so the expectation is the
+    population-weighted average over regions rather than the constants
+    themselves; the two differ by well under a percentage point.
+    """
+    from geography import regions
+
+    weights = np.array([r.ethnicity_weights for r in regions()])
+    population = np.array([r.population for r in regions()])
+    mix = population @ weights / population.sum()
+    return dict(zip([e for e, _ in ETHNICITY_DISTRIBUTION], mix))
+
+
+def _connect(db_path):
+    return sqlite3.connect(
+        f"file:{quote(os.path.abspath(db_path))}?mode=ro", uri=True,
+        check_same_thread=False,
+    )
+
+
+def _cube_chunk(db_path, first, last):
+    conn = _connect(db_path)
+    try:
+        return conn.execute(
+            f"""
+            SELECT age, sex, ethnicity, blood_type, COUNT(*),
+                   SUM(last_donation_date < first_donation_date
+                       OR julianday(last_donation_date)
+                          - julianday(first_donation_date)
+                          < {MIN_DONATION_INTERVAL} * (total_donations - 1))
+            FROM donors
+            WHERE rowid BETWEEN ? AND ?
+            GROUP BY age, sex, ethnicity, blood_type
+            """,
+            (first, last),
+        ).fetchall()
+    finally:
+        conn.close()
+
+
+def donor_cube(db_path, chunk_rows=CHUNK_ROWS, workers=None):
+    """
+    Count donors by (age, sex, ethnicity, blood type) in one aggregate pass
+
+    Every marginal and conditional distribution is then derived from this
+    small cube in memory instead of re-scanning the donors table. The scan
+    is split into rowid ranges, which keeps each GROUP BY sort in cache and
+    lets SQLite aggregate ranges on several cores at once.
+
+    Args:
+        db_path: Path to a database with a ``donors`` table
+        chunk_rows: Rows per rowid range
+        workers: Threads to use, defaults to the CPU count
+
+    Returns:
+        list: (age, sex, ethnicity, blood_type, count, bad_history) rows, where
+            bad_history counts donors whose first/last dates and total
+            donations cannot satisfy the minimum interval
+    """
+    conn = _connect(db_path)
+    low, high = conn.execute("SELECT MIN(rowid), MAX(rowid) FROM donors").fetchone()
+    conn.close()
+    if low is None:
+        return []
+    ranges = [
+        (db_path, first, min(first + chunk_rows - 1, high))
+        for first in range(low, high + 1, chunk_rows)
+    ]
+    workers = min(workers or os.cpu_count() or 1, len(ranges))
+    if workers == 1:
+        chunks = [_cube_chunk(*r) for r in ranges]
+    else:
+        with ThreadPoolExecutor(workers) as pool:
+            chunks = list(pool.map(lambda r: _cube_chunk(*r), ranges))
+
+    cube = {}
+    for chunk in chunks:
+        for *key, count, bad in chunk:
+            total = cube.setdefault(tuple(key), [0, 0])
+            total[0] += count
+            total[1] += bad
+    return [(*key, count, bad) for key, (count, bad) in cube.items()]
+
+
+def _margin(cube, *columns):
+    totals = {}
+    for row in cube:
+        key = tuple(row[c] for c in columns)
+        key = key[0] if len(key) == 1 else key
+        totals[key] = totals.get(key, 0) + row[4]
+    return totals
+
+
+def _chi_square_check(name, counts, expected, alpha):
+    categories = sorted(set(counts) | set(expected), key=str)
+    unexpected = [c for c in categories if c not in expected]
+    statistic, p_value, dof = chi_square_test(
+        [counts.get(c, 0) for c in categories],
+        [expected.get(c, 0.0) for c in categories],
+    )
+    passed = p_value >= alpha and not unexpected
+    detail = f"dof={dof}"
+    if unexpected:
+        detail += f", unexpected categories: {unexpected}"
+    return CheckResult(name, "chi-square", statistic, p_value, passed, detail)
+
+
+def validate_donors(db_path, alpha=0.001):
+    """
+    Validate the donors table against the distributions in constants.py
+
+    Args:
+        db_path: Path to a database with a ``donors`` table
+        alpha: Significance level for each statistical test
+
+    Returns:
+        list: CheckResult per check
+    """
+    cube = donor_cube(db_path)
+    results = []
+
+    ages = _margin(cube, 0)
+    n = sum(ages.values())
+    below_floor = sum(count for age, count in ages.items() if age < 17)
+    results.append(
+        CheckResult(
+            "minimum age", "count", below_floor, float(below_floor == 0),
+            below_floor == 0, f"{below_floor} donors under 17",
+        )
+    )
+
+    bins = {}
+    for age, count in ages.items():
+        bins[_age_bin(age)] = bins.get(_age_bin(age), 0) + count
+    expected_bins = {_age_bin(age): p for age, p in AGE_DISTRIBUTION_2024}
+    results.append(_chi_square_check("age bins", bins, expected_bins, alpha))
+
+    expected_ages = expected_age_probabilities(ages)
+    span = range(min(expected_ages), max(expected_ages) + 1)
+    empirical = np.cumsum([ages.get(a, 0) for a in span]) / n
+    theoretical = np.cumsum([expected_ages.get(a, 0.0) for a in span])
+    ks = float(np.abs(empirical - theoretical).max())
+    ks_p = kolmogorov_sf(ks, n)
+    results.append(CheckResult("age", "kolmogorov-smirnov", ks, ks_p, ks_p >= alpha))
+
+    results.append(
+        _chi_square_check("sex", _margin(cube, 1), dict(SEX_DISTRIBUTION_2024), alpha)
+    )
+    results.append(
+        _chi_square_check(
+            "ethnicity", _margin(cube, 2), expected_ethnicity_probabilities(), alpha
+        )
+    )
+
+    by_ethnicity = _margin(cube, 2, 3)
+    for ethnicity, distribution in BLOOD_TYPE_BY_ETHNICITY.items():
+        counts = {
+            bt: count for (eth, bt), count in by_ethnicity.items() if eth == ethnicity
+        }
+        if sum(counts.values()) == 0:
+            continue
+        results.append(
+            _chi_square_check(
+                f"blood type | {ethnicity}", counts, dict(distribution), alpha
+            )
+        )
+
+    bad_history = sum(row[5] for row in cube)
+    results.append(
+        CheckResult(
+            "donor history", "count", bad_history, float(bad_history == 0),
+            bad_history == 0,
+            f"{bad_history} donors whose history breaks the {MIN_DONATION_INTERVAL}-day rule",
+        )
+    )
+    return results
+
+
+def validate_donations(conn):
+    """
+    Check that no donor gave blood twice within MIN_DONATION_INTERVAL days
+
+    Args:
+        conn: Connection with a ``donations`` table
+
+    Returns:
+        list: CheckResult per check
+    """
+    short_gaps = conn.execute(
+        f"""
+        SELECT COUNT(*) FROM (
+            SELECT julianday(donation_date)
+                 - julianday(LAG(donation_date) OVER (
+                       PARTITION BY donor_id ORDER BY donation_date
+                   )) AS gap
+            FROM donations
+        )
+        WHERE gap < {MIN_DONATION_INTERVAL}
+        """
+    ).fetchone()[0]
+    return [
+        CheckResult(
+            "donation intervals", "count", short_gaps, float(short_gaps == 0),
+            short_gaps == 0,
+            f"{short_gaps} donations within {MIN_DONATION_INTERVAL} days of the previous one",
+        )
+    ]
+
+
+def validate_database(donor_db_path=DONOR_DB_PATH, donation_db_path=None, alpha=0.001):
+    """
+    Run every check against generated database files
+
+    Args:
+        donor_db_path: Path to the donors database
+        donation_db_path: Optional path to the donations database
+        alpha: Significance level for each statistical test
+
+    Returns:
+        list: CheckResult per check
+    """
+    results = validate_donors(donor_db_path, alpha)
+    if donation_db_path and os.path.exists(donation_db_path):
+        conn = _connect(donation_db_path)
+        results += validate_donations(conn)
+        conn.close()
+    return results
+
+
+def format_report(results):
+    """Render results as a plain-text table"""
+    lines = [f"{'check':<50} {'test':<20} {'statistic':>12} {'p-value':>10}  result"]
+    for r in results:
+        lines.append(
+            f"{r.name:<50} {r.test:<20} {r.statistic:>12.4g} {r.p_value:>10.4g}  "
+            f"{'ok' if r.passed else 'FAIL'}{'  ' + r.detail if r.detail else ''}"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Validate a generated dataset")
+    parser.add_argument("--donors", default=DONOR_DB_PATH, help="Donors database")
+    parser.add_argument(
+        "--donations", default=DONATION_DB_PATH, help="Donations database"
+    )
+    parser.add_argument(
+        "--alpha", type=float, default=0.001, help="Significance level per test"
+    )
+    args = parser.parse_args()
+
+    results = validate_database(args.donors, args.donations, args.alpha)
+    print(format_report(results))
+    sys.exit(0 if all(r.passed for r in results) else 1)
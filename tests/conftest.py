@@ -0,0 +1,148 @@
+import os
+import sys
+import sqlite3
+import itertools
+
+import pytest
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+from main import create_donor_database
+from scale_factor import populate_donor_slice
+from donation_history_generator import DonationHistoryGenerator
+
+SEED = 42
+SMALL = {"num_donors": 2000, "days": 90}
+LARGE = {"num_donors": 200_000, "days": 365}
+
+_memory_names = itertools.count()
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--run-large",
+        action="store_true",
+        default=False,
+        help="Run tests marked large, which generate a bigger dataset",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "large: needs the large generated dataset, run with --run-large"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--run-large"):
+        return
+    skip = pytest.mark.skip(reason="large dataset test, use --run-large")
+    for item in items:
+        if "large" in item.keywords:
+            item.add_marker(skip)
+
+
+class Dataset:
+    """
+    Seeded donors and donations generated once and held in memory
+
+    Tests never touch the templates; they get private copies made with the
+    SQLite backup API, which copies pages without re-running any SQL.
+    """
+
+    def __init__(self, directory, num_donors, days, seed=SEED):
+        """
+        Generate the dataset through the normal code paths
+
+        Args:
+            directory: Scratch directory for the generated files
+            num_donors: Number of donors
+            days: Days of donation history
+            seed: Random seed for reproducibility
+        """
+        self.num_donors = num_donors
+        self.days = days
+        self.seed = seed
+        donor_db = os.path.join(directory, "donors.sqlite3")
+        donation_db = os.path.join(directory, "donations.sqlite3")
+        create_donor_database(donor_db)
+        populate_donor_slice(donor_db, 0, num_donors, seed)
+        DonationHistoryGenerator(donor_db, donation_db, seed).generate_historical_data(
+            days, 20, 200, 30
+        )
+        self.donors = self._load(donor_db)
+        self.donations = self._load(donation_db)
+
+    @staticmethod
+    def _load(path):
+        source = sqlite3.connect(path)
+        template = sqlite3.connect(":memory:", check_same_thread=False)
+        source.backup(template)
+        source.close()
+        return template
+
+    def connect(self):
+        """
+        Private in-memory copy, laid out like connect_with_donors()
+
+        Returns:
+            sqlite3.Connection: donations in main, donors attached as donor_db
+        """
+        conn = sqlite3.connect("file::memory:", uri=True)
+        self.donations.backup(conn)
+        # A named shared-cache database lives as long as the ATTACH holds it
+        name = f"file:crimsoncache_donors_{next(_memory_names)}?mode=memory&cache=shared"
+        donors = sqlite3.connect(name, uri=True)
+        self.donors.backup(donors)
+        conn.execute("ATTACH DATABASE ? AS donor_db", (name,))
+        donors.close()
+        return conn
+
+    def files(self, directory):
+        """
+        Private on-disk copy, for code that opens databases by path
+
+        Returns:
+            dict: {"donors": path, "donations": path}
+        """
+        paths = {}
+        for name, template in (("donors", self.donors), ("donations", self.donations)):
+            paths[name] = os.path.join(directory, f"{name}.sqlite3")
+            target = sqlite3.connect(paths[name])
+            template.backup(target)
+            target.close()
+        return paths
+
+
+@pytest.fixture(scope="session")
+def dataset(tmp_path_factory):
+    """Small seeded dataset shared by the whole session"""
+    return Dataset(str(tmp_path_factory.mktemp("dataset")), **SMALL)
+
+
+@pytest.fixture(scope="session")
+def large_dataset(tmp_path_factory):
+    """Bigger dataset, only built when a test marked large asks for it"""
+    return Dataset(str(tmp_path_factory.mktemp("large_dataset")), **LARGE)
+
+
+@pytest.fixture
+def dataset_conn(dataset):
+    """Isolated in-memory copy of the small dataset"""
+    conn = dataset.connect()
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def dataset_files(dataset, tmp_path):
+    """Isolated on-disk copy of the small dataset"""
+    return dataset.files(str(tmp_path))
+
+
+@pytest.fixture
+def large_dataset_files(large_dataset, tmp_path):
+    """Isolated on-disk copy of the large dataset"""
+    return large_dataset.files(str(tmp_path))
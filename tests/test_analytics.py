@@ -0,0 +1,68 @@
+import os
+import sys
+import shutil
+
+import pytest
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+pytest.importorskip("duckdb")
+
+from scale_factor import populate_donor_slice
+from analytics import AnalyticsBackend, compare, wrap_bare_columns
+
+QUERIES_DIR = os.path.join(os.path.dirname(__file__), "..", "queries")
+
+
+def test_queries_match_sqlite(dataset_files, tmp_path):
+    """Every statement in queries/ runs unchanged and returns SQLite's rows."""
+    files = [os.path.join(QUERIES_DIR, f) for f in sorted(os.listdir(QUERIES_DIR))]
+    with AnalyticsBackend(dataset_files, native_path=str(tmp_path / "a.duckdb")) as backend:
+        report = compare(files, backend, repeat=1)
+        _, rows = backend.execute(
+            "SELECT COUNT(*) FROM donations d JOIN donors USING (donor_id)"
+        )
+    assert report and all(r["match"] for r in report)
+    assert rows[0][0] > 0
+
+
+def test_native_copy_refreshes_when_the_source_changes(dataset, dataset_files, tmp_path):
+    """The native copy is reused until the SQLite file's version changes."""
+    native = str(tmp_path / "a.duckdb")
+    count = dataset.num_donors
+    with AnalyticsBackend(dataset_files, native_path=native, mode="native") as backend:
+        assert backend.execute("SELECT COUNT(*) FROM donors")[1] == [(count,)]
+
+    populate_donor_slice(dataset_files["donors"], count, count + 100, seed=5)
+    with AnalyticsBackend(dataset_files, native_path=native, mode="native") as backend:
+        assert backend.execute("SELECT COUNT(*) FROM donors")[1] == [(count + 100,)]
+
+
+def test_wrap_bare_columns():
+    """Ungrouped select items are wrapped in any_value(), aggregates are not."""
+    assert wrap_bare_columns(
+        "SELECT (a - 1) / 2 AS lo, (a - 1) / 2 + 1 AS hi, COUNT(*) FROM t GROUP BY (a - 1) / 2"
+    ) == (
+        "SELECT any_value((a - 1) / 2) AS lo, any_value((a - 1) / 2 + 1) AS hi, COUNT(*) "
+        "FROM t GROUP BY (a - 1) / 2"
+    )
+    assert wrap_bare_columns("SELECT DISTINCT a FROM t") is None
+    assert wrap_bare_columns("SELECT a FROM t UNION SELECT b FROM u") is None
+
+
+def test_paths_needing_quotes(dataset_files, tmp_path):
+    """Source and native paths holding quotes and URI characters work."""
+    odd = tmp_path / "o'brien?#%20"
+    odd.mkdir()
+    sources = {}
+    for table, path in dataset_files.items():
+        sources[table] = str(odd / os.path.basename(path))
+        shutil.copyfile(path, sources[table])
+    # DuckDB's own files only get a quote; it treats "?" in them as a URI query
+    out = tmp_path / "o'neil"
+    out.mkdir()
+    with AnalyticsBackend(sources, native_path=str(out / "a.duckdb")) as backend:
+        assert backend.execute("SELECT COUNT(*) FROM donors")[1][0][0] > 0
+        assert all(os.path.exists(p) for p in backend.export_parquet(str(out)))
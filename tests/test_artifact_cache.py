@@ -0,0 +1,84 @@
+import os
+import sys
+import sqlite3
+
+import pytest
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+from artifact_cache import ArtifactCache, cache_key
+
+
+def _db(path, rows):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE t (x)")
+    conn.executemany("INSERT INTO t VALUES (?)", [(i,) for i in range(rows)])
+    conn.commit()
+    conn.close()
+    return str(path)
+
+
+def test_key_depends_on_parameters():
+    """Different seeds or parameters never share a cache entry."""
+    base = {"seed": 42, "num_days": 10}
+    assert cache_key(base) == cache_key(dict(base))
+    assert cache_key(base) != cache_key({**base, "seed": 43})
+    assert cache_key(base) != cache_key({**base, "num_days": 11})
+
+
+def test_round_trip(tmp_path):
+    """A stored run is restored as a writable copy."""
+    cache = ArtifactCache(str(tmp_path / "cache"))
+    source = _db(tmp_path / "a.sqlite3", 100)
+    restored = str(tmp_path / "out" / "a.sqlite3")
+
+    assert not cache.get("k", {"db": restored})
+    cache.put("k", {"db": source})
+    assert cache.get("k", {"db": restored})
+
+    conn = sqlite3.connect(restored)
+    assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 100
+    conn.execute("INSERT INTO t VALUES (1)")
+    conn.commit()
+    conn.close()
+    # Writing to the copy leaves the cached object intact
+    assert cache.get("k", {"db": restored})
+    conn = sqlite3.connect(restored)
+    assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 100
+    conn.close()
+
+
+@pytest.mark.skipif(
+    hasattr(os, "geteuid") and os.geteuid() == 0,
+    reason="root ignores file permissions",
+)
+def test_hard_links_are_read_only(tmp_path):
+    """Linked artifacts cannot be modified through SQLite."""
+    cache = ArtifactCache(str(tmp_path / "cache"))
+    cache.put("k", {"db": _db(tmp_path / "a.sqlite3", 10)})
+    linked = str(tmp_path / "linked.sqlite3")
+    assert cache.get("k", {"db": linked}, link=True)
+
+    conn = sqlite3.connect(linked)
+    with pytest.raises(sqlite3.OperationalError):
+        conn.execute("INSERT INTO t VALUES (1)")
+    conn.close()
+
+
+def test_lru_eviction(tmp_path):
+    """The least recently used run is evicted once the size bound is hit."""
+    sources = [_db(tmp_path / f"{i}.sqlite3", 1000 * (i + 1)) for i in range(3)]
+    sizes = [os.path.getsize(path) for path in sources]
+    cache = ArtifactCache(str(tmp_path / "cache"), max_bytes=sizes[0] + sizes[2])
+    out = {"db": str(tmp_path / "out.sqlite3")}
+
+    cache.put("first", {"db": sources[0]})
+    cache.put("second", {"db": sources[1]})
+    assert cache.get("first", out)
+    cache.put("third", {"db": sources[2]})
+
+    assert cache.size() <= cache.max_bytes
+    assert cache.get("first", out) and cache.get("third", out)
+    assert not cache.get("second", out)
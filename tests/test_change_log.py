@@ -0,0 +1,67 @@
+import os
+import sys
+import sqlite3
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+from main import create_donor_database
+from scale_factor import populate_donor_slice
+from donation_history_generator import DonationHistoryGenerator
+from change_log import enable_change_log, latest_seq, read_changes
+
+
+def test_replaying_the_log_reproduces_the_tables(tmp_path):
+    """Baseline rows plus the logged changes equal the final tables."""
+    donor_db = str(tmp_path / "donors.sqlite3")
+    donation_db = str(tmp_path / "donations.sqlite3")
+    create_donor_database(donor_db)
+    populate_donor_slice(donor_db, 0, 400, seed=2)
+
+    conn = sqlite3.connect(donor_db)
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(donors)")]
+    replica = {row[0]: row for row in conn.execute("SELECT * FROM donors")}
+    conn.close()
+
+    generator = DonationHistoryGenerator(donor_db, donation_db, seed=2)
+    generator.generate_historical_data(90, 5, 20, 40)
+
+    changes = read_changes(donor_db)
+    assert changes and [c.seq for c in changes] == sorted({c.seq for c in changes})
+    for change in changes:
+        assert change.operation == "update"
+        replica[change.row_key] = tuple(change.row[c] for c in columns)
+
+    conn = generator.connect_with_donors()
+    final = {row[0]: row for row in conn.execute("SELECT * FROM donor_db.donors")}
+    donations = conn.execute("SELECT COUNT(*) FROM donations").fetchone()[0]
+    conn.close()
+    assert replica == final
+
+    inserts = read_changes(donation_db, tables=["donations"])
+    assert len(inserts) == donations == len(changes)
+    assert {c.operation for c in inserts} == {"insert"}
+
+
+def test_read_since_and_rollback(tmp_path):
+    """Reads resume after a sequence number and rolled-back writes leave no trace."""
+    path = str(tmp_path / "t.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE items (id TEXT PRIMARY KEY, qty INTEGER)")
+    enable_change_log(conn, "items")
+    conn.execute("INSERT INTO items VALUES ('a', 1)")
+    conn.execute("UPDATE items SET qty = 2 WHERE id = 'a'")
+    conn.commit()
+    conn.execute("DELETE FROM items WHERE id = 'a'")
+    conn.rollback()
+    conn.execute("DELETE FROM items WHERE id = 'a'")
+    conn.commit()
+    conn.close()
+
+    assert latest_seq(path) == 3
+    tail = read_changes(path, since=1)
+    assert [(c.seq, c.operation, c.row) for c in tail] == [
+        (2, "update", {"id": "a", "qty": 2}),
+        (3, "delete", {"id": "a", "qty": 2}),
+    ]
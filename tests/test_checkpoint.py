@@ -0,0 +1,64 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+from main import create_donor_database
+from scale_factor import populate_donor_slice
+from donation_history_generator import DonationHistoryGenerator
+
+
+def make_generator(directory, seed=11):
+    donor_db = str(directory / "donors.sqlite3")
+    create_donor_database(donor_db)
+    populate_donor_slice(donor_db, 0, 600, seed=seed)
+    return DonationHistoryGenerator(donor_db, str(directory / "donations.sqlite3"), seed)
+
+
+def dump(generator):
+    conn = generator.connect_with_donors()
+    donations = conn.execute("SELECT * FROM donations ORDER BY bag_id").fetchall()
+    donors = conn.execute("SELECT * FROM donors ORDER BY donor_id").fetchall()
+    conn.close()
+    return donations, donors
+
+
+def test_interrupted_run_resumes_to_the_same_result(tmp_path, monkeypatch):
+    """A run that crashes part-way and resumes matches an uninterrupted run."""
+    (tmp_path / "full").mkdir()
+    (tmp_path / "crash").mkdir()
+    full = make_generator(tmp_path / "full")
+    full.generate_historical_data(120, 5, 30, 30)
+
+    crashing = make_generator(tmp_path / "crash")
+    original = DonationHistoryGenerator.generate_drive_donations
+    calls = []
+
+    def fail_on_fifth_drive(self, date_str, units_to_collect, conn=None):
+        calls.append(date_str)
+        events = original(self, date_str, units_to_collect, conn)
+        if len(calls) == 5:
+            raise RuntimeError("simulated preemption")
+        return events
+
+    monkeypatch.setattr(
+        DonationHistoryGenerator, "generate_drive_donations", fail_on_fifth_drive
+    )
+    with pytest.raises(RuntimeError):
+        crashing.generate_historical_data(120, 5, 30, 30)
+    monkeypatch.undo()
+
+    assert crashing.has_unfinished_run()
+    assert crashing.load_checkpoint()["last_completed_date"] == calls[3]
+
+    # Resume in a fresh generator, as main() would after a restart
+    resumed = DonationHistoryGenerator(
+        crashing.donor_db_path, crashing.donation_db_path, seed=99
+    )
+    resumed.generate_historical_data(120, 5, 30, 30)
+    assert not resumed.has_unfinished_run()
+    assert dump(resumed) == dump(full)
@@ -0,0 +1,13 @@
+def test_dataset_copies_are_isolated(dataset, dataset_conn):
+    """Writes to one test's copy never reach the shared dataset."""
+    dataset_conn.execute("DELETE FROM donor_db.donors")
+    dataset_conn.execute("DELETE FROM donations")
+    second = dataset.connect()
+    try:
+        assert (
+            second.execute("SELECT COUNT(*) FROM donor_db.donors").fetchone()[0]
+            == dataset.num_donors
+        )
+        assert second.execute("SELECT COUNT(*) FROM donations").fetchone()[0] > 0
+    finally:
+        second.close()
@@ -0,0 +1,60 @@
+import os
+import sys
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+from scale_factor import populate_donor_slice
+from donation_history_generator import DonationHistoryGenerator
+from summary_tables import check_summaries
+
+
+def _donated_today(donor_db):
+    conn = sqlite3.connect(donor_db)
+    count = conn.execute(
+        "SELECT COUNT(*) FROM donors WHERE last_donation_date = ?",
+        (datetime.now().strftime("%Y-%m-%d"),),
+    ).fetchone()[0]
+    conn.close()
+    return count
+
+
+@pytest.fixture
+def generator(dataset_files):
+    """Generator over the dataset plus new donors, who are all eligible today"""
+    populate_donor_slice(dataset_files["donors"], 10_000, 10_200, seed=4)
+    return DonationHistoryGenerator(dataset_files["donors"], dataset_files["donations"], seed=7)
+
+
+def test_daily_file_records_a_drive(generator):
+    """A drive day writes the activity file with summaries and donor updates."""
+    donor_db = generator.donor_db_path
+    before = _donated_today(donor_db)
+    path = generator.generate_daily_file(5, 20, percent_chance=100)
+
+    conn = sqlite3.connect(path)
+    donations = conn.execute("SELECT COUNT(*) FROM donations").fetchone()[0]
+    conn.close()
+    assert 5 <= donations <= 20
+    assert _donated_today(donor_db) == before + donations
+    assert check_summaries(path, donor_db=donor_db) == {"daily_units": []}
+
+
+def test_failed_daily_file_leaves_donors_untouched(generator, monkeypatch):
+    """Donor updates roll back with the donations if the day fails."""
+    donor_db = generator.donor_db_path
+    before = _donated_today(donor_db)
+
+    def fail(*args, **kwargs):
+        raise sqlite3.OperationalError("disk full")
+
+    monkeypatch.setattr(generator, "insert_donations", fail)
+    with pytest.raises(sqlite3.OperationalError):
+        generator.generate_daily_file(5, 20, percent_chance=100)
+    assert _donated_today(donor_db) == before
+    assert not [f for f in os.listdir(os.path.dirname(donor_db)) if f.endswith("_activity.sqlite3")]
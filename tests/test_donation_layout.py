@@ -0,0 +1,54 @@
+import os
+import sys
+import sqlite3
+
+import pytest
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+from main import create_donor_database
+from scale_factor import populate_donor_slice
+from donation_history_generator import DonationHistoryGenerator, donations_schema
+
+
+def generate(directory, layout):
+    directory.mkdir()
+    donor_db = str(directory / "donors.sqlite3")
+    create_donor_database(donor_db)
+    populate_donor_slice(donor_db, 0, 300, seed=4)
+    generator = DonationHistoryGenerator(
+        donor_db, str(directory / "donations.sqlite3"), seed=4, layout=layout
+    )
+    generator.generate_historical_data(60, 5, 20, 40)
+    conn = sqlite3.connect(generator.donation_db_path)
+    rows = conn.execute("SELECT * FROM donations").fetchall()
+    conn.close()
+    return rows
+
+
+def test_layouts_hold_the_same_rows_in_key_order(tmp_path):
+    """Every layout stores the same donations, scanned in its clustering order."""
+    rowid = generate(tmp_path / "rowid", "rowid")
+    by_date = generate(tmp_path / "date", "date")
+    by_donor = generate(tmp_path / "donor", "donor")
+
+    assert sorted(rowid) == sorted(by_date) == sorted(by_donor)
+    assert by_date == sorted(by_date, key=lambda r: (r[3], r[0]))
+    assert by_donor == sorted(by_donor, key=lambda r: (r[1], r[3], r[0]))
+
+
+def test_clustered_layouts_keep_bag_ids_unique():
+    """bag_id stays unique even though it is no longer the primary key."""
+    conn = sqlite3.connect(":memory:")
+    conn.execute(donations_schema("date"))
+    row = ("20250101-000001-O positive", "d", "e", "2025-01-01", "2025-01-02", 1, "available")
+    conn.execute("INSERT INTO donations VALUES (?, ?, ?, ?, ?, ?, ?)", row)
+    with pytest.raises(sqlite3.IntegrityError):
+        conn.execute(
+            "INSERT INTO donations VALUES (?, ?, ?, ?, ?, ?, ?)",
+            row[:3] + ("2025-01-02",) + row[4:],
+        )
+    with pytest.raises(ValueError):
+        donations_schema("columnar")
@@ -0,0 +1,71 @@
+import os
+import sys
+import sqlite3
+from datetime import date
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+from donation_history_generator import DonationHistoryGenerator
+from donor_cache import DonorCache, cache_dir
+from validation import validate_donations
+
+
+def _last_donations(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT donor_id, last_donation_date FROM donors ORDER BY rowid").fetchall()
+    conn.close()
+    return rows
+
+
+def test_cache_mirrors_the_table_and_goes_stale(dataset_files):
+    """Columns decode to the table's values until the database is written."""
+    db = dataset_files["donors"]
+    cache = DonorCache.open(db)
+    meta = os.path.join(cache_dir(db), "meta.json")
+    built = os.stat(meta).st_mtime_ns
+
+    conn = sqlite3.connect(db)
+    rows = conn.execute("SELECT donor_id, blood_type, age FROM donors ORDER BY rowid").fetchall()
+    assert len(cache) == len(rows)
+    for p in (0, len(rows) // 2, len(rows) - 1):
+        assert (cache.value("donor_id", p), cache.value("blood_type", p), cache.value("age", p)) == rows[p]
+    on = date(2026, 1, 1)
+    expected = conn.execute(
+        "SELECT COUNT(*) FROM donors WHERE last_donation_date IS NULL OR last_donation_date <= ?",
+        ("2025-11-06",),
+    ).fetchone()[0]
+    assert len(cache.eligible(on)) == expected
+
+    assert os.stat(meta).st_mtime_ns == built
+    DonorCache.open(db)
+    assert os.stat(meta).st_mtime_ns == built
+
+    conn.execute("UPDATE donors SET age = age + 1 WHERE rowid = 1")
+    conn.commit()
+    conn.close()
+    assert DonorCache.open(db).value("age", 0) == rows[0][2] + 1
+
+
+def test_historical_run_keeps_the_cache_in_step(dataset_files):
+    """A cached run obeys the interval rule and leaves a current cache."""
+    donor_db = dataset_files["donors"]
+    donation_db = dataset_files["donations"]
+    generator = DonationHistoryGenerator(donor_db, donation_db, seed=9)
+    generator.generate_historical_data(60, 20, 80, 60, resume=False)
+
+    conn = sqlite3.connect(donation_db)
+    results = validate_donations(conn)
+    conn.close()
+    assert all(r.passed for r in results), results
+
+    meta = os.path.join(cache_dir(donor_db), "meta.json")
+    synced = os.stat(meta).st_mtime_ns
+    cache = DonorCache.open(donor_db)
+    assert os.stat(meta).st_mtime_ns == synced
+    rows = _last_donations(donor_db)
+    assert [
+        date.fromordinal(int(o)).isoformat() if o else None
+        for o in cache.columns["last_donation"]
+    ] == [last for _, last in rows]
@@ -1,6 +1,5 @@
 import os
 import sys
-import sqlite3
 import pytest
 
 
@@ -19,17 +18,15 @@ def test_database_exists():
     )
 
 
-def test_donors_table_has_data():
+def test_donors_table_has_data(dataset_conn):
     """Check that the donors table contains at least one record."""
-    conn = sqlite3.connect(DONOR_DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("SELECT COUNT(*) FROM donors")
+    cursor = dataset_conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM donor_db.donors")
     count = cursor.fetchone()[0]
-    conn.close()
     assert count > 0, "No donors found in the database"
 
 
-def test_donors_table_structure():
+def test_donors_table_structure(dataset_conn):
     """Ensure all expected columns exist in the donors table."""
     expected_columns = {
         "donor_id",
@@ -44,21 +41,17 @@ def test_donors_table_structure():
         "last_donation_date",
         "total_donations",
     }
-    conn = sqlite3.connect(DONOR_DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("PRAGMA table_info(donors)")
+    cursor = dataset_conn.cursor()
+    cursor.execute("PRAGMA donor_db.table_info(donors)")
     actual_columns = {row[1] for row in cursor.fetchall()}
-    conn.close()
     assert expected_columns.issubset(actual_columns), (
         "Missing expected columns in donors table"
     )
 
 
-def test_no_donor_under_17():
+def test_no_donor_under_17(dataset_conn):
     """Ensure no donor is younger than 17."""
-    conn = sqlite3.connect(DONOR_DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("SELECT COUNT(*) FROM donors WHERE age < 17")
+    cursor = dataset_conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM donor_db.donors WHERE age < 17")
     count = cursor.fetchone()[0]
-    conn.close()
     assert count == 0, "Some donors are under 17 years old!"
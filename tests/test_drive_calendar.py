@@ -0,0 +1,35 @@
+import os
+import sys
+from datetime import date
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+from drive_calendar import drive_probabilities, plan_drives, holidays
+
+
+def test_flat_calendar_matches_percent_chance():
+    """Without dynamic effects every day has percent_chance / 100."""
+    rates = drive_probabilities(date(2024, 1, 1), 366, 30, dynamic=False)
+    assert rates.min() == rates.max() == 0.3
+
+
+def test_dynamic_calendar_keeps_average_and_dips_on_holidays():
+    """Dynamic rates average close to percent_chance and dip on holidays."""
+    start = date(2022, 1, 1)
+    rates = drive_probabilities(start, 3 * 365, 30)
+    assert abs(rates.mean() - 0.3) < 0.02
+
+    christmas = (date(2023, 12, 25) - start).days
+    assert rates[christmas] < 0.1
+    assert date(2024, 11, 28) in holidays(2024)  # Thanksgiving
+
+
+def test_plan_is_reproducible_and_in_range():
+    """The same seed gives the same plan, with units inside the bounds."""
+    plan = plan_drives(date(2024, 1, 1), 1000, 30, 20, 200, seed=5)
+    assert plan == plan_drives(date(2024, 1, 1), 1000, 30, 20, 200, seed=5)
+    assert 200 < len(plan) < 400
+    assert all(20 <= units <= 200 for _, units in plan)
+    assert [d for d, _ in plan] == sorted(d for d, _ in plan)
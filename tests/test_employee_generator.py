@@ -0,0 +1,32 @@
+import os
+import sys
+import sqlite3
+from datetime import date, timedelta
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+from employee_generator import HIRE_WINDOW_DAYS, generate_employees_bulk, get_employee_count
+
+
+def test_bulk_roster_is_complete_and_reproducible(tmp_path):
+    """Bulk generation inserts every row, within the ten-year hire window."""
+    db_path = str(tmp_path / "employees.sqlite3")
+    assert generate_employees_bulk(20000, seed=3, db_path=db_path) == 20000
+    assert get_employee_count(db_path) == 20000
+
+    conn = sqlite3.connect(db_path)
+    first, last, blank = conn.execute(
+        "SELECT MIN(hire_date), MAX(hire_date), SUM(name = '') FROM employees"
+    ).fetchone()
+    rows = conn.execute("SELECT * FROM employees ORDER BY employee_id").fetchall()
+    conn.close()
+    today = date.today()
+    assert date.fromisoformat(first) >= today - timedelta(days=HIRE_WINDOW_DAYS)
+    assert date.fromisoformat(last) <= today
+    assert blank == 0
+
+    # Re-running with the same seed regenerates the same IDs, which are ignored
+    assert generate_employees_bulk(20000, seed=3, db_path=db_path) == 0
+    assert get_employee_count(db_path) == 20000
@@ -0,0 +1,115 @@
+import os
+import sys
+import json
+import time
+import socket
+import threading
+from datetime import date
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+from main import create_donor_database
+from scale_factor import populate_donor_slice
+from event_stream import (
+    DonationStream,
+    JsonlFileSink,
+    QueueSink,
+    TokenBucket,
+    UnixSocketSink,
+    emit,
+)
+
+
+def _stream(tmp_path, seed=5):
+    path = str(tmp_path / "donors.sqlite3")
+    if not os.path.exists(path):
+        create_donor_database(path)
+        populate_donor_slice(path, 0, 2000, seed=1, as_of=date(2025, 1, 1))
+    return DonationStream(path, hospital_db_path=None, seed=seed)
+
+
+def test_stream_is_reproducible_and_respects_intervals(tmp_path):
+    """The same seed gives the same feed, and donors wait 56 days to donate again."""
+    first = _stream(tmp_path).next_batch(5000)
+    assert first == _stream(tmp_path).next_batch(5000)
+
+    last_seen = {}
+    for key, line in first:
+        event = json.loads(line)
+        if event["type"] != "donation":
+            continue
+        assert key == event["donor_id"]
+        day = date.fromisoformat(event["donation_datetime"][:10])
+        previous = last_seen.get(event["donor_id"])
+        assert previous is None or (day - previous).days >= 56
+        last_seen[event["donor_id"]] = day
+
+
+def test_file_sink(tmp_path):
+    """Events land in the JSONL file one per line."""
+    path = str(tmp_path / "events.jsonl")
+    sink = JsonlFileSink(path)
+    stats = emit(_stream(tmp_path), sink, batch_size=300, max_events=1000)
+    sink.close()
+    with open(path) as f:
+        lines = f.readlines()
+    assert stats["events"] == len(lines) == 1000
+    assert {json.loads(line)["type"] for line in lines} == {"donation", "donor_update"}
+
+
+def test_token_bucket_limits_rate():
+    """After the initial burst, tokens arrive at the configured rate."""
+    bucket = TokenBucket(10_000, burst=1_000)
+    started = time.monotonic()
+    for _ in range(4):
+        bucket.consume(1_000)
+    assert time.monotonic() - started >= 0.25
+
+
+def test_queue_sink_applies_backpressure(tmp_path):
+    """A full topic blocks the emitter until a consumer catches up."""
+    sink = QueueSink(partitions=1, max_batches=2)
+    stream = _stream(tmp_path)
+    producer = threading.Thread(
+        target=emit, args=(stream, sink), kwargs={"batch_size": 100, "max_events": 1000}
+    )
+    producer.start()
+    time.sleep(0.2)
+    assert producer.is_alive()
+
+    received = 0
+    while received < 1000:
+        received += len(sink.poll(0, timeout=5))
+    producer.join(timeout=5)
+    assert not producer.is_alive()
+    assert sink.offsets[0] == 1000
+
+
+def test_unix_socket_sink(tmp_path):
+    """A consumer connected to the socket receives every line."""
+    path = str(tmp_path / "events.sock")
+    stream = _stream(tmp_path)
+    received = []
+
+    def consume():
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # The socket file appears on bind(), slightly before listen()
+        while True:
+            try:
+                client.connect(path)
+                break
+            except (FileNotFoundError, ConnectionRefusedError):
+                time.sleep(0.01)
+        with client.makefile() as f:
+            received.extend(f)
+
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    sink = UnixSocketSink(path, accept_timeout=5)
+    emit(stream, sink, batch_size=250, max_events=1000)
+    sink.close()
+    consumer.join(timeout=5)
+    assert len(received) == 1000
+    assert all(json.loads(line)["type"] for line in received)
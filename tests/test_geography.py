@@ -0,0 +1,43 @@
+import os
+import sys
+from datetime import date
+
+import pytest
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+from geography import AliasTable, regions, ethnicity_table
+from scale_factor import generate_donor_rows
+
+
+def implied_probabilities(table):
+    """Outcome probabilities encoded by an alias table."""
+    p = [table.prob[i] / table.n for i in range(table.n)]
+    for i in range(table.n):
+        if table.alias[i] != i:
+            p[table.alias[i]] += (1 - table.prob[i]) / table.n
+    return p
+
+
+def test_alias_table_encodes_the_weights():
+    """Alias tables reproduce the input distribution exactly."""
+    weights = [0.878, 0.058, 0.027, 0.03, 0.005, 0.002]
+    expected = [w / sum(weights) for w in weights]
+    assert implied_probabilities(AliasTable(weights)) == pytest.approx(expected)
+
+
+def test_regions_have_their_own_mix_and_are_cached():
+    """Regional mixes differ from each other and tables are built once."""
+    mixes = {r.ethnicity_weights for r in regions()[:50]}
+    assert len(mixes) == 50
+    assert ethnicity_table(7) is ethnicity_table(7)
+
+
+def test_scale_factor_donors_get_zip_codes():
+    """Scale-factor donors carry a ZIP code from the region list."""
+    zip_codes = {r.zip_code for r in regions()}
+    rows = generate_donor_rows(0, 2000, as_of=date(2025, 1, 1))
+    assert all(row[11] in zip_codes for row in rows)
+    assert len({row[11] for row in rows}) > 100
@@ -0,0 +1,71 @@
+import os
+import sys
+import random
+import sqlite3
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+from hospitals import (
+    NETWORK_TABLE,
+    npi_check_digit,
+    create_hospitals_db,
+    create_hospital_network_db,
+    load_hospital_index,
+    nearest_compatible,
+)
+from spatial_index import haversine_km
+
+
+def test_npi_check_digit():
+    """Check digits follow the CMS Luhn example (1234567893)."""
+    assert npi_check_digit(123456789) == 3
+
+
+def test_grid_index_matches_linear_scan(tmp_path):
+    """Nearest-facility lookups agree with a brute-force scan."""
+    db_path = str(tmp_path / "hospitals.sqlite3")
+    create_hospital_network_db(db_path, 5000, seed=1)
+    index = load_hospital_index(db_path, cell_size_km=30)
+
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(f"SELECT NPI, latitude, longitude FROM {NETWORK_TABLE}").fetchall()
+    conn.close()
+    assert len({npi for npi, _, _ in rows}) == 5000
+
+    rng = random.Random(2)
+    for _ in range(50):
+        lat, lon = rng.uniform(25, 49), rng.uniform(-124, -67)
+        expected = sorted((haversine_km(lat, lon, la, lo), npi) for npi, la, lo in rows)
+        found = index.nearest(lat, lon, k=3)
+        assert [npi for _, npi in found] == [npi for _, npi in expected[:3]]
+
+
+def test_nearest_compatible_skips_incompatible_stock(tmp_path):
+    """Only hospitals holding a type the recipient can receive are returned."""
+    db_path = str(tmp_path / "hospitals.sqlite3")
+    create_hospital_network_db(db_path, 500, seed=3)
+    index = load_hospital_index(db_path)
+    (_, closest), (_, second) = index.nearest(37.0, -95.0, k=2)
+
+    stock = {closest: {"A positive": 10}, second: {"O negative": 2}}
+    assert nearest_compatible(index, 37.0, -95.0, "O positive", stock)[0][1] == second
+    assert nearest_compatible(index, 37.0, -95.0, "A positive", stock)[0][1] == closest
+
+
+def test_network_leaves_existing_hospitals_table_alone(tmp_path):
+    """A network added to a baseline hospitals database gets its own table."""
+    db_path = str(tmp_path / "hospitals.sqlite3")
+    create_hospitals_db(db_path)
+    conn = sqlite3.connect(db_path)
+    before = conn.execute("SELECT * FROM hospitals ORDER BY NPI").fetchall()
+    conn.close()
+
+    create_hospital_network_db(db_path, 200, seed=4)
+    create_hospital_network_db(db_path, 300, seed=5)
+    assert load_hospital_index(db_path).size == 300
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT * FROM hospitals ORDER BY NPI").fetchall() == before
+    conn.close()
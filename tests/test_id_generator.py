@@ -0,0 +1,30 @@
+import os
+import sys
+import uuid
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+from id_generator import IdGenerator
+
+
+def test_uuid7_is_ordered_and_reproducible():
+    """IDs increase monotonically and repeat for the same seed."""
+    ids = IdGenerator(seed=1)
+    generated = [ids.uuid7("2024-05-01") for _ in range(5000)]
+    generated += [ids.uuid7("2024-04-30") for _ in range(10)]
+    assert generated == sorted(generated)
+    assert len(set(generated)) == len(generated)
+    assert all(uuid.UUID(i).version == 7 for i in generated[:10])
+
+    again = IdGenerator(seed=1)
+    assert [again.uuid7("2024-05-01") for _ in range(5)] == generated[:5]
+
+
+def test_bag_ids_sequence_by_date():
+    """Bag IDs sort by collection date, then by sequence within a day."""
+    ids = IdGenerator()
+    assert ids.bag_id("2024-05-01", "O positive") == "20240501-000001-O positive"
+    assert ids.bag_id("2024-05-01", "A negative") == "20240501-000002-A negative"
+    assert ids.bag_id("2024-05-02", "O positive") == "20240502-000001-O positive"
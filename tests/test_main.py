@@ -1,7 +1,5 @@
 import os
 import sys
-import sqlite3
-import pytest
 
 from main import DONOR_DB_PATH
 
@@ -13,11 +11,9 @@ def test_database_exists():
     )
 
 
-def test_donors_table_has_data():
+def test_donors_table_has_data(dataset_conn):
     """Check that the donors table contains at least one record."""
-    conn = sqlite3.connect(DONOR_DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("SELECT COUNT(*) FROM donors")
+    cursor = dataset_conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM donor_db.donors")
     count = cursor.fetchone()[0]
-    conn.close()
     assert count > 0, "No donors found in the database"
@@ -0,0 +1,44 @@
+import os
+import sys
+import sqlite3
+from datetime import date
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+from multi_center import default_centers, plan_transfers, simulate_network, BLOOD_TYPES
+
+
+def test_transfers_only_move_surplus_to_shortfalls():
+    """No center gives more than its surplus or receives more than it needs."""
+    width = len(BLOOD_TYPES)
+    positions = [[5] * width, [-3] * width, [-4] * width, [0] * width]
+    transfers = plan_transfers(positions)
+
+    for t, blood_type in enumerate(BLOOD_TYPES):
+        moved = [x for x in transfers if x.blood_type == blood_type]
+        assert sum(x.units for x in moved if x.source == 0) == 5
+        assert {x.source for x in moved} == {0}
+        # The larger shortfall is filled first
+        assert [(x.destination, x.units) for x in moved] == [(2, 4), (1, 1)]
+
+
+def test_network_is_independent_of_worker_count(tmp_path):
+    """Each center's books balance, and workers only change the speed."""
+    centers = default_centers(3, seed=8)
+    as_of = date(2025, 6, 1)
+    one = simulate_network(centers, 45, str(tmp_path / "one"), seed=8, workers=1, as_of=as_of)
+    two = simulate_network(centers, 45, str(tmp_path / "two"), seed=8, workers=2, as_of=as_of)
+    assert one == two
+
+    assert sum(s["sent"] for s in one) == sum(s["received"] for s in one) > 0
+    for s in one:
+        assert s["collected"] - s["used"] + s["received"] - s["sent"] == s["stock"]
+
+    donor_ids = []
+    for center in centers:
+        conn = sqlite3.connect(str(tmp_path / "one" / center.name / "donors.sqlite3"))
+        donor_ids += [r[0] for r in conn.execute("SELECT donor_id FROM donors")]
+        conn.close()
+    assert len(donor_ids) == len(set(donor_ids)) == sum(c.num_donors for c in centers)
@@ -0,0 +1,92 @@
+import os
+import sys
+import sqlite3
+import threading
+
+import pytest
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+from query_service import QueryService, split_statements
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+QUERIES_DIR = os.path.join(ROOT_DIR, "queries")
+
+
+@pytest.fixture
+def donor_db(dataset_files):
+    return dataset_files["donors"]
+
+
+def test_split_statements_normalizes_formatting():
+    """Comments and whitespace differences normalize away, literals stay."""
+    statements = split_statements(
+        "SELECT  a -- comment\n FROM t WHERE b = 'x  y';\n/* c */ SELECT 1;"
+    )
+    assert statements == ["SELECT a FROM t WHERE b = 'x  y'", "SELECT 1"]
+
+
+def test_repeated_queries_hit_the_cache(donor_db):
+    """The same query with different formatting is answered from the cache."""
+    with QueryService(donor_db) as service:
+        first = service.execute("SELECT COUNT(*) FROM donors")
+        second = service.execute("select COUNT(*)\n   FROM donors;")
+        assert service.execute("SELECT COUNT(*) FROM donors") == first
+        assert (service.hits, service.misses) == (1, 2)
+        assert second[1] == first[1]
+
+
+def test_writes_invalidate_cached_results(donor_db):
+    """A committed write to the database invalidates cached results."""
+    with QueryService(donor_db) as service:
+        (count,), = service.execute("SELECT COUNT(*) FROM donors")[1]
+
+        conn = sqlite3.connect(donor_db)
+        conn.execute("DELETE FROM donors WHERE rowid IN (SELECT rowid FROM donors LIMIT 10)")
+        conn.commit()
+        conn.close()
+
+        assert service.execute("SELECT COUNT(*) FROM donors")[1] == [(count - 10,)]
+
+
+def test_results_during_constant_writes_are_not_cached(donor_db, monkeypatch):
+    """A version that changes on every check returns results without caching."""
+    with QueryService(donor_db) as service:
+        stamps = iter(range(10**6))
+        monkeypatch.setattr(service, "version", lambda: (next(stamps),))
+        for _ in range(3):
+            assert service.execute("SELECT COUNT(*) FROM donors")[1][0][0] > 0
+        assert (service.hits, service.misses) == (0, 3)
+
+
+def test_waiters_wake_when_a_stale_connection_is_closed(donor_db):
+    """A full pool frees its slot when a connection of an old version returns."""
+    with QueryService(donor_db, pool_size=1) as service:
+        version = service._check_version()
+        held = service._acquire()
+
+        results = []
+        waiter = threading.Thread(
+            target=lambda: results.append(service.execute("SELECT COUNT(*) FROM donors")),
+            daemon=True,
+        )
+        waiter.start()
+        conn = sqlite3.connect(donor_db)
+        conn.execute("DELETE FROM donors WHERE rowid IN (SELECT rowid FROM donors LIMIT 1)")
+        conn.commit()
+        conn.close()
+        service._check_version()
+        service._release(held, version)
+
+        waiter.join(timeout=10)
+        assert not waiter.is_alive() and results
+
+
+def test_runs_query_files(donor_db):
+    """Every statement of the files in queries/ runs read-only."""
+    with QueryService(donor_db) as service:
+        for name in os.listdir(QUERIES_DIR):
+            results = service.run_file(os.path.join(QUERIES_DIR, name))
+            assert results and all(rows for _, _, rows in results)
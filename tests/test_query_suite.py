@@ -0,0 +1,29 @@
+import os
+import sys
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+)
+
+from query_suite import find_regressions, query_files, run_suite
+
+
+def test_suite_flags_new_full_scans_and_slowdowns(tmp_path):
+    """A plan that starts scanning the table, or a slower median, regresses."""
+    (tmp_path / "lookups").write_text(
+        "SELECT name FROM donors WHERE donor_id = 'x';\n"
+        "SELECT COUNT(*) FROM donors WHERE name LIKE 'A%';\n"
+    )
+    results = run_suite(query_files(str(tmp_path)), [0.1], runs=3)
+    queries = results["scale 0.1"]
+    assert queries["lookups#1"]["full_scans"] == []
+    assert queries["lookups#2"]["full_scans"] == ["donors"]
+    assert queries["lookups#2"]["rows"] == 1
+    assert find_regressions(results, results) == []
+
+    baseline = {"scale 0.1": {k: dict(v) for k, v in queries.items()}}
+    baseline["scale 0.1"]["lookups#2"]["full_scans"] = []
+    baseline["scale 0.1"]["lookups#1"]["p50_ms"] = queries["lookups#1"]["p50_ms"] / 10
+    reasons = {q: r for _, q, r in find_regressions(results, baseline, min_ms=0)}
+    assert reasons["lookups#2"] == "new full scan of donors"
+    assert reasons["lookups#1"].startswith("median")
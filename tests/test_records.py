@@ -0,0 +1,63 @@
+import os
+import sys
+import csv
+import sqlite3
+from datetime import date
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+from main import create_donor_database
+from scale_factor import generate_donor_rows
+from records import (
+    ColumnBuffer,
+    DonationRecord,
+    DonorRecord,
+    DONOR_CATEGORIES,
+    write_csv,
+    write_sqlite,
+)
+
+
+def test_buffer_round_trip():
+    """Rows come back out of the buffer exactly as they went in."""
+    rows = generate_donor_rows(0, 500, seed=3, as_of=date(2025, 1, 1))
+    buffer = ColumnBuffer(DonorRecord, DONOR_CATEGORIES)
+    buffer.extend(rows)
+
+    assert len(buffer) == 500
+    assert list(buffer.rows()) == rows
+    assert next(buffer.records()).donor_id == rows[0][0]
+    codes, values = buffer.codes("blood_type")
+    assert len(codes) == 500 and len(values) <= 8
+    assert [values[c] for c in codes] == buffer.column("blood_type")
+
+
+def test_bool_columns_decode_as_bool():
+    """Booleans stored in a byte array read back as bool."""
+    buffer = ColumnBuffer(DonationRecord, ("status",))
+    buffer.append(DonationRecord("b1", "d1", "e1", "2025-01-01", "2025-01-02", True, "used"))
+    assert next(buffer.records()).test_result is True
+
+
+def test_writers(tmp_path):
+    """The SQLite and CSV writers consume a buffer without conversion."""
+    rows = generate_donor_rows(0, 200, seed=3, as_of=date(2025, 1, 1))
+    buffer = ColumnBuffer(DonorRecord, DONOR_CATEGORIES)
+    buffer.extend(rows)
+
+    db_path = str(tmp_path / "donors.sqlite3")
+    create_donor_database(db_path)
+    conn = sqlite3.connect(db_path)
+    assert write_sqlite(conn, "donors", buffer) == 200
+    conn.commit()
+    assert conn.execute("SELECT * FROM donors ORDER BY rowid").fetchall() == rows
+    conn.close()
+
+    csv_path = str(tmp_path / "donors.csv")
+    assert write_csv(csv_path, buffer) == 200
+    with open(csv_path, newline="") as f:
+        table = list(csv.reader(f))
+    assert tuple(table[0]) == DonorRecord._fields
+    assert table[1][0] == rows[0][0]
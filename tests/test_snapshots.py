@@ -0,0 +1,100 @@
+import os
+import sys
+import sqlite3
+
+import pytest
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+pytest.importorskip("zstandard")
+
+from snapshots import file_digest, load_manifest, publish, restore
+
+
+def _donate(db_path, count, day):
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "UPDATE donors SET last_donation_date = ?, total_donations = total_donations + 1 "
+        "WHERE donor_id IN (SELECT donor_id FROM donors ORDER BY donor_id LIMIT ?)",
+        (day, count),
+    )
+    conn.commit()
+    conn.close()
+
+
+def _rows(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT * FROM donors ORDER BY donor_id").fetchall()
+    conn.close()
+    return rows
+
+
+def test_deltas_rebuild_every_version(dataset_files, tmp_path):
+    """A fresh restore and a rolled-forward copy both match the source."""
+    db = dataset_files["donors"]
+    published = str(tmp_path / "published")
+    first = publish(db, published, base_every=2)
+    assert first["base"] and not first["delta"]
+    assert publish(db, published) is None
+
+    _donate(db, 20, "2026-01-01")
+    second = publish(db, published, base_every=2)
+    assert second["delta"]["pages"] < second["size"] // 4096 and not second["base"]
+    _donate(db, 40, "2026-01-02")
+    third = publish(db, published, base_every=2)
+    assert third["delta"] and third["base"]
+
+    directory = os.path.join(published, "donors")
+    copy = str(tmp_path / "copy.sqlite3")
+    assert restore(directory, copy, version=1)["deltas"] == 0
+    assert restore(directory, copy)["from_version"] == 1
+    assert file_digest(copy) == third["sha256"]
+    assert _rows(copy) == _rows(db)
+
+    fresh = str(tmp_path / "fresh.sqlite3")
+    assert restore(directory, fresh, version=2)["deltas"] == 1
+    assert file_digest(fresh) == second["sha256"]
+    assert len(load_manifest(directory)["versions"]) == 3
+
+
+def test_corrupt_delta_is_rejected(dataset_files, tmp_path):
+    """A damaged delta fails its checksum and leaves the target untouched."""
+    db = dataset_files["donors"]
+    published = str(tmp_path / "published")
+    publish(db, published)
+    _donate(db, 20, "2026-01-01")
+    entry = publish(db, published)
+
+    directory = os.path.join(published, "donors")
+    copy = str(tmp_path / "copy.sqlite3")
+    restore(directory, copy, version=1)
+    before = file_digest(copy)
+    with open(os.path.join(directory, entry["delta"]["file"]), "r+b") as f:
+        f.seek(20)
+        f.write(b"\x00\x01")
+    with pytest.raises(ValueError):
+        restore(directory, copy)
+    assert file_digest(copy) == before
+
+
+def test_missing_database_publishes_nothing(tmp_path):
+    """Publishing a path that does not exist leaves no directory behind."""
+    published = tmp_path / "published"
+    with pytest.raises(FileNotFoundError):
+        publish(str(tmp_path / "donations.sqlite3"), str(published))
+    assert not published.exists()
+
+
+def test_paths_needing_uri_escapes(dataset_files, tmp_path):
+    """Databases whose paths hold ?, # or % publish and restore."""
+    odd = tmp_path / "a?b#c%20d"
+    odd.mkdir()
+    db = str(odd / "donors.sqlite3")
+    with open(dataset_files["donors"], "rb") as src, open(db, "wb") as dst:
+        dst.write(src.read())
+    publish(db, str(odd / "published"))
+    copy = str(odd / "copy.sqlite3")
+    restore(str(odd / "published" / "donors"), copy)
+    assert _rows(copy) == _rows(db)
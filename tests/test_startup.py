@@ -0,0 +1,23 @@
+import os
+import sys
+import subprocess
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_DIR = os.path.join(ROOT_DIR, "src")
+
+
+def test_daily_path_does_not_load_heavy_dependencies():
+    """Importing the entry point leaves Faker, factory_boy and NumPy unloaded."""
+    code = (
+        "import sys, main, donation_history_generator; "
+        "print(sorted(m for m in ('faker', 'factory', 'numpy') if m in sys.modules))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=SRC_DIR,
+        env=dict(os.environ, PYTHONPATH=SRC_DIR),
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    assert out.strip() == "[]"
@@ -0,0 +1,105 @@
+import os
+import sys
+import sqlite3
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+from main import create_donor_database, ensure_donor_summaries
+from scale_factor import populate_donor_slice
+from donation_history_generator import DonationHistoryGenerator
+from summary_tables import check_summaries
+
+
+def test_summaries_track_generated_rows(dataset_files):
+    """Delta upserts from the generators agree with a full GROUP BY."""
+    donor_db = dataset_files["donors"]
+    donation_db = dataset_files["donations"]
+    populate_donor_slice(donor_db, 10_000, 10_500, seed=4, chunk_size=128)
+
+    assert check_summaries(donor_db) == {"donor_mix": [], "age_histogram": []}
+    assert check_summaries(donation_db, donor_db=donor_db) == {"daily_units": []}
+
+    conn = sqlite3.connect(donation_db)
+    units = conn.execute("SELECT SUM(units) FROM daily_units").fetchone()[0]
+    assert units == conn.execute("SELECT COUNT(*) FROM donations").fetchone()[0] > 0
+    conn.execute(
+        "UPDATE daily_units SET units = units + 1 "
+        "WHERE donation_date = (SELECT MIN(donation_date) FROM daily_units)"
+    )
+    conn.commit()
+    conn.close()
+
+    assert check_summaries(donation_db, donor_db=donor_db)["daily_units"]
+    check_summaries(donation_db, rebuild=True, donor_db=donor_db)
+    assert check_summaries(donation_db, donor_db=donor_db) == {"daily_units": []}
+    assert check_summaries(donation_db) == {}
+
+
+def test_summaries_are_backfilled_for_existing_data(tmp_path):
+    """Adding rows to a database made before the summaries keeps them exact."""
+    donor_db = str(tmp_path / "donors.sqlite3")
+    create_donor_database(donor_db)
+    populate_donor_slice(donor_db, 0, 200, seed=4)
+    conn = sqlite3.connect(donor_db)
+    conn.execute("DROP TABLE donor_mix")
+    conn.execute("DROP TABLE age_histogram")
+    conn.commit()
+    conn.close()
+
+    populate_donor_slice(donor_db, 200, 300, seed=4)
+    assert check_summaries(donor_db) == {"donor_mix": [], "age_histogram": []}
+
+
+def test_existing_donor_database_gets_summaries(tmp_path):
+    """A donors database from before the summaries is backfilled at startup."""
+    donor_db = str(tmp_path / "donors.sqlite3")
+    create_donor_database(donor_db)
+    populate_donor_slice(donor_db, 0, 200, seed=4)
+    conn = sqlite3.connect(donor_db)
+    conn.execute("DROP TABLE donor_mix")
+    conn.execute("DROP TABLE age_histogram")
+    conn.commit()
+    conn.close()
+
+    ensure_donor_summaries(donor_db)
+    assert check_summaries(donor_db) == {"donor_mix": [], "age_histogram": []}
+    conn = sqlite3.connect(donor_db)
+    assert conn.execute("SELECT SUM(donors) FROM donor_mix").fetchone()[0] == 200
+    conn.close()
+
+
+def test_daily_units_backfill_ignores_bag_id_format(tmp_path):
+    """Donations with pre-series bag IDs are summarised by their donor's type."""
+    donor_db = str(tmp_path / "donors.sqlite3")
+    donation_db = str(tmp_path / "donations.sqlite3")
+    create_donor_database(donor_db)
+    populate_donor_slice(donor_db, 0, 50, seed=4)
+
+    conn = sqlite3.connect(donor_db)
+    donors = conn.execute("SELECT donor_id, blood_type FROM donors LIMIT 3").fetchall()
+    conn.close()
+    conn = sqlite3.connect(donation_db)
+    conn.execute("""
+        CREATE TABLE donations (
+            bag_id TEXT PRIMARY KEY, donor_id TEXT, event_id TEXT, donation_date DATE,
+            test_date DATE, test_result BOOLEAN, status TEXT
+        )
+    """)
+    conn.executemany(
+        "INSERT INTO donations VALUES (?, ?, 'e', '2024-01-01', '2024-01-02', 1, 'available')",
+        [(f"{blood_type}-1a2b3c4{i}", donor_id) for i, (donor_id, blood_type) in enumerate(donors)],
+    )
+    conn.commit()
+    conn.close()
+
+    DonationHistoryGenerator(donor_db, donation_db, seed=1).initialize_donation_database()
+    assert check_summaries(donation_db, donor_db=donor_db) == {"daily_units": []}
+    conn = sqlite3.connect(donation_db)
+    stored = sorted(conn.execute("SELECT blood_type, units FROM daily_units"))
+    conn.close()
+    expected = {}
+    for _, blood_type in donors:
+        expected[blood_type] = expected.get(blood_type, 0) + 1
+    assert stored == sorted(expected.items())
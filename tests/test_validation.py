@@ -0,0 +1,79 @@
+import os
+import sys
+import sqlite3
+from datetime import date
+
+import pytest
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+)
+
+from main import create_donor_database
+from scale_factor import populate_donor_slice
+from validation import (
+    chi_square_sf,
+    kolmogorov_sf,
+    chi_square_test,
+    validate_database,
+    validate_donations,
+)
+
+
+def _donor_db(tmp_path, count=20_000):
+    path = str(tmp_path / "donors.sqlite3")
+    create_donor_database(path)
+    populate_donor_slice(path, 0, count, seed=11, as_of=date(2025, 1, 1))
+    return path
+
+
+def test_p_values_match_reference_values():
+    """Chi-square and Kolmogorov tails agree with tabulated values."""
+    assert abs(chi_square_sf(3.841459, 1) - 0.05) < 1e-6
+    assert abs(chi_square_sf(18.307038, 10) - 0.05) < 1e-6
+    assert abs(kolmogorov_sf(1.358 / 100, 10_000) - 0.05) < 2e-3
+    statistic, p_value, dof = chi_square_test([50, 50], [0.5, 0.5])
+    assert (statistic, p_value, dof) == (0.0, 1.0, 1)
+
+
+def test_generated_donors_pass(tmp_path):
+    """Donors generated from constants.py pass every check."""
+    results = validate_database(_donor_db(tmp_path))
+    failed = [r for r in results if not r.passed]
+    assert not failed, failed
+
+
+def test_skewed_blood_types_fail(tmp_path):
+    """Overwriting a slice of blood types is detected."""
+    path = _donor_db(tmp_path)
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "UPDATE donors SET blood_type = 'AB-' WHERE ethnicity = 'White' AND age < 40"
+    )
+    conn.commit()
+    conn.close()
+    failed = {r.name for r in validate_database(path) if not r.passed}
+    assert "blood type | White" in failed
+
+
+def test_short_donation_interval_fails():
+    """Two donations by one donor within 56 days are flagged."""
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE donations (donor_id TEXT, donation_date TEXT)")
+    conn.executemany(
+        "INSERT INTO donations VALUES (?, ?)",
+        [("a", "2024-01-01"), ("a", "2024-02-26"), ("b", "2024-01-01"),
+         ("b", "2024-02-01")],
+    )
+    (result,) = validate_donations(conn)
+    assert not result.passed and result.statistic == 1
+
+
+@pytest.mark.large
+def test_large_dataset_passes(large_dataset_files):
+    """A full-size generated dataset passes every donor and donation check."""
+    results = validate_database(
+        large_dataset_files["donors"], large_dataset_files["donations"]
+    )
+    failed = [r for r in results if not r.passed]
+    assert not failed, failed